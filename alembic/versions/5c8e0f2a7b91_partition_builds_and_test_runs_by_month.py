@@ -0,0 +1,174 @@
+"""Partition builds and test runs by month
+
+Revision ID: 5c8e0f2a7b91
+Revises: e3f7a9c2d4b6
+Create Date: 2020-07-06 13:41:22.508119
+
+"""
+from datetime import date
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c8e0f2a7b91"
+down_revision = "e3f7a9c2d4b6"
+branch_labels = None
+depends_on = None
+
+# partitions for the later months are created by task.maintain_partitions
+MONTHS_AHEAD = 3
+
+# table -> (partition key, foreign keys, indexes, unique constraint of the unpartitioned table)
+# The unique constraint can't be kept: it would have to contain the partition key.
+# The builds are kept unique by the advisory lock of models.get_or_insert instead.
+TABLES = {
+    "copr_builds": (
+        "build_submitted_time",
+        {"job_trigger_id": "build_triggers", "srpm_build_id": "srpm_builds"},
+        {
+            "ix_copr_builds_build_id": ["build_id"],
+            "ix_copr_builds_build_id_target": ["build_id", "target"],
+        },
+        ["build_id", "target"],
+    ),
+    "koji_builds": (
+        "build_submitted_time",
+        {"job_trigger_id": "build_triggers", "srpm_build_id": "srpm_builds"},
+        {
+            "ix_koji_builds_build_id": ["build_id"],
+            "ix_koji_builds_build_id_target": ["build_id", "target"],
+        },
+        ["build_id", "target"],
+    ),
+    "tft_test_runs": (
+        "submitted_time",
+        {"job_trigger_id": "build_triggers"},
+        {"ix_tft_test_runs_pipeline_id": ["pipeline_id"]},
+        None,
+    ),
+}
+
+# table -> other times of the row, the partition key is missing
+FALLBACK_TIMES = {
+    "copr_builds": ["build_start_time", "build_finished_time"],
+    "koji_builds": ["build_start_time", "build_finished_time"],
+    "tft_test_runs": [],
+}
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def replace_table(table: str, partition_by: str = None):
+    """
+    Replace the table by a new one with the same columns (and data),
+    partitioned or not, without any constraints and indexes.
+    """
+    op.rename_table(table, f"{table}_old")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS)"
+        + (f" PARTITION BY RANGE ({partition_by})" if partition_by else "")
+    )
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def copy_and_drop_old_table(table: str):
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    op.drop_table(f"{table}_old")
+
+
+def create_constraints(table: str, foreign_keys: dict, indexes: dict):
+    for column, referenced_table in foreign_keys.items():
+        op.create_foreign_key(
+            f"{table}_{column}_fkey", table, referenced_table, [column], ["id"]
+        )
+    for name, columns in indexes.items():
+        op.create_index(name, table, columns, unique=False)
+
+
+def backfill_submitted_time(table: str, partition_key: str):
+    """
+    Fill in the missing partition keys. There is no creation time of the rows,
+    so it's the other times of the row or the time of the row created
+    right before it (the IDs are sequential), or right after it.
+    The migration time is the last resort, for a table without any time.
+    """
+    neighbour = (
+        f"(SELECT neighbour.{partition_key} FROM {table} neighbour "
+        f"WHERE neighbour.id {{}} {table}.id AND neighbour.{partition_key} IS NOT NULL "
+        f"ORDER BY neighbour.id {{}} LIMIT 1)"
+    )
+    times = [
+        *FALLBACK_TIMES[table],
+        neighbour.format("<", "DESC"),
+        neighbour.format(">", "ASC"),
+        "timezone('utc', now())",
+    ]
+    op.execute(
+        f"UPDATE {table} SET {partition_key} = coalesce({', '.join(times)}) "
+        f"WHERE {partition_key} IS NULL"
+    )
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE tft_test_runs ADD COLUMN submitted_time TIMESTAMP WITHOUT TIME ZONE"
+    )
+    # the tests were submitted right after the Copr build of the same commit and chroot
+    op.execute(
+        "UPDATE tft_test_runs SET submitted_time = builds.build_submitted_time "
+        "FROM (SELECT job_trigger_id, commit_sha, target, "
+        "max(build_submitted_time) AS build_submitted_time FROM copr_builds "
+        "GROUP BY job_trigger_id, commit_sha, target) AS builds "
+        "WHERE builds.job_trigger_id = tft_test_runs.job_trigger_id "
+        "AND builds.commit_sha = tft_test_runs.commit_sha "
+        "AND builds.target = tft_test_runs.target"
+    )
+
+    bind = op.get_bind()
+    this_month = date.today().replace(day=1)
+    for table, (partition_key, foreign_keys, indexes, _) in TABLES.items():
+        # e.g. the test runs without a Copr build
+        backfill_submitted_time(table, partition_key)
+        oldest = bind.execute(f"SELECT min({partition_key}) FROM {table}").scalar()
+
+        replace_table(table, partition_by=partition_key)
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {partition_key} SET NOT NULL")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        month = oldest.date().replace(day=1) if oldest else this_month
+        # not a partition per month since the epoch, anything older is in the default one
+        month = max(month, date(2019, 1, 1))
+        while month <= add_months(this_month, MONTHS_AHEAD):
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year}m{month.month:02} "
+                f"PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+            month = add_months(month, 1)
+        copy_and_drop_old_table(table)
+
+        # the partition key has to be a part of the primary key
+        op.create_primary_key(f"{table}_pkey", table, ["id", partition_key])
+        create_constraints(table, foreign_keys, indexes)
+
+
+def downgrade():
+    for table, (_, foreign_keys, indexes, unique) in TABLES.items():
+        replace_table(table)
+        # detached partitions are not moved back
+        copy_and_drop_old_table(table)
+
+        op.create_primary_key(f"{table}_pkey", table, ["id"])
+        create_constraints(
+            table,
+            foreign_keys,
+            {name: columns for name, columns in indexes.items() if columns != unique},
+        )
+        if unique:
+            op.create_unique_constraint(
+                f"{table}_{'_'.join(unique)}_key", table, unique
+            )
+
+    op.drop_column("tft_test_runs", "submitted_time")
@@ -0,0 +1,103 @@
+"""Unique constraints for upserts
+
+Revision ID: a4c3f1b2e9d8
+Revises: 7a43773ac926
+Create Date: 2020-06-22 10:12:45.318902
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a4c3f1b2e9d8"
+down_revision = "7a43773ac926"
+branch_labels = None
+depends_on = None
+
+# table -> columns of the unique constraint
+UNIQUE_CONSTRAINTS = {
+    "git_projects": ["namespace", "repo_name", "project_url"],
+    "pull_requests": ["project_id", "pr_id"],
+    "project_issues": ["project_id", "issue_id"],
+    "git_branches": ["project_id", "name"],
+    "project_releases": ["project_id", "tag_name"],
+    "build_triggers": ["type", "trigger_id"],
+    "copr_builds": ["build_id", "target"],
+    "koji_builds": ["build_id", "target"],
+}
+
+# table -> (referencing table, referencing column, condition)
+REFERENCES = {
+    "git_projects": [
+        ("pull_requests", "project_id", None),
+        ("project_issues", "project_id", None),
+        ("git_branches", "project_id", None),
+        ("project_releases", "project_id", None),
+    ],
+    "pull_requests": [
+        ("bugzillas", "pull_request_id", None),
+        ("build_triggers", "trigger_id", "type = 'pull_request'"),
+    ],
+    "project_issues": [("build_triggers", "trigger_id", "type = 'issue'")],
+    "git_branches": [("build_triggers", "trigger_id", "type = 'branch_push'")],
+    "project_releases": [("build_triggers", "trigger_id", "type = 'release'")],
+    "build_triggers": [
+        ("copr_builds", "job_trigger_id", None),
+        ("koji_builds", "job_trigger_id", None),
+        ("tft_test_runs", "job_trigger_id", None),
+    ],
+    "copr_builds": [],
+    "koji_builds": [],
+}
+
+
+def constraint_name(table: str) -> str:
+    return f"{table}_{'_'.join(UNIQUE_CONSTRAINTS[table])}_key"
+
+
+def merge_duplicates(table: str):
+    """
+    The rows were created by racing workers, so there can be duplicates:
+    point everything to the oldest of them and remove the rest.
+    """
+    columns = UNIQUE_CONSTRAINTS[table]
+    # the unique constraint allows more rows with NULL in any of the columns,
+    # they are not duplicates (but PARTITION BY would group the NULLs together)
+    duplicates = (
+        f"(SELECT id, min(id) OVER (PARTITION BY {', '.join(columns)})"
+        f" AS original_id FROM {table}"
+        f" WHERE {' AND '.join(f'{column} IS NOT NULL' for column in columns)})"
+        f" AS duplicates"
+    )
+    for referencing_table, column, condition in REFERENCES[table]:
+        op.execute(
+            f"UPDATE {referencing_table} SET {column} = duplicates.original_id "
+            f"FROM {duplicates} "
+            f"WHERE {referencing_table}.{column} = duplicates.id "
+            f"AND duplicates.id != duplicates.original_id"
+            + (f" AND {referencing_table}.{condition}" if condition else "")
+        )
+    if table == "git_projects":
+        op.execute(
+            "UPDATE github_installations SET repositories = ARRAY("
+            "SELECT coalesce(duplicates.original_id, repository.id) "
+            "FROM unnest(repositories) WITH ORDINALITY AS repository(id, position) "
+            f"LEFT JOIN {duplicates} ON duplicates.id = repository.id "
+            "ORDER BY repository.position)"
+        )
+    op.execute(
+        f"DELETE FROM {table} USING {duplicates} "
+        f"WHERE {table}.id = duplicates.id AND duplicates.id != duplicates.original_id"
+    )
+
+
+def upgrade():
+    # the order matters: the merged triggers need to have their projects merged already
+    for table, columns in UNIQUE_CONSTRAINTS.items():
+        merge_duplicates(table)
+        op.create_unique_constraint(constraint_name(table), table, columns)
+
+
+def downgrade():
+    for table in reversed(list(UNIQUE_CONSTRAINTS)):
+        op.drop_constraint(constraint_name(table), table, type_="unique")
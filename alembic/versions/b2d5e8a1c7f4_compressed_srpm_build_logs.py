@@ -0,0 +1,92 @@
+"""Move SRPM build logs to a separate table and compress them
+
+Revision ID: b2d5e8a1c7f4
+Revises: a4c3f1b2e9d8
+Create Date: 2020-06-29 14:03:51.472816
+
+"""
+import gzip
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b2d5e8a1c7f4"
+down_revision = "a4c3f1b2e9d8"
+branch_labels = None
+depends_on = None
+
+# how many rows are moved at once, the logs can be big
+BATCH_SIZE = 100
+
+srpm_builds = sa.table(
+    "srpm_builds", sa.column("id", sa.Integer), sa.column("logs", sa.Text)
+)
+srpm_build_logs = sa.table(
+    "srpm_build_logs",
+    sa.column("srpm_build_id", sa.Integer),
+    sa.column("logs", sa.LargeBinary),
+)
+
+
+def _batches(bind, query):
+    last_id = 0
+    while True:
+        rows = bind.execute(query(last_id).limit(BATCH_SIZE)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    op.create_table(
+        "srpm_build_logs",
+        sa.Column("srpm_build_id", sa.Integer(), nullable=False),
+        sa.Column("logs", sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["srpm_build_id"], ["srpm_builds.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("srpm_build_id"),
+    )
+
+    bind = op.get_bind()
+    for rows in _batches(
+        bind,
+        lambda last_id: sa.select([srpm_builds.c.id, srpm_builds.c.logs])
+        .where(srpm_builds.c.id > last_id)
+        .where(srpm_builds.c.logs.isnot(None))
+        .order_by(srpm_builds.c.id),
+    ):
+        bind.execute(
+            srpm_build_logs.insert(),
+            [
+                {"srpm_build_id": id_, "logs": gzip.compress(logs.encode("utf-8"))}
+                for id_, logs in rows
+            ],
+        )
+
+    op.drop_column("srpm_builds", "logs")
+
+
+def downgrade():
+    op.add_column("srpm_builds", sa.Column("logs", sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    for rows in _batches(
+        bind,
+        lambda last_id: sa.select(
+            [srpm_build_logs.c.srpm_build_id, srpm_build_logs.c.logs]
+        )
+        .where(srpm_build_logs.c.srpm_build_id > last_id)
+        .where(srpm_build_logs.c.logs.isnot(None))
+        .order_by(srpm_build_logs.c.srpm_build_id),
+    ):
+        for id_, logs in rows:
+            bind.execute(
+                srpm_builds.update()
+                .where(srpm_builds.c.id == id_)
+                .values(logs=gzip.decompress(logs).decode("utf-8", errors="replace"))
+            )
+
+    op.drop_table("srpm_build_logs")
@@ -0,0 +1,162 @@
+"""Store task results as JSONB
+
+Revision ID: e3f7a9c2d4b6
+Revises: b2d5e8a1c7f4
+Create Date: 2020-07-01 09:27:03.915374
+
+"""
+import json
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "e3f7a9c2d4b6"
+down_revision = "b2d5e8a1c7f4"
+branch_labels = None
+depends_on = None
+
+# how many rows are converted at once
+BATCH_SIZE = 500
+
+pickled_task_results = sa.table(
+    "task_results",
+    sa.column("task_id", sa.String),
+    sa.column("jobs", sa.PickleType),
+    sa.column("event", sa.PickleType),
+)
+json_task_results = sa.table(
+    "task_results",
+    sa.column("task_id", sa.String),
+    sa.column("jobs", postgresql.JSONB),
+    sa.column("event", postgresql.JSONB),
+    sa.column("jobs_json", postgresql.JSONB),
+    sa.column("event_json", postgresql.JSONB),
+    sa.column("jobs_pickle", sa.PickleType),
+    sa.column("event_pickle", sa.PickleType),
+    sa.column("event_type", sa.String),
+    sa.column("date_created", sa.DateTime),
+)
+
+
+def _batches(bind, columns):
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(columns)
+            .where(columns[0] > last_id)
+            .order_by(columns[0])
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _to_json(value):
+    # whatever was pickled (e.g. datetime) has to end up JSON serializable
+    return json.loads(json.dumps(value, default=str))
+
+
+def _date_created(event) -> datetime:
+    created_at = event.get("created_at") if isinstance(event, dict) else None
+    try:
+        if isinstance(created_at, (int, float)):
+            return datetime.fromtimestamp(created_at, timezone.utc).replace(tzinfo=None)
+        if isinstance(created_at, str):
+            return datetime.fromisoformat(created_at.replace("Z", "+00:00")).replace(
+                tzinfo=None
+            )
+    except (ValueError, OverflowError):
+        pass
+    return datetime.utcnow()
+
+
+def upgrade():
+    op.add_column(
+        "task_results", sa.Column("jobs_json", postgresql.JSONB(), nullable=True)
+    )
+    op.add_column(
+        "task_results", sa.Column("event_json", postgresql.JSONB(), nullable=True)
+    )
+    op.add_column("task_results", sa.Column("event_type", sa.String(), nullable=True))
+    op.add_column(
+        "task_results", sa.Column("date_created", sa.DateTime(), nullable=True)
+    )
+
+    bind = op.get_bind()
+    for rows in _batches(
+        bind,
+        [
+            pickled_task_results.c.task_id,
+            pickled_task_results.c.jobs,
+            pickled_task_results.c.event,
+        ],
+    ):
+        for task_id, jobs, event in rows:
+            bind.execute(
+                json_task_results.update()
+                .where(json_task_results.c.task_id == task_id)
+                .values(
+                    jobs_json=_to_json(jobs),
+                    event_json=_to_json(event),
+                    event_type=event.get("event_type")
+                    if isinstance(event, dict)
+                    else None,
+                    date_created=_date_created(event),
+                )
+            )
+
+    op.drop_column("task_results", "jobs")
+    op.drop_column("task_results", "event")
+    op.alter_column("task_results", "jobs_json", new_column_name="jobs")
+    op.alter_column("task_results", "event_json", new_column_name="event")
+    op.create_index(
+        op.f("ix_task_results_date_created"),
+        "task_results",
+        ["date_created"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_results_event_type_date_created",
+        "task_results",
+        ["event_type", "date_created"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_task_results_event_type_date_created", table_name="task_results")
+    op.drop_index(op.f("ix_task_results_date_created"), table_name="task_results")
+    op.add_column(
+        "task_results", sa.Column("jobs_pickle", sa.LargeBinary(), nullable=True)
+    )
+    op.add_column(
+        "task_results", sa.Column("event_pickle", sa.LargeBinary(), nullable=True)
+    )
+
+    bind = op.get_bind()
+    for rows in _batches(
+        bind,
+        [
+            json_task_results.c.task_id,
+            json_task_results.c.jobs,
+            json_task_results.c.event,
+        ],
+    ):
+        for task_id, jobs, event in rows:
+            bind.execute(
+                json_task_results.update()
+                .where(json_task_results.c.task_id == task_id)
+                .values(jobs_pickle=jobs, event_pickle=event)
+            )
+
+    op.drop_column("task_results", "date_created")
+    op.drop_column("task_results", "event_type")
+    op.drop_column("task_results", "jobs")
+    op.drop_column("task_results", "event")
+    op.alter_column("task_results", "jobs_pickle", new_column_name="jobs")
+    op.alter_column("task_results", "event_pickle", new_column_name="event")
@@ -22,7 +22,29 @@ install -m 0400 /packit-ssh/config .
 grep -q pkgs.fedoraproject.org known_hosts || ssh-keyscan pkgs.fedoraproject.org >>known_hosts
 popd
 
+# Metrics of all the worker processes are collected here and served on $METRICS_PORT
+if [[ -n ${METRICS_PORT} ]]; then
+  export prometheus_multiproc_dir="${prometheus_multiproc_dir:-/tmp/prometheus-metrics}"
+  rm -rf "${prometheus_multiproc_dir}"
+  mkdir -p "${prometheus_multiproc_dir}"
+fi
+
+# Queues (see CeleryTaskQueue in packit_service/constants.py) this worker consumes:
+#   short: parsing of the events, status callbacks, installations - many quick tasks
+#   long: SRPM/Copr/Koji build submission and testing - run for minutes
+#   sync: propose-downstream, sync from dist-git
+# Run separate workers per queue to not let the quick tasks wait behind the long ones,
+# e.g. QUEUES=short CONCURRENCY=4 and QUEUES=long,sync CONCURRENCY=1.
+QUEUES="${QUEUES:-short,long,sync}"
+CONCURRENCY="${CONCURRENCY:-1}"
+
+# Periodic tasks (e.g. checking of the pending Copr builds, see packit_service/worker/tasks.py)
+# are scheduled by the embedded beat, run it in exactly one of the workers (BEAT=true).
+if [[ ${BEAT} == "true" ]]; then
+  BEAT_OPTIONS="--beat --schedule=/tmp/celerybeat-schedule"
+fi
+
 # concurrency: Number of concurrent worker processes/threads/green threads executing tasks.
 # prefetch-multiplier: How many messages to prefetch at a time multiplied by the number of concurrent processes.
 # http://docs.celeryproject.org/en/latest/userguide/optimizing.html#prefetch-limits
-exec celery worker --app="${APP}" --loglevel=${LOGLEVEL} --concurrency=1 --prefetch-multiplier=1
+exec celery worker --app="${APP}" --loglevel=${LOGLEVEL} --queues="${QUEUES}" --concurrency="${CONCURRENCY}" --prefetch-multiplier=1 ${BEAT_OPTIONS}
@@ -0,0 +1,150 @@
+"""
+Compare how long it takes to find the handlers (and their job configs) for an event
+when we walk all the jobs for every handler and when we use the precomputed index.
+
+$ python3 files/scripts/handler_routing_benchmark.py --iterations 1000
+"""
+import logging
+import warnings
+from timeit import timeit
+
+import click
+from flexmock import flexmock
+from packit.config import JobConfig, JobConfigTriggerType, JobType
+from packit.config.job_config import JobMetadataConfig
+
+from packit_service.service.events import TheJobTriggerType
+from packit_service.trigger_mapping import (
+    are_job_types_same,
+    is_trigger_matching_job_config,
+)
+from packit_service.worker.handlers.abstract import (
+    MAP_EVENT_TRIGGER_TO_HANDLERS,
+    MAP_HANDLER_TO_JOB_TYPES,
+    MAP_REQUIRED_JOB_TO_HANDLERS,
+)
+from packit_service.worker.jobs import JobPlan
+
+JOB_KINDS = (
+    (JobType.copr_build, JobConfigTriggerType.pull_request),
+    (JobType.tests, JobConfigTriggerType.pull_request),
+    (JobType.production_build, JobConfigTriggerType.pull_request),
+    (JobType.copr_build, JobConfigTriggerType.commit),
+    (JobType.propose_downstream, JobConfigTriggerType.release),
+)
+
+
+def get_handlers_walking(event, package_config):
+    """ The original way of get_handlers_for_event. """
+    handlers = set()
+    classes_for_trigger = MAP_EVENT_TRIGGER_TO_HANDLERS[event.trigger]
+    for job in package_config.jobs:
+        if (
+            event.db_trigger and event.db_trigger.job_config_trigger_type == job.trigger
+        ) or is_trigger_matching_job_config(trigger=event.trigger, job_config=job):
+            for pos_handler in classes_for_trigger:
+                if job.type in MAP_HANDLER_TO_JOB_TYPES[pos_handler]:
+                    handlers.add(pos_handler)
+        for pos_handler in MAP_REQUIRED_JOB_TO_HANDLERS[job.type]:
+            for trigger in pos_handler.triggers:
+                if trigger == event.trigger:
+                    handlers.add(pos_handler)
+    return handlers
+
+
+def get_config_walking(handler_kls, event, package_config):
+    """ The original way of get_config_for_handler_kls. """
+    matching_jobs = []
+    jobs_that_can_be_triggered = [
+        job
+        for job in package_config.jobs
+        if (
+            event.db_trigger and event.db_trigger.job_config_trigger_type == job.trigger
+        )
+        or is_trigger_matching_job_config(trigger=event.trigger, job_config=job)
+    ]
+    matching_job_types = MAP_HANDLER_TO_JOB_TYPES[handler_kls]
+    for job in jobs_that_can_be_triggered:
+        if (
+            any(are_job_types_same(job.type, type) for type in matching_job_types)
+            and job not in matching_jobs
+        ):
+            matching_jobs.append(job)
+    if matching_jobs:
+        return matching_jobs
+    for job in jobs_that_can_be_triggered:
+        if handler_kls in MAP_REQUIRED_JOB_TO_HANDLERS[job.type]:
+            for trigger in handler_kls.triggers:
+                if is_trigger_matching_job_config(trigger=trigger, job_config=job) and (
+                    job not in matching_jobs
+                ):
+                    matching_jobs.append(job)
+    return matching_jobs
+
+
+def route_walking(event, package_config):
+    return {
+        handler_kls: get_config_walking(handler_kls, event, package_config)
+        for handler_kls in get_handlers_walking(event, package_config)
+    }
+
+
+def route_planned(event, package_config):
+    plan = JobPlan(event, package_config)
+    return {
+        handler_kls: plan.get_job_configs(handler_kls) for handler_kls in plan.handlers
+    }
+
+
+@click.command()
+@click.option("--iterations", default=1000, help="How many times to route each event")
+def run(iterations):
+    logging.disable(logging.CRITICAL)
+    # is_trigger_matching_job_config is deprecated
+    warnings.simplefilter("ignore")
+
+    print(
+        f"{'jobs':>5} {'trigger':<22} {'walking [us]':>13} {'index [us]':>11} {'speedup':>8}"
+    )
+    for job_count in (5, 20, 100):
+        jobs = [
+            JobConfig(
+                type=job_type,
+                trigger=trigger,
+                metadata=JobMetadataConfig(targets=[f"fedora-{i}-x86_64"]),
+            )
+            for i in range(job_count // len(JOB_KINDS))
+            for job_type, trigger in JOB_KINDS
+        ]
+        package_config = flexmock(jobs=jobs)
+        for trigger, job_config_trigger in (
+            (TheJobTriggerType.pull_request, None),
+            (TheJobTriggerType.copr_end, JobConfigTriggerType.pull_request),
+            (TheJobTriggerType.release, None),
+        ):
+            db_trigger = (
+                flexmock(job_config_trigger_type=job_config_trigger)
+                if job_config_trigger
+                else None
+            )
+            event = flexmock(trigger=trigger, db_trigger=db_trigger)
+            assert route_walking(event, package_config) == route_planned(
+                event, package_config
+            )
+
+            walking = (
+                timeit(lambda: route_walking(event, package_config), number=iterations)
+                / iterations
+            )
+            planned = (
+                timeit(lambda: route_planned(event, package_config), number=iterations)
+                / iterations
+            )
+            print(
+                f"{job_count:>5} {trigger.value:<22} {walking * 10**6:>13.1f} "
+                f"{planned * 10**6:>11.1f} {walking / planned:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,103 @@
+"""
+Compare how long it takes to parse the events we have in tests/data
+when we try all the parsers one by one and when we pick them by the kind of the event.
+
+$ python3 files/scripts/parser_benchmark.py --iterations 1000
+"""
+import json
+import logging
+from pathlib import Path
+from timeit import timeit
+from typing import Optional
+
+import click
+
+from packit_service.constants import TESTING_FARM_RESULTS_EVENT_TYPE
+from packit_service.models import CoprBuildModel
+from packit_service.worker.parser import Parser, ALL_PARSERS
+
+DATA_DIR = Path(__file__).parent.parent.parent / "tests" / "data"
+
+# the payloads are stored without the headers, so this is what the webhooks would send us
+EVENT_TYPES = {
+    "webhooks/github/installation_added.json": "installation_repositories",
+    "webhooks/github/installation_created.json": "installation",
+    "webhooks/github/issue_comment_packit_only.json": "issue_comment",
+    "webhooks/github/issue_comment_wrong_packit_command.json": "issue_comment",
+    "webhooks/github/issue_propose_update.json": "issue_comment",
+    "webhooks/github/pr.json": "pull_request",
+    "webhooks/github/pr_comment_build.json": "issue_comment",
+    "webhooks/github/pr_comment_copr_build.json": "issue_comment",
+    "webhooks/github/pr_comment_embedded_command.json": "issue_comment",
+    "webhooks/github/pr_comment_empty.json": "issue_comment",
+    "webhooks/github/push.json": "push",
+    "webhooks/github/push_branch.json": "push",
+    "webhooks/github/release.json": "release",
+    "webhooks/copr_build/pr_comment.json": "issue_comment",
+    "webhooks/copr_build/pr_comment_not_collaborator.json": "issue_comment",
+    "webhooks/copr_build/pr_synchronize.json": "pull_request",
+    "webhooks/gitlab/issue_comment.json": "Note Hook",
+    "webhooks/gitlab/mr_comment.json": "Note Hook",
+    "webhooks/gitlab/mr_event.json": "Merge Request Hook",
+    "webhooks/gitlab/mr_update_event.json": "Merge Request Hook",
+    "webhooks/gitlab/push_branch.json": "Push Hook",
+    "webhooks/gitlab/push_with_many_commits.json": "Push Hook",
+    "webhooks/gitlab/push_with_one_commit.json": "Push Hook",
+    "webhooks/testing_farm/results.json": TESTING_FARM_RESULTS_EVENT_TYPE,
+    "webhooks/testing_farm/results_error.json": TESTING_FARM_RESULTS_EVENT_TYPE,
+    # fedmsg messages are routed by their topic
+    "fedmsg/copr_build_end.json": None,
+    "fedmsg/copr_build_start.json": None,
+    "fedmsg/distgit_commit.json": None,
+    "fedmsg/koji_build_scratch_end.json": None,
+    "fedmsg/koji_build_scratch_start.json": None,
+}
+
+
+def probe_all(event: dict):
+    """ The original way: try the parsers one by one until one of them succeeds. """
+    for parser in ALL_PARSERS:
+        response = parser(event)
+        if response:
+            return response
+    return None
+
+
+def parse_routed(event: dict, event_type: Optional[str]):
+    return Parser.parse_event(event, event_type=event_type)
+
+
+@click.command()
+@click.option("--iterations", default=1000, help="How many times to parse each event")
+def run(iterations):
+    # parsing is chatty and we don't want to measure the logging
+    logging.disable(logging.CRITICAL)
+    # copr events look up the build in the DB, which is the same for both ways
+    # and we don't want to need a database here
+    CoprBuildModel.get_by_build_id = classmethod(lambda cls, *args, **kwargs: None)
+
+    print(f"{'event':<55} {'probe all [us]':>15} {'routed [us]':>12} {'speedup':>8}")
+    total_probe = total_routed = 0.0
+    for path, event_type in EVENT_TYPES.items():
+        event = json.loads((DATA_DIR / path).read_text())
+
+        probe = timeit(lambda: probe_all(event), number=iterations) / iterations
+        routed = (
+            timeit(lambda: parse_routed(event, event_type), number=iterations)
+            / iterations
+        )
+        total_probe += probe
+        total_routed += routed
+        print(
+            f"{path:<55} {probe * 10**6:>15.1f} {routed * 10**6:>12.1f} "
+            f"{probe / routed:>7.1f}x"
+        )
+
+    print(
+        f"{'total':<55} {total_probe * 10**6:>15.1f} {total_routed * 10**6:>12.1f} "
+        f"{total_probe / total_routed:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    run()
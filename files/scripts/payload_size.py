@@ -0,0 +1,37 @@
+"""
+Show how much smaller the webhook payloads from tests/data/webhooks get
+when we keep only the fields the parsers need.
+
+$ python3 files/scripts/payload_size.py
+"""
+import json
+
+import click
+
+from packit_service.service.payload import slim_payload
+from parser_benchmark import DATA_DIR, EVENT_TYPES
+
+
+@click.command()
+def run():
+    print(f"{'event':<55} {'full [B]':>9} {'slim [B]':>9} {'saved':>6}")
+    total_full = total_slim = 0
+    for path, event_type in EVENT_TYPES.items():
+        if not path.startswith("webhooks/"):
+            continue
+        payload = json.loads((DATA_DIR / path).read_text())
+
+        full = len(json.dumps(payload))
+        slim = len(json.dumps(slim_payload(payload, event_type)))
+        total_full += full
+        total_slim += slim
+        print(f"{path:<55} {full:>9} {slim:>9} {1 - slim / full:>6.0%}")
+
+    print(
+        f"{'total':<55} {total_full:>9} {total_slim:>9} "
+        f"{1 - total_slim / total_full:>6.0%}"
+    )
+
+
+if __name__ == "__main__":
+    run()
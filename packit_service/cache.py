@@ -0,0 +1,183 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Caches shared by the service and the workers.
+"""
+import json
+import logging
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+from time import monotonic
+from typing import Any, Hashable, Optional
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Redis client, get it with `get_redis`
+redis_instance = None
+
+# default for the cache lookups where None is a valid value
+MISSING = object()
+
+
+def get_redis_url() -> str:
+    """ create redis connection string """
+    password = getenv("REDIS_PASSWORD", "")
+    host = getenv("REDIS_SERVICE_HOST", "redis")
+    port = getenv("REDIS_SERVICE_PORT", "6379")
+    db = getenv("REDIS_SERVICE_DB", "0")
+    return f"redis://:{password}@{host}:{port}/{db}"
+
+
+def caches_enabled() -> bool:
+    """
+    The caches (and the shared rate limiter) can be turned off
+    with CACHES=disabled in the environment, e.g. in the tests or for debugging.
+    Disable them in all the processes, nothing is invalidated then either.
+    """
+    return getenv("CACHES", "enabled") != "disabled"
+
+
+def get_redis() -> Redis:
+    """ get Redis client (it's created on the first call) """
+    global redis_instance
+    if redis_instance is None:
+        redis_instance = Redis.from_url(get_redis_url())
+    return redis_instance
+
+
+class TTLCache:
+    """
+    In-process LRU cache with a bounded size where the items expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (expiration time, value), the least recently used first
+        self._items: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._items[key] = (monotonic() + (ttl or self.ttl), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SharedTTLCache:
+    """
+    TTLCache in front of Redis, so that the values are shared by all the processes.
+
+    The values have to be JSON-serializable, None is a valid (cached) value.
+    If Redis is not available, only the in-process cache is used.
+    Nothing is cached if the caches are disabled (see `caches_enabled`).
+
+    Values deleted by other processes are still returned from the in-process
+    cache for up to `local_ttl` seconds.
+    """
+
+    def __init__(
+        self, name: str, max_size: int, ttl: int, local_ttl: Optional[int] = None
+    ):
+        self.name = name
+        self.ttl = ttl
+        self._local = TTLCache(max_size=max_size, ttl=local_ttl or ttl)
+
+    def _redis_key(self, key: str) -> str:
+        return f"packit-service:{self.name}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not caches_enabled():
+            return default
+
+        value = self._local.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        try:
+            raw_value = get_redis().get(self._redis_key(key))
+        except RedisError as ex:
+            logger.warning(f"Can't get {key} from the {self.name} cache: {ex!r}")
+            return default
+        if raw_value is None:
+            return default
+
+        value = json.loads(raw_value)
+        self._local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if not caches_enabled():
+            return
+
+        self._local.set(key, value)
+        try:
+            get_redis().set(self._redis_key(key), json.dumps(value), ex=self.ttl)
+        except RedisError as ex:
+            logger.warning(f"Can't store {key} to the {self.name} cache: {ex!r}")
+
+    def delete(self, key: str) -> None:
+        if not caches_enabled():
+            return
+
+        self._local.pop(key)
+        try:
+            get_redis().delete(self._redis_key(key))
+        except RedisError as ex:
+            logger.warning(f"Can't delete {key} from the {self.name} cache: {ex!r}")
+
+    def clear_local(self) -> None:
+        """ Forget the values cached in this process. """
+        self._local.clear()
@@ -25,6 +25,8 @@ from os import getenv
 from celery import Celery
 from lazy_object_proxy import Proxy
 
+from packit_service.cache import get_redis_url
+from packit_service.constants import CeleryTaskQueue
 from packit_service.models import get_pg_url
 from packit_service.sentry_integration import configure_sentry
 
@@ -36,17 +38,21 @@ class Celerizer:
     @property
     def celery_app(self):
         if self._celery_app is None:
-            password = getenv("REDIS_PASSWORD", "")
-            host = getenv("REDIS_SERVICE_HOST", "redis")
-            port = getenv("REDIS_SERVICE_PORT", "6379")
-            db = getenv("REDIS_SERVICE_DB", "0")
-            redis_url = f"redis://:{password}@{host}:{port}/{db}"
+            redis_url = get_redis_url()
 
-            # https://docs.celeryproject.org/en/stable/userguide/configuration.html#database-url-examples
-            postgres_url = f"db+{get_pg_url()}"
+            # the results we care about are stored in task_results (TaskResultModel),
+            # CELERY_RESULT_BACKEND=disabled turns off storing them once more by Celery
+            if getenv("CELERY_RESULT_BACKEND", "postgres") == "disabled":
+                backend = None
+            else:
+                # https://docs.celeryproject.org/en/stable/userguide/configuration.html#database-url-examples
+                backend = f"db+{get_pg_url()}"
 
             # http://docs.celeryproject.org/en/latest/reference/celery.html#celery.Celery
-            self._celery_app = Celery(backend=postgres_url, broker=redis_url)
+            self._celery_app = Celery(backend=backend, broker=redis_url)
+            self._celery_app.conf.task_ignore_result = backend is None
+            # tasks without a route (see packit_service/worker/tasks.py) are quick
+            self._celery_app.conf.task_default_queue = CeleryTaskQueue.short.value
         return self._celery_app
 
 
@@ -22,8 +22,9 @@
 import enum
 import logging
 from pathlib import Path
-from typing import Set, Optional, List
+from typing import Set, Optional, List, Tuple
 
+from prometheus_client import Counter
 from yaml import safe_load
 
 from ogr.abstract import GitProject
@@ -34,13 +35,24 @@ from packit.config import (
     PackageConfig,
 )
 from packit.exceptions import PackitException, PackitConfigException
+from packit_service.cache import MISSING, SharedTTLCache
 from packit_service.constants import (
     SANDCASTLE_WORK_DIR,
     SANDCASTLE_PVC,
     SANDCASTLE_IMAGE,
     SANDCASTLE_DEFAULT_PROJECT,
     CONFIG_FILE_NAME,
+    PACKAGE_CONFIG_CACHE_SIZE,
+    PACKAGE_CONFIG_CACHE_TTL,
+    TASK_RESULTS_RETENTION_DAYS,
+    PARTITION_RETENTION_MONTHS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_REPLICA_MAX_LAG,
 )
+from packit_service.rate_limit import RateLimitedProject, rate_limiter
+from packit_service.utils import dump_package_config, load_package_config
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +78,14 @@ class ServiceConfig(Config):
         bugzilla_api_key: str = "",
         pr_accepted_labels: List[str] = None,
         gitlab_webhook_tokens: List[str] = None,
+        task_results_retention_days: int = TASK_RESULTS_RETENTION_DAYS,
+        partition_retention_months: int = PARTITION_RETENTION_MONTHS,
+        db_pool_size: int = DB_POOL_SIZE,
+        db_max_overflow: int = DB_MAX_OVERFLOW,
+        db_pool_recycle: int = DB_POOL_RECYCLE,
+        db_pool_pre_ping: bool = True,
+        db_use_null_pool: bool = False,
+        db_replica_max_lag: int = DB_REPLICA_MAX_LAG,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -93,6 +113,24 @@ class ServiceConfig(Config):
         # Makeshift for now to authenticate webhooks coming from gitlab instances
         self.gitlab_webhook_tokens: Set[str] = set(gitlab_webhook_tokens or [])
 
+        # task results (TaskResultModel) older than this are deleted, 0 = keep them forever
+        self.task_results_retention_days = task_results_retention_days
+
+        # partitions of the builds and test runs older than this are detached (archived),
+        # 0 = keep them all
+        self.partition_retention_months = partition_retention_months
+
+        # connection pool to the DB of every process
+        self.db_pool_size = db_pool_size
+        self.db_max_overflow = db_max_overflow
+        self.db_pool_recycle = db_pool_recycle
+        self.db_pool_pre_ping = db_pool_pre_ping
+        # don't pool the connections at all, e.g. when there's PgBouncer in transaction mode
+        self.db_use_null_pool = db_use_null_pool
+        # seconds the read replica can lag behind the primary,
+        # otherwise the API reads from the primary
+        self.db_replica_max_lag = db_replica_max_lag
+
     def __repr__(self):
         def hide(token: str) -> str:
             return f"{token[:1]}***{token[-1:]}" if token else ""
@@ -109,9 +147,22 @@ class ServiceConfig(Config):
             f"bugzilla_url='{self.bugzilla_url}', "
             f"bugzilla_api_key='{hide(self.bugzilla_api_key)}', "
             f"gitlab_webhook_tokens='{self.gitlab_webhook_tokens}',"
+            f"task_results_retention_days='{self.task_results_retention_days}',"
+            f"partition_retention_months='{self.partition_retention_months}',"
+            f"db_pool_size='{self.db_pool_size}',"
+            f"db_max_overflow='{self.db_max_overflow}',"
+            f"db_pool_recycle='{self.db_pool_recycle}',"
+            f"db_pool_pre_ping='{self.db_pool_pre_ping}',"
+            f"db_use_null_pool='{self.db_use_null_pool}',"
+            f"db_replica_max_lag='{self.db_replica_max_lag}',"
             f"server_name='{self.server_name}')"
         )
 
+    def _get_project(self, url: str, get_project_kwargs: dict = None) -> GitProject:
+        # all the workers share the API budget of the forge
+        project = super()._get_project(url, get_project_kwargs)
+        return RateLimitedProject(project, rate_limiter)
+
     @classmethod
     def get_from_dict(cls, raw_dict: dict) -> "ServiceConfig":
         # required to avoid circular imports
@@ -159,6 +210,17 @@ class ServiceConfig(Config):
         return cls.service_config
 
 
+# (project_url, commit_sha, spec_file_path) -> dumped package config or None if missing
+package_config_cache = SharedTTLCache(
+    "package-config", max_size=PACKAGE_CONFIG_CACHE_SIZE, ttl=PACKAGE_CONFIG_CACHE_TTL
+)
+package_config_cache_lookups = Counter(
+    "package_config_cache_lookups",
+    "Number of times the package config was looked up in the cache",
+    ["result"],
+)
+
+
 class PackageConfigGetter:
     @staticmethod
     def get_package_config_from_repo(
@@ -212,3 +274,34 @@ class PackageConfigGetter:
                     logger.debug(f"Created issue for invalid packit config: {i.url}")
             raise ex
         return package_config
+
+    @staticmethod
+    def get_cached_package_config(
+        project_url: str, commit_sha: str, spec_file_path: Optional[str] = None
+    ) -> Tuple[bool, Optional[PackageConfig]]:
+        """
+        Get the package config for the commit if we have already loaded it.
+
+        :return: (True, package config or None if there is no config in the repo)
+                 or (False, None) if it's not cached
+        """
+        cached = package_config_cache.get(
+            f"{project_url}:{commit_sha}:{spec_file_path}", MISSING
+        )
+        if cached is MISSING:
+            package_config_cache_lookups.labels(result="miss").inc()
+            return False, None
+        package_config_cache_lookups.labels(result="hit").inc()
+        return True, load_package_config(cached)
+
+    @staticmethod
+    def cache_package_config(
+        project_url: str,
+        commit_sha: str,
+        package_config: Optional[PackageConfig],
+        spec_file_path: Optional[str] = None,
+    ) -> None:
+        package_config_cache.set(
+            f"{project_url}:{commit_sha}:{spec_file_path}",
+            dump_package_config(package_config),
+        )
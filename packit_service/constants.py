@@ -1,3 +1,4 @@
+from datetime import timedelta
 from enum import Enum
 
 FAQ_URL = "https://packit.dev/packit-as-a-service/#faq"
@@ -11,6 +12,81 @@ CONFIG_FILE_NAME = "packit-service.yaml"
 TESTING_FARM_TRIGGER_URL = (
     "https://scheduler-testing-farm.apps.ci.centos.org/v0/trigger"
 )
+# how many targets we submit to the testing farm at once
+TESTING_FARM_SUBMIT_CONCURRENCY = 8
+# how long (in seconds) and how many webhook deliveries we remember to drop the duplicates
+WEBHOOK_DEDUPLICATION_TTL = 60 * 60
+WEBHOOK_DEDUPLICATION_CACHE_SIZE = 10000
+
+# package configs are cached per commit, so they can be kept for long
+PACKAGE_CONFIG_CACHE_TTL = 6 * 60 * 60
+PACKAGE_CONFIG_CACHE_SIZE = 1000
+
+# how long (in seconds) and for how many checks we remember the commit status we have set
+COMMIT_STATUS_CACHE_TTL = 60 * 60
+COMMIT_STATUS_CACHE_SIZE = 10000
+
+# connections kept open to each remote host by a worker process and for how long (in seconds)
+# the unused sessions/clients are kept
+HTTP_POOL_SIZE = 10
+HTTP_POOL_IDLE_TIMEOUT = 5 * 60
+
+# how long (in seconds) we remember whether the account is whitelisted
+# (in the process: changes made by other processes are seen after WHITELIST_CACHE_LOCAL_TTL)
+# and that the FAS user signed FPCA (the unsigned ones are asked for again)
+WHITELIST_CACHE_TTL = 60 * 60
+WHITELIST_CACHE_LOCAL_TTL = 60
+WHITELIST_CACHE_SIZE = 10000
+FPCA_CACHE_TTL = 60 * 60
+
+# forge API calls (per namespace) we make at once and per second, across all the workers
+FORGE_API_RATE_LIMIT_BURST = 60
+FORGE_API_RATE_LIMIT_PER_SECOND = 1.0
+# the longest (in seconds) a call waits for the rate limit (twice at most), it fails then
+FORGE_API_RATE_LIMIT_MAX_DELAY = 30
+
+# where (on the local disk of the worker) and how many bytes of the built SRPMs we keep
+SRPM_CACHE_DIR = "/tmp/packit-srpm-cache"
+SRPM_CACHE_SIZE = 2 * 1024 ** 3
+
+# how many bytes of the compressed SRPM logs are decompressed at once when streaming them
+SRPM_LOGS_CHUNK_SIZE = 64 * 1024
+
+# where (on the local disk of the worker) and how many bytes of the upstream git mirrors we keep
+GIT_MIRROR_DIR = "/tmp/packit-git-mirrors"
+GIT_MIRROR_SIZE = 10 * 1024 ** 3
+
+# pending Copr builds are checked periodically, with at most this many requests at a time
+COPR_BABYSIT_INTERVAL = 2 * 60
+COPR_BABYSIT_CONCURRENCY = 10
+# builds which haven't ended by then are not checked anymore, they time out (error)
+COPR_BABYSIT_MAX_AGE = timedelta(days=2)
+
+# task results older than the retention period (days, ServiceConfig.task_results_retention_days)
+# are periodically deleted, this many rows at a time
+TASK_RESULTS_RETENTION_DAYS = 30
+TASK_RESULTS_CLEANUP_INTERVAL = 60 * 60
+TASK_RESULTS_CLEANUP_BATCH_SIZE = 1000
+
+# copr_builds, koji_builds and tft_test_runs are partitioned by month,
+# partitions are created this many months ahead and the ones older than the retention period
+# (months, ServiceConfig.partition_retention_months) are detached
+PARTITIONS_MONTHS_AHEAD = 3
+PARTITION_RETENTION_MONTHS = 0
+PARTITION_MAINTENANCE_INTERVAL = 24 * 60 * 60
+
+# connection pool of every process, can be changed in the service config
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+# seconds, reconnect before PG or a proxy in between closes the idle connection
+DB_POOL_RECYCLE = 30 * 60
+# seconds, the API reads from the read replica (POSTGRES_REPLICA_SERVICE_HOST) unless it lags
+# more than that behind the primary, which is checked at most once per the interval
+DB_REPLICA_MAX_LAG = 30
+DB_REPLICA_CHECK_INTERVAL = 10
+
+# we don't get any header from the testing farm, so this is what we pass to the worker instead
+TESTING_FARM_RESULTS_EVENT_TYPE = "testing_farm_results"
 
 MSG_RETRIGGER = (
     "You can re-trigger build by adding a comment (`/packit {build}`) "
@@ -29,6 +105,7 @@ COPR_API_FAIL_STATE = 2
 
 PG_COPR_BUILD_STATUS_FAILURE = "failure"
 PG_COPR_BUILD_STATUS_SUCCESS = "success"
+PG_COPR_BUILD_STATUS_ERROR = "error"
 
 WHITELIST_CONSTANTS = {
     "approved_automatically": "approved_automatically",
@@ -52,3 +129,17 @@ class KojiBuildState(Enum):
     canceled = "CANCELED"  # 3
     assigned = "ASSIGNED"  # 4
     failed = "FAILED"  # 5
+
+
+class CeleryTaskQueue(str, Enum):
+    """
+    Celery queues, so that the quick tasks don't wait behind the long builds
+    and the worker pools can be sized per queue.
+    """
+
+    # status callbacks, installations, babysitting
+    short = "short"
+    # SRPM, Copr and Koji build submission, testing
+    long = "long"
+    # propose-downstream and sync from dist-git
+    sync = "sync"
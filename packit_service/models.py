@@ -23,13 +23,31 @@
 """
 Data layer on top of PSQL using sqlalch
 """
+import codecs
 import enum
+import gzip
 import logging
 import os
+import re
+import threading
+import time
+import zlib
 from contextlib import contextmanager
 from urllib.parse import urlparse
-from datetime import datetime
-from typing import TYPE_CHECKING, Optional, Union, Iterable, Dict, Type, Any
+from datetime import date, datetime
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Union,
+    Iterable,
+    Iterator,
+    Dict,
+    Type,
+    Any,
+    List,
+    Tuple,
+    TypeVar,
+)
 
 from sqlalchemy import (
     Column,
@@ -37,44 +55,199 @@ from sqlalchemy import (
     String,
     DateTime,
     ForeignKey,
-    Text,
+    LargeBinary,
     Enum,
     desc,
     JSON,
     create_engine,
     func,
     Boolean,
+    text,
+    UniqueConstraint,
+    Index,
+    select,
+    and_,
+    or_,
+    inspect,
+    tuple_,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship, scoped_session
-from sqlalchemy.types import PickleType, ARRAY
-from sqlalchemy.dialects.postgresql import array as psql_array
+from sqlalchemy.orm import (
+    sessionmaker,
+    Query,
+    Session,
+    relationship,
+    scoped_session,
+    aliased,
+)
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+from sqlalchemy.types import ARRAY
+from sqlalchemy.dialects.postgresql import JSONB, array as psql_array, insert
 
 from packit.config import JobConfigTriggerType
-from packit_service.constants import WHITELIST_CONSTANTS
+from packit.exceptions import PackitException
+from packit_service.config import ServiceConfig
+from packit_service.constants import (
+    DB_REPLICA_CHECK_INTERVAL,
+    SRPM_LOGS_CHUNK_SIZE,
+    TASK_RESULTS_CLEANUP_BATCH_SIZE,
+    WHITELIST_CONSTANTS,
+)
 
 logger = logging.getLogger(__name__)
-# SQLAlchemy session, get it with `get_sa_session`
-session_instance = None
 
 
-def get_pg_url() -> str:
+def get_pg_url(host: Optional[str] = None) -> str:
     """ create postgresql connection string """
+    host = host or os.getenv("POSTGRES_SERVICE_HOST", "postgres")
     return (
         f"postgres+psycopg2://{os.getenv('POSTGRESQL_USER')}"
-        f":{os.getenv('POSTGRESQL_PASSWORD')}@{os.getenv('POSTGRES_SERVICE_HOST', 'postgres')}"
+        f":{os.getenv('POSTGRESQL_PASSWORD')}@{host}"
         f":{os.getenv('POSTGRESQL_PORT', '5432')}/{os.getenv('POSTGRESQL_DATABASE')}"
     )
 
 
-engine = create_engine(get_pg_url())
-ScopedSession = scoped_session(sessionmaker(bind=engine))
+def get_pg_replica_url() -> Optional[str]:
+    """ connection string of the read replica, None if there is none """
+    host = os.getenv("POSTGRES_REPLICA_SERVICE_HOST")
+    return get_pg_url(host) if host else None
+
+
+# seconds the replica is behind the primary, 0 if it's not a replica
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+# URL -> engine, created on the first use, see `get_engine`
+_engines: Dict[str, Engine] = {}
+
+
+def get_engine_options() -> Dict[str, Any]:
+    """ pool settings of the engine, from the service config if there is one """
+    try:
+        config = ServiceConfig.get_service_config()
+    except PackitException:
+        # e.g. scripts or alembic, which don't need a tuned pool
+        config = ServiceConfig()
+    if config.db_use_null_pool:
+        # the connections are pooled outside (e.g. by PgBouncer in transaction mode)
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_recycle": config.db_pool_recycle,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """
+    get the SQLAlchemy engine, create it on the first use
+
+    :param url: of the database, the primary one by default
+    """
+    url = url or get_pg_url()
+    if url not in _engines:
+        _engines[url] = create_engine(url, **get_engine_options())
+    return _engines[url]
+
+
+def dispose_engine():
+    """
+    Drop the pooled connections, e.g. the ones inherited from the parent process
+    which must not be shared with it.
+    """
+    for engine in _engines.values():
+        engine.dispose()
+
+
+class LazySession(Session):
+    """ Session which does not create the engine until it talks to the DB. """
+
+    def get_bind(self, mapper=None, clause=None):
+        return get_engine()
+
+
+class ReplicaSession(LazySession):
+    """ Read-only session talking to the read replica. """
+
+    def get_bind(self, mapper=None, clause=None):
+        return get_engine(get_pg_replica_url())
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise PackitException("Writes are not allowed in a read-only session.")
+
+
+ScopedSession = scoped_session(sessionmaker(class_=LazySession))
+ReplicaScopedSession = scoped_session(sessionmaker(class_=ReplicaSession))
+
+# whether the reads of the current thread may go to the replica, see `prefer_replica`
+_replica_routing = threading.local()
+# (when it was checked, whether the replica is fresh enough)
+_replica_state: Tuple[float, bool] = (0.0, False)
+
+
+def prefer_replica(enabled: bool = True):
+    """
+    Send the reads (`get_sa_session(read_only=True)`) of the current thread
+    to the read replica (if there is one) or back to the primary.
+
+    Meant for the API, the workers read what they've just written
+    and so always use the primary.
+    """
+    _replica_routing.enabled = enabled
+    if not enabled:
+        ReplicaScopedSession.remove()
+
+
+def is_replica_usable() -> bool:
+    """
+    Is there a read replica which doesn't lag behind the primary too much?
+
+    The result is cached for DB_REPLICA_CHECK_INTERVAL seconds.
+    """
+    global _replica_state
+    url = get_pg_replica_url()
+    if not url:
+        return False
+    checked, usable = _replica_state
+    if time.monotonic() - checked < DB_REPLICA_CHECK_INTERVAL:
+        return usable
+    try:
+        with get_engine(url).connect() as connection:
+            lag = connection.execute(REPLICA_LAG_SQL).scalar()
+        usable = lag <= ServiceConfig.get_service_config().db_replica_max_lag
+        if not usable:
+            logger.warning(f"Read replica lags {lag}s behind, using the primary.")
+    except SQLAlchemyError as ex:
+        logger.warning(f"Read replica is not available, using the primary: {ex!r}")
+        usable = False
+    _replica_state = (time.monotonic(), usable)
+    return usable
 
 
 @contextmanager
-def get_sa_session() -> Session:
-    """ get SQLAlchemy session """
-    session = ScopedSession()
+def get_sa_session(read_only: bool = False) -> Session:
+    """
+    get SQLAlchemy session
+
+    :param read_only: the session is used only for reading,
+        so it can talk to the read replica, see `prefer_replica`
+    """
+    if (
+        read_only
+        and getattr(_replica_routing, "enabled", False)
+        and is_replica_usable()
+    ):
+        session = ReplicaScopedSession()
+    else:
+        session = ScopedSession()
     try:
         yield session
         session.commit()
@@ -98,6 +271,102 @@ def optional_time(
     return datetime_object.strftime(fmt)
 
 
+# a model class (Base is object for mypy, see below)
+ModelT = TypeVar("ModelT")
+
+
+def select_or_insert(
+    session: Session, model: Type[ModelT], index_elements: List[str], **values
+) -> ModelT:
+    """
+    Get the row with the values of the unique `index_elements` or insert it.
+
+    The row is usually there, so it's looked up first, which doesn't write
+    (or lock) anything. If it's not there, it's inserted with
+    ON CONFLICT DO NOTHING, so there is no race between the workers:
+    the one which loses the race reads the row inserted by the other one.
+
+    :param session: SQLAlchemy session
+    :param model: model of the row
+    :param index_elements: columns of the unique constraint
+    :param values: values of the new row, the existing row is not updated
+    :return: the new or the existing row
+    """
+    filters = {column: values[column] for column in index_elements}
+    row = session.query(model).filter_by(**filters).first()
+    if row is not None:
+        return row
+
+    insert_statement = (
+        insert(model)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=index_elements)
+        .returning(*inspect(model).local_table.columns)
+    )
+    rows = list(session.query(model).instances(session.execute(insert_statement)))
+    if rows:
+        return rows[0]
+    # inserted by another worker in the meantime
+    return session.query(model).filter_by(**filters).one()
+
+
+def get_or_insert(
+    session: Session, model: Type[ModelT], index_elements: List[str], **values
+) -> ModelT:
+    """
+    Get the row with the values of the `index_elements` or insert it.
+
+    The same as `select_or_insert` but for the partitioned tables: their unique
+    constraints have to contain the partition key, so the `index_elements` can't
+    have one. The workers inserting the row are serialized by a transaction-level
+    advisory lock on the values of the `index_elements` instead.
+
+    There is no unique constraint on the `index_elements` in the database,
+    so this lock is the only thing which keeps the rows unique:
+    every insert of such rows has to go through this function.
+
+    :param session: SQLAlchemy session
+    :param model: model of the row
+    :param index_elements: columns identifying the row
+    :param values: values of the new row, the existing row is not updated
+    :return: the new or the existing row
+    """
+    filters = {column: values[column] for column in index_elements}
+    row = session.query(model).filter_by(**filters).first()
+    if row is not None:
+        return row
+
+    table = inspect(model).local_table
+    lock_key = ":".join([table.name, *(str(v) for v in filters.values())])
+    session.execute(select([func.pg_advisory_xact_lock(func.hashtext(lock_key))]))
+    # another worker could have inserted it before we got the lock
+    row = session.query(model).filter_by(**filters).first()
+    if row is None:
+        row = model(**values)
+        session.add(row)
+        session.flush()
+    return row
+
+
+def filter_submitted_time(
+    query: Query,
+    column: Column,
+    submitted_after: Optional[datetime] = None,
+    submitted_before: Optional[datetime] = None,
+) -> Query:
+    """
+    Limit the query to the rows submitted in the given time window.
+
+    On the partitioned tables (PARTITIONED_TABLES) it's the partition key,
+    so PG scans only the partitions of the window.
+    """
+    if submitted_after is not None:
+        query = query.filter(column >= submitted_after)
+    if submitted_before is not None:
+        query = query.filter(column < submitted_before)
+    return query
+
+
 # https://github.com/python/mypy/issues/2477#issuecomment-313984522 ^_^
 if TYPE_CHECKING:
     Base = object
@@ -114,6 +383,7 @@ class JobTriggerModelType(str, enum.Enum):
 
 class GitProjectModel(Base):
     __tablename__ = "git_projects"
+    __table_args__ = (UniqueConstraint("namespace", "repo_name", "project_url"),)
     id = Column(Integer, primary_key=True)
     # github.com/NAMESPACE/REPO_NAME
     # git.centos.org/NAMESPACE/REPO_NAME
@@ -152,53 +422,89 @@ class GitProjectModel(Base):
         cls, namespace: str, repo_name: str, project_url: str
     ) -> "GitProjectModel":
         with get_sa_session() as session:
-            project = (
-                session.query(GitProjectModel)
-                .filter_by(
-                    namespace=namespace, repo_name=repo_name, project_url=project_url
-                )
-                .first()
+            return select_or_insert(
+                session,
+                cls,
+                index_elements=["namespace", "repo_name", "project_url"],
+                namespace=namespace,
+                repo_name=repo_name,
+                project_url=project_url,
             )
 
-            if not project:
-                project = cls()
-                project.repo_name = repo_name
-                project.namespace = namespace
-                project.project_url = project_url
-                session.add(project)
-            return project
-
     @classmethod
-    def get_projects(cls, first: int, last: int) -> Iterable["GitProjectModel"]:
-        with get_sa_session() as session:
-            projects = session.query(GitProjectModel).order_by(
-                GitProjectModel.namespace
-            )[first:last]
-            return projects
+    def get_projects(
+        cls, first: int, last: int, after: Optional[Tuple[int, str]] = None
+    ) -> Iterable[Any]:
+        """
+        Returns the projects along with the numbers of their
+        PRs (prs_handled), branches, releases and issues.
+
+        The numbers are counted in the database (using the indexes of the unique
+        constraints which start with project_id), so we don't load all the PRs etc.
+
+        Projects are ordered by namespace (and ID, the namespaces are not unique).
+
+        :param after: cursor, ID and namespace of the last project seen
+        """
+        with get_sa_session(read_only=True) as session:
+            project = aliased(GitProjectModel, name="project")
+
+            def count_handled(model, label: str):
+                return (
+                    session.query(func.count(model.id))
+                    .filter(model.project_id == project.id)
+                    .label(label)
+                )
+
+            projects = session.query(
+                project,
+                count_handled(PullRequestModel, "prs_handled"),
+                count_handled(GitBranchModel, "branches_handled"),
+                count_handled(ProjectReleaseModel, "releases_handled"),
+                count_handled(IssueModel, "issues_handled"),
+            )
+            namespace = func.coalesce(project.namespace, "")
+            if after is not None:
+                after_id, after_namespace = after
+                projects = projects.filter(
+                    tuple_(namespace, project.id) > tuple_(after_namespace, after_id)
+                )
+            return projects.order_by(namespace, project.id)[first:last]
 
     @classmethod
     def get_project_prs(
-        cls, first: int, last: int, forge: str, namespace: str, repo_name: str
+        cls,
+        first: int,
+        last: int,
+        forge: str,
+        namespace: str,
+        repo_name: str,
+        after: Optional[int] = None,
     ) -> Optional[Iterable["PullRequestModel"]]:
-        with get_sa_session() as session:
+        """
+        Returns PRs of the project, the latest first.
+
+        :param after: cursor, PR ID (not the DB ID) of the last PR seen
+        """
+        with get_sa_session(read_only=True) as session:
             project = cls.__choose_project(
                 session=session, forge=forge, namespace=namespace, repo_name=repo_name
             )
             if not project:
                 return None
-            pull_requests = (
-                session.query(PullRequestModel)
-                .filter_by(project_id=project.id)
-                .order_by(desc(PullRequestModel.pr_id))[first:last]
+            pull_requests = session.query(PullRequestModel).filter_by(
+                project_id=project.id
             )
+            if after is not None:
+                pull_requests = pull_requests.filter(PullRequestModel.pr_id < after)
 
-            return pull_requests
+            return pull_requests.order_by(desc(PullRequestModel.pr_id))[first:last]
 
     @classmethod
     def get_project_issues(
         cls, forge: str, namespace: str, repo_name: str
     ) -> Optional[Iterable["IssueModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             project = cls.__choose_project(
                 session=session, forge=forge, namespace=namespace, repo_name=repo_name
             )
@@ -216,7 +522,7 @@ class GitProjectModel(Base):
     def get_project_releases(
         cls, forge: str, namespace: str, repo_name: str
     ) -> Optional[Iterable["ProjectReleaseModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             project = cls.__choose_project(
                 session=session, forge=forge, namespace=namespace, repo_name=repo_name
             )
@@ -237,8 +543,127 @@ class GitProjectModel(Base):
         )
 
 
+# Create what is missing of the project, the trigger (PR, branch, ...) in it
+# and its JobTriggerModel, one statement (roundtrip) for the whole chain.
+# The rows inserted by another transaction after the statement has started are not
+# visible to it, so if it lost such a race, it returns nothing and is run again.
+CREATE_TRIGGER_SQL = """
+WITH new_project AS (
+    INSERT INTO git_projects (namespace, repo_name, project_url)
+    VALUES (:namespace, :repo_name, :project_url)
+    ON CONFLICT (namespace, repo_name, project_url) DO NOTHING
+    RETURNING id
+), project AS (
+    SELECT id FROM new_project
+    UNION ALL
+    SELECT id FROM git_projects
+    WHERE namespace = :namespace AND repo_name = :repo_name AND project_url = :project_url
+), new_trigger AS (
+    INSERT INTO {table} (project_id, {insert_columns})
+    SELECT id, {insert_values} FROM project
+    ON CONFLICT (project_id, {filter_columns}) DO NOTHING
+    RETURNING {columns}
+), db_trigger AS (
+    SELECT {columns} FROM new_trigger
+    UNION ALL
+    SELECT {columns} FROM {table}
+    WHERE project_id = (SELECT id FROM project) AND {filters}
+), new_job_trigger AS (
+    INSERT INTO build_triggers (type, trigger_id)
+    SELECT CAST(:job_trigger_type AS jobtriggermodeltype), id FROM db_trigger
+    ON CONFLICT (type, trigger_id) DO NOTHING
+)
+SELECT {columns} FROM db_trigger
+"""
+
+
+TriggerModelT = TypeVar(
+    "TriggerModelT",
+    "PullRequestModel",
+    "IssueModel",
+    "GitBranchModel",
+    "ProjectReleaseModel",
+)
+
+
+def get_or_create_trigger(
+    session: Session,
+    model: Type[TriggerModelT],
+    namespace: str,
+    repo_name: str,
+    project_url: str,
+    filters: Dict[str, Any],
+    values: Optional[Dict[str, Any]] = None,
+) -> TriggerModelT:
+    """
+    Get the trigger from the project and create everything what is missing.
+
+    The existing trigger (the common case) is found by one SELECT
+    of the project, the trigger and its JobTriggerModel, which doesn't write anything.
+    The missing rows are inserted by one statement (CREATE_TRIGGER_SQL).
+
+    :param session: SQLAlchemy session
+    :param model: PullRequestModel, IssueModel, GitBranchModel or ProjectReleaseModel
+    :param namespace: namespace of the project
+    :param repo_name: name of the project
+    :param project_url: URL of the project
+    :param filters: columns identifying the trigger in the project, e.g. {"pr_id": 1}
+    :param values: other columns set when the trigger is created
+    :return: the trigger
+    """
+    trigger = (
+        session.query(model)
+        .join(GitProjectModel, model.project_id == GitProjectModel.id)
+        .join(
+            JobTriggerModel,
+            and_(
+                JobTriggerModel.type == model.job_trigger_model_type,
+                JobTriggerModel.trigger_id == model.id,
+            ),
+        )
+        .filter(
+            GitProjectModel.namespace == namespace,
+            GitProjectModel.repo_name == repo_name,
+            GitProjectModel.project_url == project_url,
+            *(getattr(model, column) == value for column, value in filters.items()),
+        )
+        .first()
+    )
+    if trigger is not None:
+        return trigger
+
+    insert_values = {**filters, **(values or {})}
+    table = inspect(model).local_table
+    columns = ", ".join(column.name for column in table.columns)
+    sql = CREATE_TRIGGER_SQL.format(
+        table=table.name,
+        columns=columns,
+        filter_columns=", ".join(filters),
+        filters=" AND ".join(f"{column} = :{column}" for column in filters),
+        insert_columns=", ".join(insert_values),
+        insert_values=", ".join(f":{column}" for column in insert_values),
+    )
+    statement = (
+        text(sql)
+        .bindparams(
+            namespace=namespace,
+            repo_name=repo_name,
+            project_url=project_url,
+            job_trigger_type=model.job_trigger_model_type.name,
+            **insert_values,
+        )
+        .columns(*table.columns)
+    )
+    trigger = session.query(model).from_statement(statement).first()
+    if trigger is None:
+        # another worker created (some of) the rows in the meantime
+        trigger = session.query(model).from_statement(statement).one()
+    return trigger
+
+
 class PullRequestModel(Base):
     __tablename__ = "pull_requests"
+    __table_args__ = (UniqueConstraint("project_id", "pr_id"),)
     id = Column(Integer, primary_key=True)  # our database PK
     # GitHub PR ID
     # this is not our PK b/c:
@@ -259,34 +684,30 @@ class PullRequestModel(Base):
         cls, pr_id: int, namespace: str, repo_name: str, project_url: str
     ) -> "PullRequestModel":
         with get_sa_session() as session:
-            project = GitProjectModel.get_or_create(
-                namespace=namespace, repo_name=repo_name, project_url=project_url
-            )
-            pr = (
-                session.query(PullRequestModel)
-                .filter_by(pr_id=pr_id, project_id=project.id)
-                .first()
+            return get_or_create_trigger(
+                session=session,
+                model=cls,
+                namespace=namespace,
+                repo_name=repo_name,
+                project_url=project_url,
+                filters={"pr_id": pr_id},
             )
-            if not pr:
-                pr = PullRequestModel()
-                pr.pr_id = pr_id
-                pr.project_id = project.id
-                session.add(pr)
-            return pr
 
     def get_copr_builds(self):
-        return JobTriggerModel.get_or_create(
+        job_trigger = JobTriggerModel.get_by_type_and_trigger_id(
             type=JobTriggerModelType.pull_request, trigger_id=self.id
-        ).copr_builds
+        )
+        return job_trigger.copr_builds if job_trigger else []
 
     def get_test_runs(self):
-        return JobTriggerModel.get_or_create(
+        job_trigger = JobTriggerModel.get_by_type_and_trigger_id(
             type=JobTriggerModelType.pull_request, trigger_id=self.id
-        ).test_runs
+        )
+        return job_trigger.test_runs if job_trigger else []
 
     @classmethod
     def get_by_id(cls, id_: int) -> Optional["PullRequestModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(PullRequestModel).filter_by(id=id_).first()
 
     def __repr__(self):
@@ -295,6 +716,7 @@ class PullRequestModel(Base):
 
 class IssueModel(Base):
     __tablename__ = "project_issues"
+    __table_args__ = (UniqueConstraint("project_id", "issue_id"),)
     id = Column(Integer, primary_key=True)  # our database PK
     issue_id = Column(Integer, index=True)
     project_id = Column(Integer, ForeignKey("git_projects.id"))
@@ -307,24 +729,18 @@ class IssueModel(Base):
         cls, issue_id: int, namespace: str, repo_name: str, project_url: str
     ) -> "IssueModel":
         with get_sa_session() as session:
-            project = GitProjectModel.get_or_create(
-                namespace=namespace, repo_name=repo_name, project_url=project_url
-            )
-            issue = (
-                session.query(IssueModel)
-                .filter_by(issue_id=issue_id, project_id=project.id)
-                .first()
+            return get_or_create_trigger(
+                session=session,
+                model=cls,
+                namespace=namespace,
+                repo_name=repo_name,
+                project_url=project_url,
+                filters={"issue_id": issue_id},
             )
-            if not issue:
-                issue = IssueModel()
-                issue.issue_id = issue_id
-                issue.project_id = project.id
-                session.add(issue)
-            return issue
 
     @classmethod
     def get_by_id(cls, id_: int) -> Optional["IssueModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(IssueModel).filter_by(id=id_).first()
 
     def __repr__(self):
@@ -333,6 +749,7 @@ class IssueModel(Base):
 
 class GitBranchModel(Base):
     __tablename__ = "git_branches"
+    __table_args__ = (UniqueConstraint("project_id", "name"),)
     id = Column(Integer, primary_key=True)  # our database PK
     name = Column(String)
     project_id = Column(Integer, ForeignKey("git_projects.id"))
@@ -346,24 +763,18 @@ class GitBranchModel(Base):
         cls, branch_name: str, namespace: str, repo_name: str, project_url: str
     ) -> "GitBranchModel":
         with get_sa_session() as session:
-            project = GitProjectModel.get_or_create(
-                namespace=namespace, repo_name=repo_name, project_url=project_url
-            )
-            git_branch = (
-                session.query(GitBranchModel)
-                .filter_by(name=branch_name, project_id=project.id)
-                .first()
+            return get_or_create_trigger(
+                session=session,
+                model=cls,
+                namespace=namespace,
+                repo_name=repo_name,
+                project_url=project_url,
+                filters={"name": branch_name},
             )
-            if not git_branch:
-                git_branch = GitBranchModel()
-                git_branch.name = branch_name
-                git_branch.project_id = project.id
-                session.add(git_branch)
-            return git_branch
 
     @classmethod
     def get_by_id(cls, id_: int) -> Optional["GitBranchModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(GitBranchModel).filter_by(id=id_).first()
 
     def __repr__(self):
@@ -425,6 +836,7 @@ class BugzillaModel(Base):
 
 class ProjectReleaseModel(Base):
     __tablename__ = "project_releases"
+    __table_args__ = (UniqueConstraint("project_id", "tag_name"),)
     id = Column(Integer, primary_key=True)  # our database PK
     tag_name = Column(String)
     commit_hash = Column(String)
@@ -444,25 +856,19 @@ class ProjectReleaseModel(Base):
         commit_hash: Optional[str] = None,
     ) -> "ProjectReleaseModel":
         with get_sa_session() as session:
-            project = GitProjectModel.get_or_create(
-                namespace=namespace, repo_name=repo_name, project_url=project_url
-            )
-            project_release = (
-                session.query(ProjectReleaseModel)
-                .filter_by(tag_name=tag_name, project_id=project.id)
-                .first()
+            return get_or_create_trigger(
+                session=session,
+                model=cls,
+                namespace=namespace,
+                repo_name=repo_name,
+                project_url=project_url,
+                filters={"tag_name": tag_name},
+                values={"commit_hash": commit_hash},
             )
-            if not project_release:
-                project_release = ProjectReleaseModel()
-                project_release.tag_name = tag_name
-                project_release.project = project
-                project_release.commit_hash = commit_hash
-                session.add(project_release)
-            return project_release
 
     @classmethod
     def get_by_id(cls, id_: int) -> Optional["ProjectReleaseModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(ProjectReleaseModel).filter_by(id=id_).first()
 
     def __repr__(self):
@@ -487,6 +893,7 @@ MODEL_FOR_TRIGGER: Dict[JobTriggerModelType, Type[AbstractTriggerDbType]] = {
 
 class JobTriggerModel(Base):
     __tablename__ = "build_triggers"
+    __table_args__ = (UniqueConstraint("type", "trigger_id"),)
     id = Column(Integer, primary_key=True)  # our database PK
     type = Column(Enum(JobTriggerModelType))
     trigger_id = Column(Integer)
@@ -499,17 +906,24 @@ class JobTriggerModel(Base):
         cls, type: JobTriggerModelType, trigger_id: int
     ) -> "JobTriggerModel":
         with get_sa_session() as session:
-            trigger = (
+            return select_or_insert(
+                session,
+                cls,
+                index_elements=["type", "trigger_id"],
+                type=type,
+                trigger_id=trigger_id,
+            )
+
+    @classmethod
+    def get_by_type_and_trigger_id(
+        cls, type: JobTriggerModelType, trigger_id: int
+    ) -> Optional["JobTriggerModel"]:
+        with get_sa_session(read_only=True) as session:
+            return (
                 session.query(JobTriggerModel)
                 .filter_by(type=type, trigger_id=trigger_id)
                 .first()
             )
-            if not trigger:
-                trigger = JobTriggerModel()
-                trigger.type = type
-                trigger.trigger_id = trigger_id
-                session.add(trigger)
-            return trigger
 
     def get_trigger_object(self) -> AbstractTriggerDbType:
         with get_sa_session() as session:
@@ -523,11 +937,67 @@ class JobTriggerModel(Base):
         return f"JobTriggerModel(type={self.type}, trigger_id={self.trigger_id})"
 
 
-class CoprBuildModel(Base):
+class BuildStateUpdate:
+    """
+    Mixin for the builds and test runs, their state changes with every message
+    we get about them.
+    """
+
+    def update_state(
+        self,
+        expected_status: Optional[Iterable[str]] = None,
+        unless_status: Optional[Iterable[str]] = None,
+        **changes,
+    ) -> bool:
+        """
+        Apply all the changes of the fields at once:
+            UPDATE ... WHERE id = :id AND status ... RETURNING ...
+
+        The condition on the status makes the transition atomic,
+        a duplicate message then changes nothing.
+        The condition on the partition key (the submitted time of the loaded row)
+        lets the database update only the partition of the row.
+
+        :param expected_status: change the row only if its status is one of these
+        :param unless_status: don't change the row if its status is one of these
+        :param changes: field -> new value
+        :return: whether the row was changed
+        """
+        table = inspect(self).mapper.local_table
+        (id_,) = inspect(self).identity
+        statement = table.update().where(table.c.id == id_)
+        partition_key = PARTITIONED_TABLES.get(table.name)
+        submitted_time = (
+            inspect(self).dict.get(partition_key) if partition_key else None
+        )
+        if submitted_time is not None:
+            statement = statement.where(table.c[partition_key] == submitted_time)
+        if expected_status is not None:
+            statement = statement.where(table.c.status.in_(expected_status))
+        if unless_status is not None:
+            statement = statement.where(
+                or_(table.c.status.is_(None), table.c.status.notin_(unless_status))
+            )
+        statement = statement.values(**changes).returning(*table.columns)
+        with get_sa_session() as session:
+            row = session.execute(statement).first()
+        if row is None:
+            return False
+        # the object is up to date without reading it again
+        for column, value in row.items():
+            set_committed_value(self, column, value)
+        return True
+
+
+class CoprBuildModel(BuildStateUpdate, Base):
     """ we create an entry for every target """
 
     __tablename__ = "copr_builds"
-    id = Column(Integer, primary_key=True)
+    __table_args__ = (
+        Index("ix_copr_builds_build_id_target", "build_id", "target"),
+        {"postgresql_partition_by": "RANGE (build_submitted_time)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
     build_id = Column(String, index=True)  # copr build id
     job_trigger_id = Column(Integer, ForeignKey("build_triggers.id"))
     job_trigger = relationship("JobTriggerModel", back_populates="copr_builds")
@@ -545,7 +1015,8 @@ class CoprBuildModel(Base):
     build_logs_url = Column(String)
     # datetime.utcnow instead of datetime.utcnow() because its an argument to the function
     # so it will run when the copr build is initiated, not when the table is made
-    build_submitted_time = Column(DateTime, default=datetime.utcnow)
+    # the table is partitioned by it, see PARTITIONED_TABLES
+    build_submitted_time = Column(DateTime, default=datetime.utcnow, primary_key=True)
     build_start_time = Column(DateTime)
     build_finished_time = Column(DateTime)
 
@@ -557,25 +1028,8 @@ class CoprBuildModel(Base):
     # metadata is reserved to sqlalch
     data = Column(JSON)
 
-    def set_start_time(self, start_time: DateTime):
-        with get_sa_session() as session:
-            self.build_start_time = start_time
-            session.add(self)
-
-    def set_end_time(self, end_time: DateTime):
-        with get_sa_session() as session:
-            self.build_finished_time = end_time
-            session.add(self)
-
-    def set_status(self, status: str):
-        with get_sa_session() as session:
-            self.status = status
-            session.add(self)
-
-    def set_build_logs_url(self, build_logs: str):
-        with get_sa_session() as session:
-            self.build_logs_url = build_logs
-            session.add(self)
+    # the partition key is a part of the primary key only because PG requires it
+    __mapper_args__ = {"primary_key": [id]}
 
     def get_project(self) -> Optional[GitProjectModel]:
         trigger_object = self.job_trigger.get_trigger_object()
@@ -591,39 +1045,139 @@ class CoprBuildModel(Base):
 
     @classmethod
     def get_by_id(cls, id_: int) -> Optional["CoprBuildModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(CoprBuildModel).filter_by(id=id_).first()
 
     @classmethod
     def get_all(cls) -> Optional[Iterable["CoprBuildModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(CoprBuildModel).order_by(desc(CoprBuildModel.id)).all()
 
     @classmethod
     def get_merged_chroots(
-        cls, first: int, last: int
+        cls,
+        first: int,
+        last: int,
+        after: Optional[int] = None,
+        submitted_after: Optional[datetime] = None,
+        submitted_before: Optional[datetime] = None,
     ) -> Optional[Iterable["CoprBuildModel"]]:
         """Returns a list of unique build ids with merged status, chroots
         Details:
         https://github.com/packit-service/packit-service/pull/674#discussion_r439819852
+
+        Along with the details of the (first of the) builds and its project,
+        so that the whole page of builds is fetched in one query.
+
+        :param after: cursor, new_id of the last merged build seen
+        :param submitted_after: only builds submitted since then
+        :param submitted_before: only builds submitted before then,
+            both limit the partitions which are scanned
         """
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
+            page = session.query(
+                # We need something to order our merged builds by,
+                # so set new_id to be min(ids of to-be-merged rows)
+                func.min(CoprBuildModel.id).label("new_id"),
+                # Select identical element(s)
+                CoprBuildModel.build_id,
+            ).group_by(
+                CoprBuildModel.build_id
+            )  # Group by identical element(s)
+            page = filter_submitted_time(
+                page,
+                CoprBuildModel.build_submitted_time,
+                submitted_after,
+                submitted_before,
+            )
+            if after is not None:
+                # the builds below the cursor have new_id below it too
+                page = page.filter(CoprBuildModel.id < after)
+            page = (
+                page.order_by(desc("new_id"))
+                .offset(first)
+                .limit(last - first)
+                .subquery()
+            )
+            # all the chroots of the builds on the page,
+            # some of them can have IDs above the cursor
+            merged_builds = session.query(
+                page.c.new_id,
+                page.c.build_id,
+                # Merge chroots and statuses from different rows into one
+                func.array_agg(psql_array([CoprBuildModel.target])).label("target"),
+                func.array_agg(psql_array([CoprBuildModel.status])).label("status"),
+            ).join(CoprBuildModel, CoprBuildModel.build_id == page.c.build_id)
+            merged_builds = (
+                filter_submitted_time(
+                    merged_builds,
+                    CoprBuildModel.build_submitted_time,
+                    submitted_after,
+                    submitted_before,
+                )
+                .group_by(page.c.new_id, page.c.build_id)
+                .subquery()
+            )
             builds = (
                 session.query(
-                    # We need something to order our merged builds by,
-                    # so set new_id to be min(ids of to-be-merged rows)
-                    func.min(CoprBuildModel.id).label("new_id"),
-                    # Select identical element(s)
-                    CoprBuildModel.build_id,
-                    # Merge chroots and statuses from different rows into one
-                    func.array_agg(psql_array([CoprBuildModel.target])).label("target"),
-                    func.array_agg(psql_array([CoprBuildModel.status])).label("status"),
+                    merged_builds.c.new_id,
+                    merged_builds.c.build_id,
+                    merged_builds.c.target,
+                    merged_builds.c.status,
+                    CoprBuildModel.project_name,
+                    CoprBuildModel.build_submitted_time,
+                    CoprBuildModel.web_url,
+                    CoprBuildModel.commit_sha,
+                    PullRequestModel.pr_id,
+                    GitProjectModel.namespace.label("repo_namespace"),
+                    GitProjectModel.repo_name,
+                )
+                .select_from(merged_builds)
+                .join(CoprBuildModel, CoprBuildModel.id == merged_builds.c.new_id)
+                .outerjoin(
+                    JobTriggerModel, JobTriggerModel.id == CoprBuildModel.job_trigger_id
                 )
-                .group_by(CoprBuildModel.build_id)  # Group by identical element(s)
-                .order_by(desc("new_id"))[first:last]
+            )
+            # the first builds are in the window, prune the partitions of the join too
+            builds = filter_submitted_time(
+                builds,
+                CoprBuildModel.build_submitted_time,
+                submitted_after,
+                submitted_before,
+            )
+            project_ids = []
+            for trigger_type, model in MODEL_FOR_TRIGGER.items():
+                builds = builds.outerjoin(
+                    model,
+                    and_(
+                        JobTriggerModel.type == trigger_type,
+                        JobTriggerModel.trigger_id == model.id,
+                    ),
+                )
+                project_ids.append(model.project_id)
+            return (
+                builds.outerjoin(
+                    GitProjectModel, GitProjectModel.id == func.coalesce(*project_ids)
+                )
+                .order_by(desc(merged_builds.c.new_id))
+                .all()
             )
 
-            return builds
+    @classmethod
+    def get_all_by_status(
+        cls,
+        status: str,
+        submitted_after: Optional[datetime] = None,
+        submitted_before: Optional[datetime] = None,
+    ) -> Iterable["CoprBuildModel"]:
+        with get_sa_session(read_only=True) as session:
+            query = session.query(CoprBuildModel).filter_by(status=status)
+            return filter_submitted_time(
+                query,
+                CoprBuildModel.build_submitted_time,
+                submitted_after,
+                submitted_before,
+            ).all()
 
     # Returns all builds with that build_id, irrespective of target
     @classmethod
@@ -633,7 +1187,7 @@ class CoprBuildModel(Base):
         if isinstance(build_id, int):
             # See the comment in get_by_build_id()
             build_id = str(build_id)
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(CoprBuildModel).filter_by(build_id=build_id)
 
     # returns the build matching the build_id and the target
@@ -647,7 +1201,7 @@ class CoprBuildModel(Base):
             #   HINT:  No operator matches the given name and argument type(s).
             #   You might need to add explicit type casts.
             build_id = str(build_id)
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             query = session.query(CoprBuildModel).filter_by(build_id=build_id)
             if target:
                 query = query.filter_by(target=target)
@@ -671,30 +1225,34 @@ class CoprBuildModel(Base):
         )
 
         with get_sa_session() as session:
-            build = cls.get_by_build_id(build_id, target)
-            if not build:
-                build = cls()
-                build.build_id = build_id
-                build.job_trigger = job_trigger
-                build.srpm_build_id = srpm_build.id
-                build.status = status
-                build.project_name = project_name
-                build.owner = owner
-                build.commit_sha = commit_sha
-                build.web_url = web_url
-                build.target = target
-                session.add(build)
-            return build
+            return get_or_insert(
+                session,
+                cls,
+                index_elements=["build_id", "target"],
+                build_id=build_id,
+                job_trigger_id=job_trigger.id,
+                srpm_build_id=srpm_build.id,
+                status=status,
+                project_name=project_name,
+                owner=owner,
+                commit_sha=commit_sha,
+                web_url=web_url,
+                target=target,
+            )
 
     def __repr__(self):
         return f"COPRBuildModel(id={self.id}, job_trigger={self.job_trigger})"
 
 
-class KojiBuildModel(Base):
+class KojiBuildModel(BuildStateUpdate, Base):
     """ we create an entry for every target """
 
     __tablename__ = "koji_builds"
-    id = Column(Integer, primary_key=True)
+    __table_args__ = (
+        Index("ix_koji_builds_build_id_target", "build_id", "target"),
+        {"postgresql_partition_by": "RANGE (build_submitted_time)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
     build_id = Column(String, index=True)  # koji build id
     job_trigger_id = Column(Integer, ForeignKey("build_triggers.id"))
     job_trigger = relationship("JobTriggerModel", back_populates="koji_builds")
@@ -712,7 +1270,8 @@ class KojiBuildModel(Base):
     build_logs_url = Column(String)
     # datetime.utcnow instead of datetime.utcnow() because its an argument to the function
     # so it will run when the koji build is initiated, not when the table is made
-    build_submitted_time = Column(DateTime, default=datetime.utcnow)
+    # the table is partitioned by it, see PARTITIONED_TABLES
+    build_submitted_time = Column(DateTime, default=datetime.utcnow, primary_key=True)
     build_start_time = Column(DateTime)
     build_finished_time = Column(DateTime)
 
@@ -720,39 +1279,12 @@ class KojiBuildModel(Base):
     # metadata is reserved to sqlalch
     data = Column(JSON)
 
-    def set_status(self, status: str):
-        with get_sa_session() as session:
-            self.status = status
-            session.add(self)
-
-    def set_build_logs_url(self, build_logs: str):
-        with get_sa_session() as session:
-            self.build_logs_url = build_logs
-            session.add(self)
-
-    def set_web_url(self, web_url: str):
-        with get_sa_session() as session:
-            self.web_url = web_url
-            session.add(self)
+    # the partition key is a part of the primary key only because PG requires it
+    __mapper_args__ = {"primary_key": [id]}
 
     def get_project(self) -> GitProjectModel:
         return self.job_trigger.get_trigger_object().project
 
-    def set_build_start_time(self, build_start_time: Optional[DateTime]):
-        with get_sa_session() as session:
-            self.build_start_time = build_start_time
-            session.add(self)
-
-    def set_build_finished_time(self, build_finished_time: Optional[DateTime]):
-        with get_sa_session() as session:
-            self.build_finished_time = build_finished_time
-            session.add(self)
-
-    def set_build_submitted_time(self, build_submitted_time: Optional[DateTime]):
-        with get_sa_session() as session:
-            self.build_submitted_time = build_submitted_time
-            session.add(self)
-
     @property
     def api_structure(self) -> Dict[str, Any]:
         base = {
@@ -784,14 +1316,34 @@ class KojiBuildModel(Base):
 
     @classmethod
     def get_by_id(cls, id_: int) -> Optional["KojiBuildModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(KojiBuildModel).filter_by(id=id_).first()
 
     @classmethod
     def get_all(cls) -> Optional[Iterable["KojiBuildModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(KojiBuildModel).all()
 
+    @classmethod
+    def get_range(
+        cls,
+        first: int,
+        last: int,
+        after: Optional[int] = None,
+        submitted_after: Optional[datetime] = None,
+        submitted_before: Optional[datetime] = None,
+    ) -> Optional[Iterable["KojiBuildModel"]]:
+        with get_sa_session(read_only=True) as session:
+            query = filter_submitted_time(
+                session.query(KojiBuildModel),
+                KojiBuildModel.build_submitted_time,
+                submitted_after,
+                submitted_before,
+            )
+            if after is not None:
+                query = query.filter(KojiBuildModel.id < after)
+            return query.order_by(desc(KojiBuildModel.id))[first:last]
+
     # Returns all builds with that build_id, irrespective of target
     @classmethod
     def get_all_by_build_id(
@@ -800,7 +1352,7 @@ class KojiBuildModel(Base):
         if isinstance(build_id, int):
             # See the comment in get_by_build_id()
             build_id = str(build_id)
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(KojiBuildModel).filter_by(build_id=build_id)
 
     # returns the build matching the build_id and the target
@@ -814,7 +1366,7 @@ class KojiBuildModel(Base):
             #   HINT:  No operator matches the given name and argument type(s).
             #   You might need to add explicit type casts.
             build_id = str(build_id)
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             if target:
                 return (
                     session.query(KojiBuildModel)
@@ -838,31 +1390,93 @@ class KojiBuildModel(Base):
             type=trigger_model.job_trigger_model_type, trigger_id=trigger_model.id
         )
         with get_sa_session() as session:
-            build = cls.get_by_build_id(build_id, target)
-            if not build:
-                build = cls()
-                build.build_id = build_id
-                build.job_trigger = job_trigger
-                build.srpm_build_id = srpm_build.id
-                build.status = status
-                build.commit_sha = commit_sha
-                build.web_url = web_url
-                build.target = target
-                session.add(build)
-            return build
+            return get_or_insert(
+                session,
+                cls,
+                index_elements=["build_id", "target"],
+                build_id=build_id,
+                job_trigger_id=job_trigger.id,
+                srpm_build_id=srpm_build.id,
+                status=status,
+                commit_sha=commit_sha,
+                web_url=web_url,
+                target=target,
+            )
 
     def __repr__(self):
         return f"KojiBuildModel(id={self.id}, job_trigger={self.job_trigger})"
 
 
+class SRPMBuildLogsModel(Base):
+    """ gzip-compressed logs of an SRPM build, kept out of the srpm_builds rows """
+
+    __tablename__ = "srpm_build_logs"
+    srpm_build_id = Column(
+        Integer, ForeignKey("srpm_builds.id", ondelete="CASCADE"), primary_key=True
+    )
+    logs = Column(LargeBinary)
+
+    @staticmethod
+    def compress(logs: Optional[str]) -> Optional[bytes]:
+        if logs is None:
+            return None
+        return gzip.compress(logs.encode("utf-8"))
+
+    def iter_logs(self, chunk_size: int = SRPM_LOGS_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Decompress the logs incrementally so that big logs
+        never have to be held in memory as a whole.
+        """
+        if not self.logs:
+            return
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        data = self.logs
+        while data:
+            chunk = decoder.decode(decompressor.decompress(data, chunk_size))
+            if chunk:
+                yield chunk
+            data = decompressor.unconsumed_tail
+        chunk = decoder.decode(decompressor.flush(), final=True)
+        if chunk:
+            yield chunk
+
+    def __repr__(self):
+        return f"SRPMBuildLogsModel(srpm_build_id={self.srpm_build_id})"
+
+
 class SRPMBuildModel(Base):
     __tablename__ = "srpm_builds"
     id = Column(Integer, primary_key=True)
-    # our logs we want to show to the user
-    logs = Column(Text)
     success = Column(Boolean)
     copr_builds = relationship("CoprBuildModel", back_populates="srpm_build")
     koji_builds = relationship("KojiBuildModel", back_populates="srpm_build")
+    # our logs we want to show to the user,
+    # loaded from the separate table only when accessed
+    _logs = relationship(
+        "SRPMBuildLogsModel",
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @property
+    def logs(self) -> Optional[str]:
+        if self._logs is None or self._logs.logs is None:
+            return None
+        return "".join(self._logs.iter_logs())
+
+    @logs.setter
+    def logs(self, logs: Optional[str]):
+        logs_model = SRPMBuildLogsModel()
+        logs_model.logs = SRPMBuildLogsModel.compress(logs)
+        self._logs = logs_model
+
+    def iter_logs(self, chunk_size: int = SRPM_LOGS_CHUNK_SIZE) -> Iterator[str]:
+        if self._logs is None:
+            return iter(())
+        return self._logs.iter_logs(chunk_size)
 
     @classmethod
     def create(cls, logs: str, success: bool) -> "SRPMBuildModel":
@@ -875,7 +1489,7 @@ class SRPMBuildModel(Base):
 
     @classmethod
     def get_by_id(cls, id_: int,) -> Optional["SRPMBuildModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(SRPMBuildModel).filter_by(id=id_).first()
 
     def __repr__(self):
@@ -908,7 +1522,7 @@ class WhitelistModel(Base):
 
     @classmethod
     def get_account(cls, account_name: str) -> Optional["WhitelistModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return (
                 session.query(WhitelistModel)
                 .filter_by(account_name=account_name)
@@ -919,7 +1533,7 @@ class WhitelistModel(Base):
     def get_accounts_by_status(
         cls, status: str
     ) -> Optional[Iterable["WhitelistModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(WhitelistModel).filter_by(status=status)
 
     @classmethod
@@ -932,7 +1546,7 @@ class WhitelistModel(Base):
 
     @classmethod
     def get_all(cls) -> Optional[Iterable["WhitelistModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(WhitelistModel).all()
 
     def to_dict(self) -> dict:
@@ -944,32 +1558,97 @@ class WhitelistModel(Base):
 
 class TaskResultModel(Base):
     __tablename__ = "task_results"
+    __table_args__ = (
+        Index("ix_task_results_event_type_date_created", "event_type", "date_created"),
+    )
     task_id = Column(String, primary_key=True)
-    jobs = Column(PickleType)
-    event = Column(PickleType)
+    jobs = Column(JSONB)
+    event = Column(JSONB)
+    event_type = Column(String)
+    date_created = Column(DateTime, default=datetime.utcnow, index=True)
 
     @classmethod
     def get_by_id(cls, task_id: str) -> Optional["TaskResultModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(TaskResultModel).filter_by(task_id=task_id).first()
 
     @classmethod
     def get_all(cls) -> Optional[Iterable["TaskResultModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(TaskResultModel).all()
 
+    @classmethod
+    def get_range(
+        cls, first: int, last: int, after: Optional[Tuple[datetime, str]] = None
+    ) -> Optional[Iterable["TaskResultModel"]]:
+        """
+        Returns the task results, the latest first.
+
+        The task IDs are random, so the results are ordered by date_created
+        and by the task ID only when created at the same time.
+
+        :param after: cursor, date_created and task_id of the last result seen
+        """
+        with get_sa_session(read_only=True) as session:
+            query = session.query(TaskResultModel)
+            if after is not None:
+                query = query.filter(
+                    tuple_(TaskResultModel.date_created, TaskResultModel.task_id)
+                    < tuple_(*after)
+                )
+            return query.order_by(
+                desc(TaskResultModel.date_created), desc(TaskResultModel.task_id)
+            )[first:last]
+
     @classmethod
     def add_task_result(cls, task_id, task_result_dict):
+        """
+        :param task_result_dict: the result of the task,
+            see `packit_service.worker.jobs.get_processing_results`
+        """
+        details = task_result_dict.get("details") or {}
         with get_sa_session() as session:
             task_result = cls.get_by_id(task_id)
             if not task_result:
                 task_result = cls()
                 task_result.task_id = task_id
-                task_result.jobs = task_result_dict.get("jobs")
-                task_result.event = task_result_dict.get("event")
+                task_result.jobs = details.get("matching_jobs")
+                task_result.event = details.get("event")
+                if isinstance(task_result.event, dict):
+                    task_result.event_type = task_result.event.get("event_type")
                 session.add(task_result)
             return task_result
 
+    @classmethod
+    def delete_older_than(
+        cls, date: datetime, batch_size: int = TASK_RESULTS_CLEANUP_BATCH_SIZE
+    ) -> int:
+        """
+        Delete the task results created before the given date.
+
+        The rows are deleted in batches (each in its own transaction)
+        so that the table is not locked for a long time.
+
+        :return: number of the deleted task results
+        """
+        deleted = 0
+        while True:
+            with get_sa_session() as session:
+                batch = (
+                    session.query(TaskResultModel.task_id)
+                    .filter(TaskResultModel.date_created < date)
+                    .limit(batch_size)
+                    .subquery()
+                )
+                count = (
+                    session.query(TaskResultModel)
+                    .filter(TaskResultModel.task_id.in_(batch))
+                    .delete(synchronize_session=False)
+                )
+            deleted += count
+            if count < batch_size:
+                return deleted
+
     def to_dict(self):
         return {
             "task_id": self.task_id,
@@ -989,9 +1668,10 @@ class TestingFarmResult(str, enum.Enum):
     running = "running"
 
 
-class TFTTestRunModel(Base):
+class TFTTestRunModel(BuildStateUpdate, Base):
     __tablename__ = "tft_test_runs"
-    id = Column(Integer, primary_key=True)
+    __table_args__ = ({"postgresql_partition_by": "RANGE (submitted_time)"},)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     pipeline_id = Column(String, index=True)
     job_trigger_id = Column(Integer, ForeignKey("build_triggers.id"))
     job_trigger = relationship("JobTriggerModel", back_populates="test_runs")
@@ -1000,16 +1680,11 @@ class TFTTestRunModel(Base):
     target = Column(String)
     web_url = Column(String)
     data = Column(JSON)
+    # the table is partitioned by it, see PARTITIONED_TABLES
+    submitted_time = Column(DateTime, default=datetime.utcnow, primary_key=True)
 
-    def set_status(self, status: TestingFarmResult):
-        with get_sa_session() as session:
-            self.status = status
-            session.add(self)
-
-    def set_web_url(self, web_url: str):
-        with get_sa_session() as session:
-            self.web_url = web_url
-            session.add(self)
+    # the partition key is a part of the primary key only because PG requires it
+    __mapper_args__ = {"primary_key": [id]}
 
     def get_project(self) -> Optional[GitProjectModel]:
         trigger_object = self.job_trigger.get_trigger_object()
@@ -1050,7 +1725,7 @@ class TFTTestRunModel(Base):
 
     @classmethod
     def get_by_pipeline_id(cls, pipeline_id: str) -> Optional["TFTTestRunModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return (
                 session.query(TFTTestRunModel)
                 .filter_by(pipeline_id=pipeline_id)
@@ -1058,11 +1733,24 @@ class TFTTestRunModel(Base):
             )
 
     @classmethod
-    def get_range(cls, first: int, last: int) -> Optional[Iterable["TFTTestRunModel"]]:
-        with get_sa_session() as session:
-            return session.query(TFTTestRunModel).order_by(desc(TFTTestRunModel.id))[
-                first:last
-            ]
+    def get_range(
+        cls,
+        first: int,
+        last: int,
+        after: Optional[int] = None,
+        submitted_after: Optional[datetime] = None,
+        submitted_before: Optional[datetime] = None,
+    ) -> Optional[Iterable["TFTTestRunModel"]]:
+        with get_sa_session(read_only=True) as session:
+            query = filter_submitted_time(
+                session.query(TFTTestRunModel),
+                TFTTestRunModel.submitted_time,
+                submitted_after,
+                submitted_before,
+            )
+            if after is not None:
+                query = query.filter(TFTTestRunModel.id < after)
+            return query.order_by(desc(TFTTestRunModel.id))[first:last]
 
 
 class InstallationModel(Base):
@@ -1091,12 +1779,12 @@ class InstallationModel(Base):
 
     @classmethod
     def get_by_id(cls, id: int) -> Optional["InstallationModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(InstallationModel).filter_by(id=id).first()
 
     @classmethod
     def get_by_account_login(cls, account_login: str) -> Optional["InstallationModel"]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return (
                 session.query(InstallationModel)
                 .filter_by(account_login=account_login)
@@ -1105,7 +1793,7 @@ class InstallationModel(Base):
 
     @classmethod
     def get_all(cls) -> Optional[Iterable["InstallationModel"]]:
-        with get_sa_session() as session:
+        with get_sa_session(read_only=True) as session:
             return session.query(InstallationModel).all()
 
     @classmethod
@@ -1140,3 +1828,154 @@ class InstallationModel(Base):
 
     def __repr__(self):
         return f"InstallationModel(id={self.id}, account={self.account_login})"
+
+
+# tables partitioned by month (see the alembic migration 5c8e0f2a7b91) -> partition key
+PARTITIONED_TABLES = {
+    CoprBuildModel.__tablename__: "build_submitted_time",
+    KojiBuildModel.__tablename__: "build_submitted_time",
+    TFTTestRunModel.__tablename__: "submitted_time",
+}
+
+LIST_PARTITIONS_SQL = """
+SELECT child.relname FROM pg_inherits
+    JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+    JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+WHERE parent.relname = :table
+"""
+
+
+def add_months(month: date, months: int) -> date:
+    """ the first day of the month `months` after (or before) the given one """
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02}"
+
+
+def get_partitions(table: str) -> Dict[str, date]:
+    """ monthly partitions of the table -> the first day of their month """
+    pattern = re.compile(rf"^{table}_y(\d{{4}})m(\d{{2}})$")
+    with get_sa_session() as session:
+        names = session.execute(text(LIST_PARTITIONS_SQL), {"table": table})
+        matches = (pattern.match(name) for (name,) in names)
+        return {
+            match.group(0): date(int(match.group(1)), int(match.group(2)), 1)
+            for match in matches
+            if match
+        }
+
+
+def get_default_partition_name(table: str) -> str:
+    """ the partition for the rows no monthly partition exists for """
+    return f"{table}_default"
+
+
+def create_partition(table: str, month: date) -> None:
+    """
+    Create the partition of the table for the month.
+
+    It fails if the default partition already holds rows of the month
+    (the partition had not been created in time), see `move_rows_from_default`.
+    """
+    name = get_partition_name(table, month)
+    with get_sa_session() as session:
+        session.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+
+
+def move_rows_from_default(table: str, month: date) -> int:
+    """
+    Create the partition of the table for the month and move the rows of the month
+    from the default partition to it.
+
+    This is a recovery step, not a part of the regular maintenance: the table is locked
+    (the workers can't insert nor read) until the rows are moved, all in one transaction.
+
+    :return: number of the moved rows
+    """
+    default_name = get_default_partition_name(table)
+    moved_name = f"{get_partition_name(table, month)}_moved"
+    column = PARTITIONED_TABLES[table]
+    bounds = f"{column} >= '{month}' AND {column} < '{add_months(month, 1)}'"
+    with get_sa_session() as session:
+        session.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        session.execute(
+            f"CREATE TEMPORARY TABLE {moved_name} (LIKE {table}) ON COMMIT DROP"
+        )
+        moved = session.execute(
+            f"WITH moved AS (DELETE FROM {default_name} WHERE {bounds} RETURNING *) "
+            f"INSERT INTO {moved_name} SELECT * FROM moved"
+        ).rowcount
+        session.execute(
+            f"CREATE TABLE {get_partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+        session.execute(f"INSERT INTO {table} SELECT * FROM {moved_name}")
+    logger.info(f"Moved {moved} rows of {table} from {default_name}.")
+    return moved
+
+
+def maintain_partitions(
+    months_ahead: int, retention_months: int, now: Optional[datetime] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Create the partitions for the upcoming months and detach the old ones.
+
+    The detached partitions stay in the database as standalone tables (archive),
+    they are just not scanned by the queries anymore.
+
+    Every partition is created/detached in its own transaction,
+    one which fails doesn't stop the maintenance of the others.
+    The default partition is never touched, if it holds rows of a month,
+    its partition is not created, see `move_rows_from_default`.
+
+    :param months_ahead: create the partitions for this many months after the current one
+    :param retention_months: detach the partitions of the months before this many months
+        ago, 0 = never detach anything
+    :param now: current time, defaults to datetime.utcnow()
+    :return: names of the created and of the detached partitions
+    """
+    this_month = (now or datetime.utcnow()).date().replace(day=1)
+    created, detached = [], []
+    for table in PARTITIONED_TABLES:
+        try:
+            partitions = get_partitions(table)
+        except SQLAlchemyError as ex:
+            logger.error(f"Failed to list the partitions of {table}: {ex!r}")
+            continue
+
+        for months in range(1, months_ahead + 1):
+            month = add_months(this_month, months)
+            name = get_partition_name(table, month)
+            if name in partitions:
+                continue
+            try:
+                create_partition(table, month)
+            except SQLAlchemyError as ex:
+                logger.error(
+                    f"Failed to create the partition {name}: {ex!r}, "
+                    f"if {get_default_partition_name(table)} holds rows of the month, "
+                    "move them with the task.move_rows_from_default_partition task."
+                )
+                continue
+            created.append(name)
+
+        if not retention_months:
+            continue
+        oldest_month = add_months(this_month, -retention_months)
+        for name, month in partitions.items():
+            if month >= oldest_month:
+                continue
+            try:
+                with get_sa_session() as session:
+                    session.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            except SQLAlchemyError as ex:
+                logger.error(f"Failed to detach the partition {name}: {ex!r}")
+                continue
+            detached.append(name)
+    return created, detached
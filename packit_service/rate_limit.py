@@ -0,0 +1,278 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Rate limiting of the forge API calls shared by all the workers,
+so that we don't hit the (secondary) rate limits of GitHub during PR storms.
+"""
+import logging
+from copy import copy, deepcopy
+from functools import wraps
+from time import sleep
+from typing import Any, Callable, Optional
+
+from ogr.abstract import Comment, GitProject, Issue, PullRequest, Release
+from prometheus_client import Counter, Gauge
+from redis.exceptions import RedisError
+
+from packit_service.cache import caches_enabled, get_redis
+from packit_service.constants import (
+    FORGE_API_RATE_LIMIT_BURST,
+    FORGE_API_RATE_LIMIT_MAX_DELAY,
+    FORGE_API_RATE_LIMIT_PER_SECOND,
+)
+
+logger = logging.getLogger(__name__)
+
+forge_api_budget_remaining = Gauge(
+    "forge_api_budget_remaining",
+    "Number of forge API calls which can be made without waiting",
+    ["bucket"],
+    multiprocess_mode="livemin",
+)
+forge_api_calls_delayed = Counter(
+    "forge_api_calls_delayed",
+    "Number of forge API calls delayed because of the rate limit",
+    ["bucket"],
+)
+forge_api_calls_rejected = Counter(
+    "forge_api_calls_rejected",
+    "Number of forge API calls not made because they would wait too long",
+    ["bucket"],
+)
+
+# Refill the bucket for the time since the last call and take the tokens.
+# The tokens can go below zero (down to -max_deficit): the caller then waits
+# until they are refilled, so the waiting callers are served in the order they came.
+# If the caller would need to wait longer, no tokens are taken.
+# The time is taken from Redis, the clocks of the workers can differ.
+# Returns whether the tokens were taken and the tokens left.
+TAKE_TOKENS_SCRIPT = """
+redis.replicate_commands()
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local max_deficit = tonumber(ARGV[4])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "timestamp")
+local tokens = tonumber(bucket[1]) or capacity
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * rate)
+local taken = 0
+if tokens - requested >= -max_deficit then
+    tokens = tokens - requested
+    taken = 1
+end
+redis.call("HMSET", KEYS[1], "tokens", tokens, "timestamp", now)
+redis.call("EXPIRE", KEYS[1], math.ceil((capacity + max_deficit) / rate) + 60)
+return {taken, tostring(tokens)}
+"""
+
+
+class RateLimitExceeded(Exception):
+    """ The call would have to wait for the rate limit longer than we allow. """
+
+    def __init__(self, bucket: str, delay: float):
+        super().__init__(f"Rate limit of {bucket} exceeded, retry in {delay:.1f}s.")
+        self.bucket = bucket
+        self.delay = delay
+
+
+class TokenBucketRateLimiter:
+    """
+    Token buckets stored in Redis: every call takes a token,
+    `rate` tokens are added every second, up to `capacity`.
+    """
+
+    key_prefix = "packit-service:rate-limit:"
+
+    def __init__(
+        self,
+        capacity: float = FORGE_API_RATE_LIMIT_BURST,
+        rate: float = FORGE_API_RATE_LIMIT_PER_SECOND,
+        max_delay: float = FORGE_API_RATE_LIMIT_MAX_DELAY,
+    ):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_delay = max_delay
+        self._script: Optional[Callable[..., Any]] = None
+
+    def take(self, bucket: str, tokens: float = 1) -> float:
+        """
+        Take the tokens from the bucket.
+
+        :param bucket: e.g. forge instance and namespace of the project
+        :param tokens: number of tokens to take
+        :return: how long (in seconds) the caller needs to wait before the call
+        :raises RateLimitExceeded: if the caller would wait longer than max_delay,
+            the tokens are not taken then
+        """
+        if not caches_enabled():
+            return 0
+
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(TAKE_TOKENS_SCRIPT)
+            taken, remaining = self._script(
+                keys=[f"{self.key_prefix}{bucket}"],
+                args=[self.capacity, self.rate, tokens, self.max_delay * self.rate],
+            )
+            remaining = float(remaining)
+        except RedisError as ex:
+            # better to risk the rate limit than not to make the call at all
+            logger.warning(f"Can't check the rate limit of {bucket}: {ex!r}")
+            return 0
+
+        forge_api_budget_remaining.labels(bucket=bucket).set(max(remaining, 0))
+        if not taken:
+            raise RateLimitExceeded(bucket, (tokens - remaining) / self.rate)
+        return max(-remaining, 0) / self.rate
+
+    def wait(self, bucket: str) -> None:
+        """
+        Wait until a call can be made (delay the call instead of letting it fail).
+
+        If that would take too long, wait max_delay and try once more,
+        then give up and raise RateLimitExceeded.
+        The Celery task we run in is not retried: we are in the middle of it
+        and it may have already done something (e.g. submitted a build).
+        """
+        try:
+            delay = self.take(bucket)
+        except RateLimitExceeded as ex:
+            logger.info(f"{ex} Waiting {self.max_delay}s and trying again.")
+            sleep(self.max_delay)
+            try:
+                delay = self.take(bucket)
+            except RateLimitExceeded:
+                forge_api_calls_rejected.labels(bucket=bucket).inc()
+                raise
+
+        if delay:
+            logger.info(f"Rate limit of {bucket} reached, waiting {delay:.1f}s.")
+            forge_api_calls_delayed.labels(bucket=bucket).inc()
+            sleep(delay)
+
+
+rate_limiter = TokenBucketRateLimiter()
+
+# objects returned by the project (and by them) which call the API as well
+RATE_LIMITED_TYPES = (GitProject, PullRequest, Issue, Release, Comment)
+
+
+class RateLimited:
+    """
+    Wrapper of an ogr object which waits for the rate limiter
+    before every method call (the attributes are passed through).
+
+    The ogr objects returned by the calls (e.g. PRs and their comments)
+    are wrapped as well and share the bucket.
+    Reading the properties (e.g. `pr.title`) is not limited,
+    they are usually already fetched.
+    """
+
+    def __init__(self, wrapped: Any, limiter: TokenBucketRateLimiter, bucket: str):
+        object.__setattr__(self, "_wrapped", wrapped)
+        object.__setattr__(self, "_limiter", limiter)
+        object.__setattr__(self, "_bucket", bucket)
+
+    # so that isinstance(project, GithubProject) still works
+    @property
+    def __class__(self):
+        return self._wrapped.__class__
+
+    @__class__.setter
+    def __class__(self, value):  # noqa: F811
+        self._wrapped.__class__ = value
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_wrapped":
+            # not initialized (yet)
+            raise AttributeError(name)
+        attribute = getattr(self._wrapped, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        def rate_limited(*args, **kwargs):
+            self._limiter.wait(self._bucket)
+            return self._wrap(attribute(*args, **kwargs))
+
+        return rate_limited
+
+    def _wrap(self, result: Any) -> Any:
+        if isinstance(result, RateLimited):
+            return result
+        if isinstance(result, GitProject):
+            # e.g. a fork, in its own namespace
+            return RateLimitedProject(result, self._limiter)
+        if isinstance(result, RATE_LIMITED_TYPES):
+            return RateLimited(result, self._limiter, self._bucket)
+        if isinstance(result, list):
+            return [self._wrap(item) for item in result]
+        return result
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._wrapped, name, value)
+
+    def _rewrap(self, wrapped: Any) -> "RateLimited":
+        # type(), __class__ is the class of the wrapped object
+        rate_limited = object.__new__(type(self))
+        RateLimited.__init__(rate_limited, wrapped, self._limiter, self._bucket)
+        return rate_limited
+
+    def __copy__(self):
+        return self._rewrap(copy(self._wrapped))
+
+    def __deepcopy__(self, memo):
+        return self._rewrap(deepcopy(self._wrapped, memo))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RateLimited):
+            other = other._wrapped
+        return self._wrapped == other
+
+    def __hash__(self):
+        return hash(self._wrapped)
+
+    def __repr__(self):
+        return repr(self._wrapped)
+
+    def __str__(self):
+        return str(self._wrapped)
+
+
+class RateLimitedProject(RateLimited):
+    """
+    Rate limited ogr project.
+
+    The bucket is shared by all the projects in the namespace
+    (which is what the GitHub App is installed to).
+    """
+
+    def __init__(self, project: GitProject, limiter: TokenBucketRateLimiter):
+        super().__init__(
+            project,
+            limiter,
+            f"{getattr(project.service, 'instance_url', '')}/{project.namespace}",
+        )
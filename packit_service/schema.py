@@ -57,6 +57,14 @@ class ServiceConfigSchema(UserConfigSchema):
     admins = fields.List(fields.String())
     server_name = fields.String()
     gitlab_webhook_tokens = fields.List(fields.String())
+    task_results_retention_days = fields.Integer()
+    partition_retention_months = fields.Integer()
+    db_pool_size = fields.Integer()
+    db_max_overflow = fields.Integer()
+    db_pool_recycle = fields.Integer()
+    db_pool_pre_ping = fields.Bool()
+    db_use_null_pool = fields.Bool()
+    db_replica_max_lag = fields.Integer()
 
     @post_load
     def make_instance(self, data, **kwargs):
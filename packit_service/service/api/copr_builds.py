@@ -23,14 +23,21 @@ from http import HTTPStatus
 from json import dumps
 from logging import getLogger
 
-from flask import make_response
+from flask import make_response, url_for
 
 try:
     from flask_restx import Namespace, Resource
 except ModuleNotFoundError:
     from flask_restplus import Namespace, Resource
 
-from packit_service.service.api.parsers import indices, pagination_arguments
+from packit_service.service.api.parsers import (
+    indices,
+    pagination_arguments,
+    cursor,
+    set_next_cursor,
+    submitted_time,
+    submitted_time_arguments,
+)
 from packit_service.models import CoprBuildModel, optional_time
 
 
@@ -41,7 +48,7 @@ ns = Namespace("copr-builds", description="COPR builds")
 
 @ns.route("")
 class CoprBuildsList(Resource):
-    @ns.expect(pagination_arguments)
+    @ns.expect(pagination_arguments, submitted_time_arguments)
     @ns.response(HTTPStatus.PARTIAL_CONTENT, "Copr builds list follows")
     def get(self):
         """ List all Copr builds. """
@@ -52,19 +59,25 @@ class CoprBuildsList(Resource):
         result = []
 
         first, last = indices()
-        for build in CoprBuildModel.get_merged_chroots(first, last):
-            build_info = CoprBuildModel.get_by_build_id(build.build_id, None)
-            project_info = build_info.get_project()
+        submitted_after, submitted_before = submitted_time()
+        builds = CoprBuildModel.get_merged_chroots(
+            first,
+            last,
+            after=cursor(),
+            submitted_after=submitted_after,
+            submitted_before=submitted_before,
+        )
+        for build in builds:
             build_dict = {
-                "project": build_info.project_name,
+                "project": build.project_name,
                 "build_id": build.build_id,
                 "status_per_chroot": {},
-                "build_submitted_time": optional_time(build_info.build_submitted_time),
-                "web_url": build_info.web_url,
-                "ref": build_info.commit_sha,
-                "pr_id": build_info.get_pr_id(),
-                "repo_namespace": project_info.namespace,
-                "repo_name": project_info.repo_name,
+                "build_submitted_time": optional_time(build.build_submitted_time),
+                "web_url": build.web_url,
+                "ref": build.commit_sha,
+                "pr_id": build.pr_id,
+                "repo_namespace": build.repo_namespace,
+                "repo_name": build.repo_name,
             }
 
             for count, chroot in enumerate(build.target):
@@ -74,6 +87,8 @@ class CoprBuildsList(Resource):
             result.append(build_dict)
 
         resp = make_response(dumps(result), HTTPStatus.PARTIAL_CONTENT)
+        if builds:
+            set_next_cursor(resp, builds, builds[-1].new_id)
         resp.headers["Content-Range"] = f"copr-builds {first + 1}-{last}/*"
         resp.headers["Content-Type"] = "application/json"
         resp.headers["Access-Control-Allow-Origin"] = "*"
@@ -104,7 +119,15 @@ class InstallationItem(Resource):
                 "build_finished_time": optional_time(build.build_finished_time),
                 "commit_sha": build.commit_sha,
                 "web_url": build.web_url,
-                "srpm_logs": build.srpm_build.logs if build.srpm_build else None,
+                "srpm_logs_url": (
+                    url_for(
+                        "builds.get_srpm_build_logs_by_id",
+                        id_=build.srpm_build_id,
+                        _external=True,
+                    )
+                    if build.srpm_build_id
+                    else None
+                ),
                 # For backwards compatability with the old redis based API
                 "ref": build.commit_sha,
             }
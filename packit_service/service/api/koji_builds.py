@@ -23,15 +23,21 @@ from http import HTTPStatus
 from json import dumps
 from logging import getLogger
 
-from flask import make_response
-from itertools import islice
+from flask import make_response, url_for
 
 try:
     from flask_restx import Namespace, Resource
 except ModuleNotFoundError:
     from flask_restplus import Namespace, Resource
 
-from packit_service.service.api.parsers import indices, pagination_arguments
+from packit_service.service.api.parsers import (
+    indices,
+    pagination_arguments,
+    cursor,
+    set_next_cursor,
+    submitted_time,
+    submitted_time_arguments,
+)
 from packit_service.models import KojiBuildModel
 
 logger = getLogger("packit_service")
@@ -41,18 +47,25 @@ koji_builds_ns = Namespace("koji-builds", description="Production builds")
 
 @koji_builds_ns.route("")
 class KojiBuildsList(Resource):
-    @koji_builds_ns.expect(pagination_arguments)
+    @koji_builds_ns.expect(pagination_arguments, submitted_time_arguments)
     @koji_builds_ns.response(HTTPStatus.PARTIAL_CONTENT, "Koji builds list follows")
     def get(self):
         """ List all Koji builds. """
 
         first, last = indices()
-        result = [
-            build.api_structure
-            for build in islice(KojiBuildModel.get_all(), first, last)
-        ]
+        submitted_after, submitted_before = submitted_time()
+        builds = KojiBuildModel.get_range(
+            first,
+            last,
+            after=cursor(),
+            submitted_after=submitted_after,
+            submitted_before=submitted_before,
+        )
+        result = [build.api_structure for build in builds]
 
         resp = make_response(dumps(result), HTTPStatus.PARTIAL_CONTENT)
+        if builds:
+            set_next_cursor(resp, builds, builds[-1].id)
         resp.headers["Content-Range"] = f"koji-builds {first + 1}-{last}/{len(result)}"
         resp.headers["Content-Type"] = "application/json"
         resp.headers["Access-Control-Allow-Origin"] = "*"
@@ -74,8 +87,14 @@ class KojiBuildItem(Resource):
             build = builds_list[0]
 
             build_dict = build.api_structure.copy()
-            build_dict["srpm_logs"] = (
-                build.srpm_build.logs if build.srpm_build else None
+            build_dict["srpm_logs_url"] = (
+                url_for(
+                    "builds.get_srpm_build_logs_by_id",
+                    id_=build.srpm_build_id,
+                    _external=True,
+                )
+                if build.srpm_build_id
+                else None
             )
             build = make_response(dumps(build_dict))
             build.headers["Content-Type"] = "application/json"
@@ -20,15 +20,21 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Callable, Optional, Any, Tuple
+
 from flask import request
 
 try:
-    from flask_restx import reqparse
+    from flask_restx import inputs, reqparse, abort
 except ModuleNotFoundError:
-    from flask_restplus import reqparse
+    from flask_restplus import inputs, reqparse, abort
 
 DEFAULT_PAGE = 1
 DEFAULT_PER_PAGE = 10
+# response header with the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-After"
 
 pagination_arguments = reqparse.RequestParser()
 pagination_arguments.add_argument(
@@ -42,15 +48,118 @@ pagination_arguments.add_argument(
     default=DEFAULT_PER_PAGE,
     help="Results per page",
 )
+pagination_arguments.add_argument(
+    "after",
+    type=str,
+    required=False,
+    help=f"Return the results after this cursor "
+    f"(taken from the {NEXT_CURSOR_HEADER} header of the previous page), "
+    f"empty for the first page; page is ignored then",
+)
+
+submitted_time_arguments = reqparse.RequestParser()
+submitted_time_arguments.add_argument(
+    "submitted_after",
+    type=inputs.datetime_from_iso8601,
+    required=False,
+    help="Return only the results submitted since then (ISO 8601)",
+)
+submitted_time_arguments.add_argument(
+    "submitted_before",
+    type=inputs.datetime_from_iso8601,
+    required=False,
+    help="Return only the results submitted before then (ISO 8601)",
+)
 
 
 def indices():
     """Return indices of first and last entry based on request arguments"""
     args = pagination_arguments.parse_args(request)
     page = args.get("page", DEFAULT_PAGE)
-    if page < DEFAULT_PAGE:
+    if page < DEFAULT_PAGE or args.get("after") is not None:
         page = DEFAULT_PAGE
     per_page = args.get("per_page", DEFAULT_PER_PAGE)
     first = (page - 1) * per_page
     last = page * per_page
     return first, last
+
+
+def cursor(cursor_type: Callable[[str], Any] = int) -> Optional[Any]:
+    """
+    Return the cursor (ID of the last entry of the previous page)
+    based on request arguments, None for the first page
+    or if the client paginates by page numbers.
+
+    The models then use it as `WHERE id < :cursor ORDER BY id DESC`,
+    which doesn't get slower with every page as OFFSET does.
+    """
+    after = pagination_arguments.parse_args(request).get("after")
+    if not after:
+        return None
+    try:
+        return cursor_type(after)
+    except ValueError:
+        abort(HTTPStatus.BAD_REQUEST, f"Invalid cursor: {after!r}")
+        raise  # not reached, abort() raises the HTTP error
+
+
+def composite_cursor(*types: Callable[[str], Any]) -> Callable[[str], Tuple]:
+    """
+    Type of the cursor made of more values, e.g. for ordering by a non-unique column
+    and the ID. The values are separated by commas, only the last one can contain them.
+
+    :param types: types of the values
+    :return: cursor_type for `cursor()`
+    """
+
+    def parse(value: str) -> Tuple:
+        values = value.split(",", len(types) - 1)
+        if len(values) != len(types):
+            raise ValueError(f"{len(types)} values expected")
+        return tuple(type_(part) for type_, part in zip(types, values))
+
+    return parse
+
+
+def format_cursor(*values: Any) -> str:
+    """ The cursor for `composite_cursor()` """
+    return ",".join(
+        value.isoformat() if isinstance(value, datetime) else str(value)
+        for value in values
+    )
+
+
+def to_utc(value: datetime) -> datetime:
+    """ Naive datetime in UTC, as stored in the DB; naive input is in UTC already. """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def submitted_time() -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Return the time window (in UTC, as stored in the DB)
+    the results were submitted in based on request arguments.
+    """
+    args = submitted_time_arguments.parse_args(request)
+    submitted_after, submitted_before = (
+        to_utc(args[name]) if args.get(name) else None
+        for name in ("submitted_after", "submitted_before")
+    )
+    return submitted_after, submitted_before
+
+
+def set_next_cursor(response, entries: list, next_cursor: Any):
+    """
+    Tell the client where the next page starts
+    unless this is the last one or the client paginates by page numbers.
+
+    :param response: response with the page
+    :param entries: entries on the page
+    :param next_cursor: cursor of the last entry on the page
+    """
+    args = pagination_arguments.parse_args(request)
+    if args.get("after") is None:
+        return
+    if len(entries) == args.get("per_page", DEFAULT_PER_PAGE):
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
@@ -8,7 +8,14 @@ try:
 except ModuleNotFoundError:
     from flask_restplus import Namespace, Resource
 
-from packit_service.service.api.parsers import indices, pagination_arguments
+from packit_service.service.api.parsers import (
+    indices,
+    pagination_arguments,
+    cursor,
+    composite_cursor,
+    format_cursor,
+    set_next_cursor,
+)
 from packit_service.models import GitProjectModel
 
 logger = getLogger("packit_service")
@@ -29,22 +36,30 @@ class ProjectsList(Resource):
         result = []
         first, last = indices()
 
-        projects_list = GitProjectModel.get_projects(first, last)
+        projects_list = GitProjectModel.get_projects(
+            first, last, after=cursor(composite_cursor(int, str))
+        )
         if not projects_list:
             return ([], HTTPStatus.OK)
-        for project in projects_list:
+        for row in projects_list:
             project_info = {
-                "namespace": project.namespace,
-                "repo_name": project.repo_name,
-                "project_url": project.project_url,
-                "prs_handled": len(project.pull_requests),
-                "branches_handled": len(project.branches),
-                "releases_handled": len(project.releases),
-                "issues_handled": len(project.issues),
+                "namespace": row.project.namespace,
+                "repo_name": row.project.repo_name,
+                "project_url": row.project.project_url,
+                "prs_handled": row.prs_handled,
+                "branches_handled": row.branches_handled,
+                "releases_handled": row.releases_handled,
+                "issues_handled": row.issues_handled,
             }
             result.append(project_info)
 
         resp = make_response(dumps(result), HTTPStatus.PARTIAL_CONTENT)
+        last_project = projects_list[-1].project
+        set_next_cursor(
+            resp,
+            projects_list,
+            format_cursor(last_project.id, last_project.namespace or ""),
+        )
         resp.headers["Content-Range"] = f"git-projects {first + 1}-{last}/*"
         resp.headers["Content-Type"] = "application/json"
         resp.headers["Access-Control-Allow-Origin"] = "*"
@@ -68,7 +83,7 @@ class ProjectsPRs(Resource):
         first, last = indices()
 
         pr_list = GitProjectModel.get_project_prs(
-            first, last, forge, namespace, repo_name
+            first, last, forge, namespace, repo_name, after=cursor()
         )
         if not pr_list:
             return ([], HTTPStatus.OK)
@@ -102,6 +117,7 @@ class ProjectsPRs(Resource):
             result.append(pr_info)
 
         resp = make_response(dumps(result), HTTPStatus.PARTIAL_CONTENT)
+        set_next_cursor(resp, pr_list, pr_list[-1].pr_id)
         resp.headers["Content-Range"] = f"git-project-prs {first + 1}-{last}/*"
         resp.headers["Content-Type"] = "application/json"
         resp.headers["Access-Control-Allow-Origin"] = "*"
@@ -19,8 +19,8 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+from datetime import datetime
 from http import HTTPStatus
-from itertools import islice
 from json import dumps
 from logging import getLogger
 
@@ -32,7 +32,14 @@ except ModuleNotFoundError:
     from flask_restplus import Namespace, Resource
 
 from packit_service.models import TaskResultModel
-from packit_service.service.api.parsers import pagination_arguments, indices
+from packit_service.service.api.parsers import (
+    pagination_arguments,
+    indices,
+    cursor,
+    composite_cursor,
+    format_cursor,
+    set_next_cursor,
+)
 from packit_service.service.events import Event
 
 logger = getLogger("packit_service")
@@ -48,12 +55,20 @@ class TasksList(Resource):
         """ List all Celery tasks / jobs """
         first, last = indices()
         tasks = []
-        for task in islice(TaskResultModel.get_all(), first, last):
+        task_results = TaskResultModel.get_range(
+            first, last, after=cursor(composite_cursor(datetime.fromisoformat, str))
+        )
+        for task in task_results:
             data = task.to_dict()
             data["event"] = Event.ts2str(data["event"])
             tasks.append(data)
 
         resp = make_response(dumps(tasks), HTTPStatus.PARTIAL_CONTENT)
+        if tasks:
+            last_task = task_results[-1]
+            set_next_cursor(
+                resp, tasks, format_cursor(last_task.date_created, last_task.task_id)
+            )
         resp.headers["Content-Range"] = f"tasks {first+1}-{last}/{len(tasks)}"
         resp.headers["Content-Type"] = "application/json"
         return resp
@@ -33,9 +33,21 @@ except ModuleNotFoundError:
 
 from packit_service.celerizer import celery_app
 from packit_service.config import ServiceConfig
+from packit_service.constants import (
+    CeleryTaskQueue,
+    TESTING_FARM_RESULTS_EVENT_TYPE,
+)
 from packit_service.service.api.errors import ValidationFailed
 from packit_service.models import TFTTestRunModel
-from packit_service.service.api.parsers import indices, pagination_arguments
+from packit_service.service.api.parsers import (
+    indices,
+    pagination_arguments,
+    cursor,
+    set_next_cursor,
+    submitted_time,
+    submitted_time_arguments,
+)
+from packit_service.service.deduplication import deduplicator
 
 logger = logging.getLogger("packit_service")
 
@@ -109,9 +121,20 @@ class TestingFarmResults(Resource):
             logger.info(f"/testing-farm/results {exc}")
             return str(exc), HTTPStatus.UNAUTHORIZED
 
-        celery_app.send_task(
-            name="task.steve_jobs.process_message", kwargs={"event": msg}
-        )
+        delivery_key = deduplicator.content_key("testing-farm", request.get_data())
+        if deduplicator.is_duplicate(delivery_key):
+            return "Test results already accepted", HTTPStatus.OK
+
+        try:
+            celery_app.send_task(
+                name="task.steve_jobs.process_message",
+                kwargs={"event": msg, "event_type": TESTING_FARM_RESULTS_EVENT_TYPE},
+                queue=CeleryTaskQueue.short.value,
+            )
+        except Exception:
+            # the results can be sent again
+            deduplicator.forget(delivery_key)
+            raise
 
         return "Test results accepted", HTTPStatus.ACCEPTED
 
@@ -138,7 +161,7 @@ class TestingFarmResults(Resource):
         logger.warning(msg)
         raise ValidationFailed(msg)
 
-    @ns.expect(pagination_arguments)
+    @ns.expect(pagination_arguments, submitted_time_arguments)
     @ns.response(HTTPStatus.PARTIAL_CONTENT, "Testing Farm Results follow")
     def get(self):
         """ List all Testing Farm  results. """
@@ -146,9 +169,17 @@ class TestingFarmResults(Resource):
         result = []
 
         first, last = indices()
+        submitted_after, submitted_before = submitted_time()
+        tf_results = TFTTestRunModel.get_range(
+            first,
+            last,
+            after=cursor(),
+            submitted_after=submitted_after,
+            submitted_before=submitted_before,
+        )
         # results have nothing other than ref in common, so it doesnt make sense to
         # merge them like copr builds
-        for tf_result in TFTTestRunModel.get_range(first, last):
+        for tf_result in tf_results:
 
             result_dict = {
                 "pipeline_id": tf_result.pipeline_id,
@@ -166,6 +197,8 @@ class TestingFarmResults(Resource):
             result.append(result_dict)
 
         resp = make_response(dumps(result), HTTPStatus.PARTIAL_CONTENT)
+        if tf_results:
+            set_next_cursor(resp, tf_results, tf_results[-1].id)
         resp.headers["Content-Range"] = f"test-results {first + 1}-{last}/*"
         resp.headers["Content-Type"] = "application/json"
         resp.headers["Access-Control-Allow-Origin"] = "*"
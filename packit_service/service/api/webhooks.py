@@ -34,7 +34,10 @@ except ModuleNotFoundError:
 
 from packit_service.celerizer import celery_app
 from packit_service.config import ServiceConfig
+from packit_service.constants import CeleryTaskQueue
 from packit_service.service.api.errors import ValidationFailed
+from packit_service.service.deduplication import deduplicator
+from packit_service.service.payload import slim_payload
 
 logger = getLogger("packit_service")
 config = ServiceConfig.get_service_config()
@@ -63,6 +66,9 @@ ping_payload_gitlab = ns.model(
 github_webhook_calls = Counter(
     "github_webhook_calls", "Number of times the GitHub webhook is called", ["result"]
 )
+gitlab_webhook_calls = Counter(
+    "gitlab_webhook_calls", "Number of times the Gitlab webhook is called", ["result"]
+)
 
 
 @ns.route("/github")
@@ -100,10 +106,30 @@ class GithubWebhook(Resource):
             github_webhook_calls.labels(result="not_interested").inc()
             return "Thanks but we don't care about this event", HTTPStatus.ACCEPTED
 
+        delivery_id = request.headers.get("X-GitHub-Delivery")
+        delivery_key = f"github:{delivery_id}" if delivery_id else None
+        if delivery_key and deduplicator.is_duplicate(delivery_key):
+            github_webhook_calls.labels(result="duplicate").inc()
+            return "This delivery was already accepted.", HTTPStatus.OK
+
         # TODO: define task names at one place
-        celery_app.send_task(
-            name="task.steve_jobs.process_message", kwargs={"event": msg}
-        )
+        event_type = request.headers.get("X-GitHub-Event")
+        try:
+            celery_app.send_task(
+                name="task.steve_jobs.process_message",
+                kwargs={
+                    "event": slim_payload(msg, event_type),
+                    "event_type": event_type,
+                },
+                # process_message only parses the event and sends the handler tasks
+                # to their queues (TASK_QUEUES), it must not wait behind the builds
+                queue=CeleryTaskQueue.short.value,
+            )
+        except Exception:
+            # the redelivery of this webhook must not be dropped
+            if delivery_key:
+                deduplicator.forget(delivery_key)
+            raise
         github_webhook_calls.labels(result="accepted").inc()
 
         return "Webhook accepted. We thank you, Github.", HTTPStatus.ACCEPTED
@@ -184,25 +210,49 @@ class GitlabWebhook(Resource):
 
         if not msg:
             logger.debug("/webhooks/gitlab: we haven't received any JSON data.")
+            gitlab_webhook_calls.labels(result="no_data").inc()
             return "We haven't received any JSON data.", HTTPStatus.BAD_REQUEST
 
         if all([msg.get("zen"), msg.get("hook_id"), msg.get("hook")]):
             logger.debug(f"/webhooks/gitlab received ping event: {msg['hook']}")
+            gitlab_webhook_calls.labels(result="pong").inc()
             return "Pong!", HTTPStatus.OK
 
         try:
             self.validate_token()
         except ValidationFailed as exc:
             logger.info(f"/webhooks/gitlab {exc}")
+            gitlab_webhook_calls.labels(result="invalid_token").inc()
             return str(exc), HTTPStatus.UNAUTHORIZED
 
         if not self.interested():
+            gitlab_webhook_calls.labels(result="not_interested").inc()
             return "Thanks but we don't care about this event", HTTPStatus.ACCEPTED
 
+        # Gitlab doesn't send any ID of the delivery
+        delivery_key = deduplicator.content_key("gitlab", request.get_data())
+        if deduplicator.is_duplicate(delivery_key):
+            gitlab_webhook_calls.labels(result="duplicate").inc()
+            return "This delivery was already accepted.", HTTPStatus.OK
+
         # TODO: define task names at one place
-        celery_app.send_task(
-            name="task.steve_jobs.process_message", kwargs={"event": msg}
-        )
+        event_type = request.headers.get("X-Gitlab-Event")
+        try:
+            celery_app.send_task(
+                name="task.steve_jobs.process_message",
+                kwargs={
+                    "event": slim_payload(msg, event_type),
+                    "event_type": event_type,
+                },
+                # process_message only parses the event and sends the handler tasks
+                # to their queues (TASK_QUEUES), it must not wait behind the builds
+                queue=CeleryTaskQueue.short.value,
+            )
+        except Exception:
+            # the redelivery of this webhook must not be dropped
+            deduplicator.forget(delivery_key)
+            raise
+        gitlab_webhook_calls.labels(result="accepted").inc()
 
         return "Webhook accepted. We thank you, Gitlab.", HTTPStatus.ACCEPTED
 
@@ -23,7 +23,7 @@
 import logging
 from os import getenv
 
-from flask import Flask
+from flask import Flask, request
 from lazy_object_proxy import Proxy
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 from prometheus_client import make_wsgi_app as prometheus_app
@@ -33,6 +33,7 @@ from packit_service.config import ServiceConfig
 from packit_service.sentry_integration import configure_sentry
 from packit_service.service.api import blueprint
 from packit_service.log_versions import log_service_versions
+from packit_service.models import prefer_replica
 from packit_service.service.views import builds_blueprint
 
 set_logging(logger_name="packit_service", level=logging.DEBUG)
@@ -48,6 +49,16 @@ def get_flask_application():
     app = Flask(__name__)
     app.register_blueprint(blueprint)
     app.register_blueprint(builds_blueprint)
+
+    # the dashboard traffic doesn't need to slow down the workers writing to the primary
+    @app.before_request
+    def read_from_replica():
+        prefer_replica(request.method == "GET")
+
+    @app.teardown_request
+    def stop_reading_from_replica(exception=None):
+        prefer_replica(False)
+
     s = ServiceConfig.get_service_config()
     # https://flask.palletsprojects.com/en/1.1.x/config/#SERVER_NAME
     # also needs to contain port if it's not 443
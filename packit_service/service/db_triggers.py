@@ -22,6 +22,9 @@
 
 """
 This file contains helper classes for events.
+
+The trigger is created/loaded from the database on the first access
+and kept in the event object.
 """
 from typing import Optional
 
@@ -41,6 +44,8 @@ class AddReleaseDbTrigger:
     repo_name: str
     project_url: str
 
+    _db_trigger: Optional[AbstractTriggerDbType] = None
+
     @property
     def commit_sha(self):
         """
@@ -50,13 +55,15 @@ class AddReleaseDbTrigger:
 
     @property
     def db_trigger(self) -> Optional[AbstractTriggerDbType]:
-        return ProjectReleaseModel.get_or_create(
-            tag_name=self.tag_name,
-            namespace=self.repo_namespace,
-            repo_name=self.repo_name,
-            project_url=self.project_url,
-            commit_hash=self.commit_sha,
-        )
+        if not self._db_trigger:
+            self._db_trigger = ProjectReleaseModel.get_or_create(
+                tag_name=self.tag_name,
+                namespace=self.repo_namespace,
+                repo_name=self.repo_name,
+                project_url=self.project_url,
+                commit_hash=self.commit_sha,
+            )
+        return self._db_trigger
 
 
 class AddPullRequestDbTrigger:
@@ -64,14 +71,18 @@ class AddPullRequestDbTrigger:
     project: GitProject
     project_url: str
 
+    _db_trigger: Optional[AbstractTriggerDbType] = None
+
     @property
     def db_trigger(self) -> Optional[AbstractTriggerDbType]:
-        return PullRequestModel.get_or_create(
-            pr_id=self.pr_id,
-            namespace=self.project.namespace,
-            repo_name=self.project.repo,
-            project_url=self.project_url,
-        )
+        if not self._db_trigger:
+            self._db_trigger = PullRequestModel.get_or_create(
+                pr_id=self.pr_id,
+                namespace=self.project.namespace,
+                repo_name=self.project.repo,
+                project_url=self.project_url,
+            )
+        return self._db_trigger
 
 
 class AddIssueDbTrigger:
@@ -80,14 +91,18 @@ class AddIssueDbTrigger:
     repo_name: str
     project_url: str
 
+    _db_trigger: Optional[AbstractTriggerDbType] = None
+
     @property
     def db_trigger(self) -> Optional[AbstractTriggerDbType]:
-        return IssueModel.get_or_create(
-            issue_id=self.issue_id,
-            namespace=self.repo_namespace,
-            repo_name=self.repo_name,
-            project_url=self.project_url,
-        )
+        if not self._db_trigger:
+            self._db_trigger = IssueModel.get_or_create(
+                issue_id=self.issue_id,
+                namespace=self.repo_namespace,
+                repo_name=self.repo_name,
+                project_url=self.project_url,
+            )
+        return self._db_trigger
 
 
 class AddBranchPushDbTrigger:
@@ -96,11 +111,15 @@ class AddBranchPushDbTrigger:
     repo_name: str
     project_url: str
 
+    _db_trigger: Optional[AbstractTriggerDbType] = None
+
     @property
     def db_trigger(self) -> Optional[AbstractTriggerDbType]:
-        return GitBranchModel.get_or_create(
-            branch_name=self.git_ref,
-            namespace=self.repo_namespace,
-            repo_name=self.repo_name,
-            project_url=self.project_url,
-        )
+        if not self._db_trigger:
+            self._db_trigger = GitBranchModel.get_or_create(
+                branch_name=self.git_ref,
+                namespace=self.repo_namespace,
+                repo_name=self.repo_name,
+                project_url=self.project_url,
+            )
+        return self._db_trigger
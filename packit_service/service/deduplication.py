@@ -0,0 +1,104 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Drop webhooks we have already received (e.g. redelivered by GitHub after a timeout)
+so that we don't run the same builds twice.
+"""
+import logging
+from hashlib import sha256
+
+from redis.exceptions import RedisError
+
+from packit_service.cache import TTLCache, get_redis
+from packit_service.constants import (
+    WEBHOOK_DEDUPLICATION_CACHE_SIZE,
+    WEBHOOK_DEDUPLICATION_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryDeduplicator:
+    """
+    Remembers the deliveries we have seen in the last `ttl` seconds.
+
+    The deliveries are kept in-process (so that most of the duplicates are caught
+    without asking Redis) and in Redis, which is shared by all the service processes.
+    """
+
+    key_prefix = "packit-service:webhook-delivery:"
+
+    def __init__(
+        self,
+        max_size: int = WEBHOOK_DEDUPLICATION_CACHE_SIZE,
+        ttl: int = WEBHOOK_DEDUPLICATION_TTL,
+    ):
+        self.ttl = ttl
+        self._seen = TTLCache(max_size=max_size, ttl=ttl)
+
+    @staticmethod
+    def content_key(source: str, payload: bytes) -> str:
+        """
+        Key for deliveries which don't come with an ID (Gitlab, Testing Farm).
+        """
+        return f"{source}:{sha256(payload).hexdigest()}"
+
+    def is_duplicate(self, key: str) -> bool:
+        """
+        Check if we have already seen the delivery and remember it if we haven't.
+
+        :param key: delivery ID or content_key of the delivery
+        :return: True if the delivery was already received
+        """
+        if key in self._seen:
+            logger.info(f"Delivery {key} already received.")
+            return True
+        self._seen.set(key, True)
+
+        try:
+            # SET NX is atomic, so only one of the concurrent deliveries can get through
+            is_new = get_redis().set(f"{self.key_prefix}{key}", 1, nx=True, ex=self.ttl)
+        except RedisError as ex:
+            # better to process the delivery twice than not at all
+            logger.warning(f"Can't check the delivery {key} in Redis: {ex!r}")
+            return False
+
+        if not is_new:
+            logger.info(f"Delivery {key} already received by another process.")
+        return not is_new
+
+    def forget(self, key: str) -> None:
+        """
+        Let the delivery through next time, e.g. when we failed to send it to the workers
+        and the sender retries it.
+
+        :param key: delivery ID or content_key of the delivery
+        """
+        self._seen.pop(key)
+        try:
+            get_redis().delete(f"{self.key_prefix}{key}")
+        except RedisError as ex:
+            logger.warning(f"Can't remove the delivery {key} from Redis: {ex!r}")
+
+
+deduplicator = DeliveryDeduplicator()
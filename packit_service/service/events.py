@@ -33,6 +33,7 @@ from ogr.abstract import GitProject
 from ogr.services.pagure import PagureProject
 from packit.config import PackageConfig, get_package_config_from_repo
 
+from packit_service.cache import caches_enabled
 from packit_service.config import (
     ServiceConfig,
     PackageConfigGetter,
@@ -239,7 +240,10 @@ class Event:
 
     def get_dict(self, default_dict: Optional[Dict] = None) -> dict:
         d = default_dict or self.__dict__
-        d = copy.deepcopy(d)
+        # the DB model is not serializable, we send the trigger_id instead
+        d = copy.deepcopy(
+            {key: value for key, value in d.items() if key != "_db_trigger"}
+        )
         # whole dict have to be JSON serializable because of redis
         d["event_type"] = self.__class__.__name__
         d["trigger"] = d["trigger"].value
@@ -363,14 +367,33 @@ class AbstractForgeIndependentEvent(Event):
                 f"(Spec-file is expected to be in {spec_path})"
             )
 
-        package_config = PackageConfigGetter.get_package_config_from_repo(
-            base_project=self.base_project,
-            project=self.project,
-            reference=self.commit_sha,
-            pr_id=self.pr_id,
-            fail_when_missing=False,
-            spec_file_path=spec_path,
-        )
+        # the config can change only with a new commit
+        cacheable = bool(self.project_url and self.commit_sha) and caches_enabled()
+        if cacheable:
+            is_cached, package_config = PackageConfigGetter.get_cached_package_config(
+                project_url=self.project_url,
+                commit_sha=self.commit_sha,
+                spec_file_path=spec_path,
+            )
+        else:
+            is_cached = False
+
+        if not is_cached:
+            package_config = PackageConfigGetter.get_package_config_from_repo(
+                base_project=self.base_project,
+                project=self.project,
+                reference=self.commit_sha,
+                pr_id=self.pr_id,
+                fail_when_missing=False,
+                spec_file_path=spec_path,
+            )
+            if cacheable:
+                PackageConfigGetter.cache_package_config(
+                    project_url=self.project_url,
+                    commit_sha=self.commit_sha,
+                    package_config=package_config,
+                    spec_file_path=spec_path,
+                )
 
         # job config change note:
         #   this is used in sync-from-downstream which is buggy - we don't need to change this
@@ -848,7 +871,6 @@ class TestingFarmResultsEvent(AbstractForgeIndependentEvent):
         result = super().get_dict()
         result["result"] = result["result"].value
         result["pr_id"] = self.pr_id
-        result.pop("_db_trigger")
         return result
 
     @property
@@ -992,7 +1014,6 @@ class KojiBuildEvent(AbstractForgeIndependentEvent):
         result["git_ref"] = self.git_ref
         result["identifier"] = self.identifier
         result.pop("_build_model")
-        result.pop("_db_trigger")
         return result
 
     def get_koji_build_logs_url(self) -> Optional[str]:
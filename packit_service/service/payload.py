@@ -0,0 +1,155 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Webhook payloads contain whole repository, user and organization objects,
+but the parsers (packit_service/worker/parser.py) read only a few fields.
+We throw the rest away before the payload is sent to the workers.
+
+If you make a parser read a new field, add it here as well.
+"""
+from typing import Any, Optional
+
+# Projection of the payload: key -> True (keep the value as it is)
+#                                or projection of the nested dict
+#                                (applied to all the items if the value is a list)
+REPOSITORY = {
+    "name": True,
+    "full_name": True,
+    "html_url": True,
+    "owner": {"login": True},
+}
+GITLAB_PROJECT = {"path_with_namespace": True, "web_url": True}
+GITLAB_MERGE_REQUEST = {
+    "id": True,
+    "iid": True,
+    "state": True,
+    "action": True,
+    "source": GITLAB_PROJECT,
+    "target": GITLAB_PROJECT,
+    "last_commit": {"id": True},
+}
+
+# key is the event type sent in the X-GitHub-Event or X-Gitlab-Event header
+PROJECTIONS = {
+    "pull_request": {
+        "action": True,
+        "number": True,
+        "pull_request": {
+            "head": {"sha": True, "repo": REPOSITORY},
+            "base": {"sha": True, "repo": REPOSITORY},
+            "user": {"login": True},
+        },
+        "repository": REPOSITORY,
+    },
+    # both issue and pull request comments
+    "issue_comment": {
+        "action": True,
+        "issue": {"number": True, "pull_request": True, "user": {"login": True}},
+        "comment": {"body": True, "user": {"login": True}},
+        "repository": REPOSITORY,
+    },
+    "release": {
+        "action": True,
+        "release": {"tag_name": True},
+        "repository": REPOSITORY,
+    },
+    "push": {
+        "ref": True,
+        "before": True,
+        "after": True,
+        "head": True,
+        "head_commit": {"id": True},
+        "size": True,
+        "commits": {"id": True},
+        "pusher": {"name": True},
+        "repository": REPOSITORY,
+    },
+    "installation": {
+        "action": True,
+        "installation": {
+            "id": True,
+            "created_at": True,
+            "account": {"login": True, "id": True, "url": True, "type": True},
+        },
+        "repositories": {"full_name": True},
+        "repositories_added": {"full_name": True},
+        "sender": {"id": True, "login": True},
+    },
+    "Merge Request Hook": {
+        "object_kind": True,
+        "object_attributes": GITLAB_MERGE_REQUEST,
+        "user": {"username": True},
+        "project": GITLAB_PROJECT,
+    },
+    # both issue and merge request comments
+    "Note Hook": {
+        "object_kind": True,
+        "object_attributes": {"note": True, "action": True},
+        "issue": {"id": True, "iid": True, "state": True},
+        "merge_request": GITLAB_MERGE_REQUEST,
+        "user": {"username": True},
+        "project": GITLAB_PROJECT,
+    },
+    "Push Hook": {
+        "object_kind": True,
+        "ref": True,
+        "before": True,
+        "user_username": True,
+        "commits": {"id": True},
+        "total_commits_count": True,
+        "project": GITLAB_PROJECT,
+    },
+}
+PROJECTIONS["installation_repositories"] = PROJECTIONS["installation"]
+
+
+def apply_projection(value: Any, projection: dict) -> Any:
+    """
+    Keep only the keys from the projection.
+
+    Keys which are not in the value are not added
+    so that the parsers can still tell a missing key from an empty one.
+    """
+    if isinstance(value, list):
+        return [apply_projection(item, projection) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: value[key] if nested is True else apply_projection(value[key], nested)
+        for key, nested in projection.items()
+        if key in value
+    }
+
+
+def slim_payload(payload: dict, event_type: Optional[str]) -> dict:
+    """
+    Remove the fields the parsers don't need from the webhook payload.
+
+    :param payload: webhook payload
+    :param event_type: value of the X-GitHub-Event or X-Gitlab-Event header
+    :return: the smaller payload, or the original one for unknown event types
+    """
+    projection = PROJECTIONS.get(event_type)
+    if not projection:
+        return payload
+    return apply_projection(payload, projection)
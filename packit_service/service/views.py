@@ -25,7 +25,15 @@ Flask views for packit-service
 """
 from typing import Union
 
-from flask import Blueprint, render_template, redirect, url_for
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    redirect,
+    render_template,
+    stream_with_context,
+    url_for,
+)
 
 from packit_service import models
 from packit_service.log_versions import log_service_versions
@@ -41,12 +49,19 @@ from packit_service.models import (
 builds_blueprint = Blueprint("builds", __name__)
 
 
+def _stream_template(template_name: str, **context) -> Response:
+    """ render the template in chunks as they are consumed by the client """
+    current_app.update_template_context(context)
+    template = current_app.jinja_env.get_template(template_name)
+    return Response(stream_with_context(template.stream(context)))
+
+
 @builds_blueprint.route("/srpm-build/<int:id_>/logs", methods=("GET",))
 def get_srpm_build_logs_by_id(id_):
     log_service_versions()
     srpm_build = SRPMBuildModel.get_by_id(id_)
     if srpm_build:
-        return render_template("srpm_logs.html", id=id_, srpm_build=srpm_build)
+        return _stream_template("srpm_logs.html", id=id_, logs=srpm_build.iter_logs())
     return f"We can't find any info about SRPM build {id_}.\n", 404
 
 
@@ -20,44 +20,167 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
 
 from copr.v3 import Client as CoprClient
+from copr.v3.exceptions import CoprException
+from prometheus_client import Counter, Gauge, Histogram
 
 from packit_service.constants import (
     COPR_SUCC_STATE,
     COPR_API_SUCC_STATE,
     COPR_API_FAIL_STATE,
+    COPR_BABYSIT_CONCURRENCY,
+    COPR_BABYSIT_MAX_AGE,
 )
 from packit_service.models import CoprBuildModel
 from packit_service.service.events import CoprBuildEvent, FedmsgTopic, EventData
+from packit_service.worker.clients import get_copr_client
 from packit_service.worker.handlers import CoprBuildEndHandler
 from packit_service.worker.jobs import get_config_for_handler_kls
 
 logger = logging.getLogger(__name__)
 
+copr_babysit_duration = Histogram(
+    "copr_babysit_duration",
+    "Time (in seconds) it takes to check all the pending Copr builds",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600),
+)
+copr_builds_pending = Gauge(
+    "copr_builds_pending",
+    "Number of Copr builds (build IDs) waiting to be finished",
+    multiprocess_mode="livemax",
+)
+copr_builds_timed_out = Counter(
+    "copr_builds_timed_out",
+    "Number of Copr builds (chroots) set to error because they didn't end in time",
+)
+
+
+def check_pending_copr_builds() -> None:
+    """
+    Check all the pending Copr builds (submitted in the last COPR_BABYSIT_MAX_AGE)
+    and refresh the statuses of those which ended.
+
+    Used in the periodic babysit task. Copr is polled once per build ID
+    (using one client, at most COPR_BABYSIT_CONCURRENCY requests at a time).
+    The older pending builds time out.
+    """
+    with copr_babysit_duration.time():
+        max_submitted_time = datetime.utcnow() - COPR_BABYSIT_MAX_AGE
+        time_out_copr_builds(
+            CoprBuildModel.get_all_by_status(
+                "pending", submitted_before=max_submitted_time
+            )
+        )
+
+        builds_by_id: Dict[str, List[CoprBuildModel]] = defaultdict(list)
+        for build in CoprBuildModel.get_all_by_status(
+            "pending", submitted_after=max_submitted_time
+        ):
+            builds_by_id[build.build_id].append(build)
+        copr_builds_pending.set(len(builds_by_id))
+        if not builds_by_id:
+            return
+        logger.info(f"Checking {len(builds_by_id)} pending Copr builds.")
+
+        copr_client = get_copr_client()
 
-def check_copr_build(build_id: int) -> bool:
+        def get_build(build_id: str) -> Optional[Any]:
+            try:
+                return copr_client.build_proxy.get(int(build_id))
+            except CoprException as ex:
+                logger.warning(f"Can't get Copr build {build_id}: {ex!r}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=COPR_BABYSIT_CONCURRENCY) as executor:
+            builds_copr = list(executor.map(get_build, builds_by_id))
+
+        # the handlers work with the DB, so they run in this thread
+        for (build_id, builds), build_copr in zip(builds_by_id.items(), builds_copr):
+            if not build_copr or not build_copr.ended_on:
+                continue
+            try:
+                update_copr_builds(copr_client, int(build_id), builds, build_copr)
+            except Exception as ex:
+                # don't let one build block all the others
+                logger.error(f"Failed to update Copr build {build_id}: {ex!r}")
+
+
+def time_out_copr_builds(builds: Iterable[CoprBuildModel]) -> None:
+    """
+    Set the builds which haven't ended in COPR_BABYSIT_MAX_AGE to error
+    and report it, so that they are not left pending forever.
+
+    :param builds: pending builds submitted before COPR_BABYSIT_MAX_AGE
     """
-    Check the copr_build with given id and refresh the status if needed.
+    for build in builds:
+        logger.info(f"Copr build {build.build_id} ({build.target}) timed out.")
+        try:
+            event = get_copr_build_end_event(build, COPR_API_FAIL_STATE)
+            for job_config in get_config_for_handler_kls(
+                handler_kls=CoprBuildEndHandler,
+                event=event,
+                package_config=event.get_package_config(),
+            ):
+                CoprBuildEndHandler(
+                    package_config=event.package_config,
+                    job_config=job_config,
+                    data=EventData.from_event_dict(event.get_dict()),
+                    copr_event=event,
+                ).time_out()
+        except Exception as ex:
+            # don't let one build block all the others, it's tried again next time
+            logger.error(f"Failed to time out Copr build {build.build_id}: {ex!r}")
+            continue
+        copr_builds_timed_out.inc()
+
 
-    Used in the babysit task.
+def get_copr_build_end_event(
+    build: CoprBuildModel,
+    status: int,
+    pkg: str = "",
+    timestamp: Optional[float] = None,
+) -> CoprBuildEvent:
+    """
+    The event Copr would have sent when the build of the chroot ended.
 
-    :param build_id: id of the copr_build (CoprBuildModel.build.id)
-    :return: True if in case of successful run, False when we need to retry
+    :param build: build of one chroot from the DB
+    :param status: COPR_API_SUCC_STATE or COPR_API_FAIL_STATE
+    :param pkg: name of the SRPM
+    :param timestamp: when the build ended
     """
-    logger.debug(f"Getting copr build ID {build_id} from DB.")
-    builds = CoprBuildModel.get_all_by_build_id(build_id)
-    if not builds:
-        logger.warning(f"Copr build {build_id} not in DB.")
-        return True
+    return CoprBuildEvent(
+        topic=FedmsgTopic.copr_build_finished.value,
+        build_id=int(build.build_id),
+        build=build,
+        chroot=build.target,
+        status=status,
+        owner=build.owner,
+        project_name=build.project_name,
+        pkg=pkg,
+        timestamp=timestamp,
+    )
 
-    copr_client = CoprClient.create_from_config_file()
-    build_copr = copr_client.build_proxy.get(build_id)
 
-    if not build_copr.ended_on:
-        logger.info("The copr build is still in progress.")
-        return False
+def update_copr_builds(
+    copr_client: CoprClient,
+    build_id: int,
+    builds: Iterable[CoprBuildModel],
+    build_copr: Any,
+) -> None:
+    """
+    Run CoprBuildEndHandler for the chroots of the ended Copr build
+    which are still pending in the DB.
 
+    :param copr_client: Copr client to get the results of the chroots with
+    :param build_id: Copr build ID
+    :param builds: builds (one per chroot) with the build ID from the DB
+    :param build_copr: the build from Copr
+    """
     logger.info(f"The status is {build_copr.state!r}.")
 
     for build in builds:
@@ -68,21 +191,15 @@ def check_copr_build(build_id: int) -> bool:
             )
             continue
         chroot_build = copr_client.build_chroot_proxy.get(build_id, build.target)
-        event = CoprBuildEvent(
-            topic=FedmsgTopic.copr_build_finished.value,
-            build_id=build_id,
-            build=build,
-            chroot=build.target,
+        event = get_copr_build_end_event(
+            build,
             status=(
                 COPR_API_SUCC_STATE
                 if chroot_build.state == COPR_SUCC_STATE
                 else COPR_API_FAIL_STATE
             ),
-            owner=build.owner,
-            project_name=build.project_name,
-            pkg=build_copr.source_package.get(
-                "name", ""
-            ),  # this seems to be the SRPM name
+            # this seems to be the SRPM name
+            pkg=build_copr.source_package.get("name", ""),
             timestamp=chroot_build.ended_on,
         )
 
@@ -99,4 +216,3 @@ def check_copr_build(build_id: int) -> bool:
                 data=EventData.from_event_dict(event.get_dict()),
                 copr_event=event,
             ).run()
-    return True
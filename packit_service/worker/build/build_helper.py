@@ -34,6 +34,7 @@ from packit.utils import PackitFormatter
 from sandcastle import SandcastleTimeoutReached
 
 from packit_service import sentry_integration
+from packit_service.cache import caches_enabled
 from packit_service.config import ServiceConfig, Deployment
 from packit_service.models import SRPMBuildModel
 from packit_service.service.events import EventData
@@ -41,6 +42,8 @@ from packit_service.trigger_mapping import (
     is_trigger_matching_job_config,
     are_job_types_same,
 )
+from packit_service.worker.build.srpm_cache import get_srpm_cache_key, srpm_cache
+from packit_service.worker.git_mirror import get_local_project
 from packit_service.worker.reporting import StatusReporter
 
 logger = logging.getLogger(__name__)
@@ -83,7 +86,7 @@ class BaseBuildJobHelper:
     @property
     def local_project(self) -> LocalProject:
         if self._local_project is None:
-            self._local_project = LocalProject(
+            self._local_project = get_local_project(
                 git_project=self.project,
                 working_dir=self.service_config.command_handler_work_dir,
                 ref=self.metadata.git_ref,
@@ -302,7 +305,35 @@ class BaseBuildJobHelper:
         if not (self._srpm_path or self._srpm_model):
             self._create_srpm()
 
+    @property
+    def srpm_cache_key(self) -> Optional[str]:
+        if not self.metadata.commit_sha:
+            return None
+        return get_srpm_cache_key(
+            project_url=self.metadata.project_url,
+            commit_sha=self.metadata.commit_sha,
+            job_config=self.job_config,
+        )
+
     def _create_srpm(self):
+        cache_key = self.srpm_cache_key
+        if not (cache_key and caches_enabled()):
+            self._build_srpm()
+            return
+
+        with srpm_cache.lock(cache_key):
+            cached = srpm_cache.get(cache_key)
+            srpm_model = SRPMBuildModel.get_by_id(cached[1]) if cached else None
+            if srpm_model:
+                logger.info(f"Using the cached SRPM {cached[0]}.")
+                self._srpm_path, self._srpm_model = cached[0], srpm_model
+                return
+
+            self._build_srpm()
+            if self._srpm_model.success:
+                srpm_cache.put(cache_key, self._srpm_path, self._srpm_model.id)
+
+    def _build_srpm(self):
         # we want to get packit logs from the SRPM creation process
         # so we stuff them into a StringIO buffer
         stream = StringIO()
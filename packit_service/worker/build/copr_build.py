@@ -29,7 +29,6 @@ from packit.config.package_config import PackageConfig
 from packit.exceptions import PackitCoprException
 
 from packit_service import sentry_integration
-from packit_service.celerizer import celery_app
 from packit_service.config import ServiceConfig, Deployment
 from packit_service.constants import MSG_RETRIGGER
 from packit_service.models import CoprBuildModel
@@ -162,6 +161,8 @@ class CoprBuildJobHelper(BaseBuildJobHelper):
             # pagure requires "valid url"
             url="",
         )
+        # don't let the user wait for the status until the SRPM is built
+        self.status_reporter.flush()
         self.create_srpm_if_needed()
 
         if not self.srpm_model.success:
@@ -208,12 +209,8 @@ class CoprBuildJobHelper(BaseBuildJobHelper):
                 chroot=chroot,
             )
 
-        # release the hounds!
-        celery_app.send_task(
-            "task.babysit_copr_build",
-            args=(build_id,),
-            countdown=120,  # do the first check in 120s
-        )
+        # the build is checked by the periodic task.babysit_pending_copr_builds
+        # in case we don't get the fedmsg about its end
 
         return TaskResults(success=True, details={})
 
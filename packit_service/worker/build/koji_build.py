@@ -116,6 +116,8 @@ class KojiBuildJobHelper(BaseBuildJobHelper):
         self.report_status_to_all(
             description="Building SRPM ...", state=CommitStatus.pending
         )
+        # don't let the user wait for the status until the SRPM is built
+        self.status_reporter.flush()
         self.create_srpm_if_needed()
 
         if not self.srpm_model.success:
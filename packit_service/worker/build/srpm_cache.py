@@ -0,0 +1,192 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Cache of the SRPMs we have built, so that we don't build the same SRPM again
+for the re-triggered builds or for the Copr and Koji builds of the same commit.
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Iterator, Optional, Tuple
+
+from packit.config import JobConfig
+from prometheus_client import Counter
+
+from packit_service.constants import SRPM_CACHE_DIR, SRPM_CACHE_SIZE
+from packit_service.utils import dump_job_config
+
+logger = logging.getLogger(__name__)
+
+srpm_cache_lookups = Counter(
+    "srpm_cache_lookups",
+    "Number of times the SRPM was looked up in the cache",
+    ["result"],
+)
+
+# the job-specific parts of the config which don't change the SRPM
+JOB_ONLY_KEYS = ("job", "trigger", "metadata")
+SRPM_BUILD_ID_FILE = "srpm_build_id"
+
+
+def get_srpm_cache_key(project_url: str, commit_sha: str, job_config: JobConfig) -> str:
+    config = {
+        key: value
+        for key, value in (dump_job_config(job_config) or {}).items()
+        if key not in JOB_ONLY_KEYS
+    }
+    content = json.dumps(
+        {"project_url": project_url, "commit_sha": commit_sha, "config": config},
+        sort_keys=True,
+    )
+    return sha256(content.encode()).hexdigest()
+
+
+class SRPMCache:
+    """
+    SRPMs (and the ID of the SRPMBuildModel with the logs) stored on the local disk:
+
+        <directory>/<key>/<name>.src.rpm
+        <directory>/<key>/srpm_build_id
+
+    The least recently used SRPMs are removed when the size of the cache
+    is over `max_size` bytes.
+    """
+
+    def __init__(
+        self, directory: str = SRPM_CACHE_DIR, max_size: int = SRPM_CACHE_SIZE
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    @property
+    def locks_directory(self) -> Path:
+        return self.directory / ".locks"
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Only one process can build the SRPM for the key,
+        the others wait and then get it from the cache.
+
+        Every key has its own lock file, the unused ones are removed by `evict()`.
+        """
+        self.locks_directory.mkdir(parents=True, exist_ok=True)
+        lock_path = self.locks_directory / f"{key}.lock"
+        while True:
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # the lock file could have been removed by evict() while we waited
+                    if lock_path.exists() and os.path.samestat(
+                        os.fstat(lock_file.fileno()), lock_path.stat()
+                    ):
+                        yield
+                        return
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key: str) -> Optional[Tuple[Path, int]]:
+        """
+        :return: path to the SRPM and ID of the SRPMBuildModel or None if not cached
+        """
+        entry = self.directory / key
+        try:
+            srpm_build_id = int((entry / SRPM_BUILD_ID_FILE).read_text())
+            srpm_path = next(entry.glob("*.src.rpm"))
+            # the most recently used
+            os.utime(entry)
+        except (OSError, ValueError, StopIteration):
+            srpm_cache_lookups.labels(result="miss").inc()
+            return None
+
+        srpm_cache_lookups.labels(result="hit").inc()
+        return srpm_path, srpm_build_id
+
+    def put(self, key: str, srpm_path: Path, srpm_build_id: int) -> None:
+        tmp_entry = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # prepare the entry aside, so that nobody sees a half-copied SRPM
+            tmp_entry = Path(mkdtemp(prefix=f".{key}-", dir=self.directory))
+            shutil.copy(srpm_path, tmp_entry / srpm_path.name)
+            (tmp_entry / SRPM_BUILD_ID_FILE).write_text(str(srpm_build_id))
+            entry = self.directory / key
+            shutil.rmtree(entry, ignore_errors=True)
+            tmp_entry.rename(entry)
+        except OSError as ex:
+            logger.warning(f"Failed to cache the SRPM {srpm_path}: {ex!r}")
+            if tmp_entry:
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used SRPMs until the cache fits into the size
+        and the lock files nobody holds.
+        """
+        self.remove_unused_locks()
+
+        entries = []
+        for entry in self.directory.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                # removed by another process
+                continue
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            logger.debug(f"Removing {entry.name} from the SRPM cache.")
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+
+    def remove_unused_locks(self) -> None:
+        try:
+            lock_paths = list(self.locks_directory.glob("*.lock"))
+        except OSError:
+            return
+        for lock_path in lock_paths:
+            try:
+                with open(lock_path, "a") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    # removed while we hold it, see lock()
+                    lock_path.unlink()
+            except OSError:
+                # held by another process (or already removed)
+                continue
+
+
+srpm_cache = SRPMCache()
@@ -0,0 +1,180 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Long-lived HTTP sessions and API clients shared by the tasks of the worker process,
+so that every task doesn't need to connect (and do the TLS handshake) again.
+"""
+import logging
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Tuple
+from urllib.parse import urlparse
+
+import requests
+from copr.v3 import Client as CoprClient
+from prometheus_client import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from packit_service.constants import HTTP_POOL_IDLE_TIMEOUT, HTTP_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+# connection reuse ratio of the host is 1 - connections / requests
+http_client_requests = Counter(
+    "http_client_requests",
+    "Number of HTTP requests sent from the pooled sessions",
+    ["host"],
+)
+http_client_connections = Counter(
+    "http_client_connections",
+    "Number of HTTP connections opened by the pooled sessions",
+    ["host"],
+)
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        http_client_connections.labels(host=self.host).inc()
+        return super()._new_conn()
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        http_client_connections.labels(host=self.host).inc()
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter counting the connections it opens. """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+def count_request(response: requests.Response, *args, **kwargs) -> None:
+    http_client_requests.labels(host=urlparse(response.url).hostname).inc()
+
+
+class ClientRegistry:
+    """
+    Sessions (per remote host) and clients (per key) of the worker process.
+
+    The ones not used for `idle_timeout` seconds are dropped (and their connections closed),
+    everything is dropped by `reset()` (the connections can't be shared by forked processes).
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        idle_timeout: float = HTTP_POOL_IDLE_TIMEOUT,
+    ):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        # key -> (client, last used)
+        self._clients: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = Lock()
+
+    def get_client(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        :param key: identifies the client, e.g. ("copr",) or ("fas", username)
+        :param factory: creates the client if there is none (or it was idle for too long)
+        """
+        self.evict_idle()
+        with self._lock:
+            client, _ = self._clients.get(key, (None, None))
+            if client is None:
+                logger.debug(f"Creating the client {key}.")
+                client = factory()
+            self._clients[key] = (client, monotonic())
+            return client
+
+    def get_session(self, url: str, max_retries: int = 0) -> requests.Session:
+        """
+        Keep-alive session with a pool of `pool_size` connections to the host of the url.
+        """
+        parsed = urlparse(url)
+
+        def create_session() -> requests.Session:
+            session = requests.Session()
+            adapter = PooledHTTPAdapter(
+                pool_connections=1, pool_maxsize=self.pool_size, max_retries=max_retries
+            )
+            session.mount(f"{parsed.scheme}://", adapter)
+            session.hooks["response"].append(count_request)
+            return session
+
+        return self.get_client(
+            ("session", parsed.scheme, parsed.netloc, max_retries), create_session
+        )
+
+    def evict_idle(self) -> None:
+        now = monotonic()
+        with self._lock:
+            idle = [
+                key
+                for key, (_, last_used) in self._clients.items()
+                if now - last_used > self.idle_timeout
+            ]
+            clients = [self._clients.pop(key)[0] for key in idle]
+        for client in clients:
+            self._close(client)
+
+    def reset(self) -> None:
+        """
+        Drop all the clients, call in the new process after fork.
+
+        The connections are not closed, they still belong to the parent process.
+        """
+        # the lock could have been held by another thread during the fork
+        self._lock = Lock()
+        self._clients = {}
+
+    @staticmethod
+    def _close(client: Any) -> None:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as ex:
+                logger.debug(f"Failed to close {client}: {ex!r}")
+
+
+client_registry = ClientRegistry()
+
+
+def get_copr_client() -> CoprClient:
+    """
+    Copr client (configured in ~/.config/copr) shared by the tasks of the process.
+
+    This only saves us reading the config again: python-copr sends every request
+    with `requests.request()`, i.e. in a new session, so there is no session
+    we could mount the pooled (and retrying) adapter to as we do for the forges.
+    Its own retries (`connection_attempts` in the config) are left off,
+    they retry the build submissions as well, which are not idempotent.
+    """
+    return client_registry.get_client(("copr",), CoprClient.create_from_config_file)
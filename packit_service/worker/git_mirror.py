@@ -0,0 +1,203 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Bare mirrors of the upstream repositories kept on the local disk of the worker,
+so that we don't need to clone the whole repository for every job.
+"""
+import fcntl
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterator, Optional
+
+import git
+from ogr.abstract import GitProject
+from ogr.parsing import parse_git_repo
+from packit.local_project import LocalProject
+from prometheus_client import Counter
+
+from packit_service.cache import caches_enabled
+from packit_service.constants import GIT_MIRROR_DIR, GIT_MIRROR_SIZE
+
+logger = logging.getLogger(__name__)
+
+git_mirror_clones = Counter(
+    "git_mirror_clones", "Number of clones from the git mirrors", ["result"],
+)
+
+MIRROR_REFSPECS = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+
+
+class GitMirrorCache:
+    """
+    One bare mirror per repository URL:
+
+        <directory>/<namespace>-<repo>-<hash of the url>.git
+
+    The mirror is updated with `git fetch` before it is cloned (locally, which only
+    copies or hardlinks the objects) to the working directory of the job.
+    The working directory doesn't depend on the mirror afterwards,
+    so it can be used in the sandbox and the mirror can be removed anytime.
+
+    The least recently used mirrors are removed when the size of the cache
+    is over `max_size` bytes.
+    """
+
+    def __init__(
+        self, directory: str = GIT_MIRROR_DIR, max_size: int = GIT_MIRROR_SIZE
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def get_mirror_path(self, url: str) -> Path:
+        parsed = parse_git_repo(url)
+        name = f"{parsed.namespace}-{parsed.repo}-" if parsed else ""
+        name = name.replace("/", "-")
+        return self.directory / f"{name}{sha256(url.encode()).hexdigest()[:12]}.git"
+
+    @contextmanager
+    def lock(self, mirror: Path, blocking: bool = True) -> Iterator[bool]:
+        """
+        Only one process can work with the mirror at a time.
+
+        :return: whether the lock was acquired (always, if blocking)
+        """
+        locks = self.directory / ".locks"
+        locks.mkdir(parents=True, exist_ok=True)
+        with open(locks / mirror.name, "w") as lock_file:
+            try:
+                fcntl.flock(
+                    lock_file,
+                    fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB,
+                )
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def update(self, url: str, mirror: Path) -> None:
+        """ Create the mirror or fetch the new commits. Call with the lock held. """
+        if mirror.is_dir():
+            logger.debug(f"Fetching {url} to the mirror {mirror}.")
+            repo = git.Repo(mirror)
+            repo.git.fetch(url, *MIRROR_REFSPECS, "--prune")
+        else:
+            logger.debug(f"Creating the mirror {mirror} of {url}.")
+            tmp_mirror = mirror.with_name(f".{mirror.name}")
+            shutil.rmtree(tmp_mirror, ignore_errors=True)
+            repo = git.Repo.init(tmp_mirror, bare=True)
+            repo.git.fetch(url, *MIRROR_REFSPECS)
+            tmp_mirror.rename(mirror)
+            repo = git.Repo(mirror)
+
+        # so that the default branch is checked out in the clone
+        # e.g. "ref: refs/heads/main\tHEAD\n<sha>\tHEAD"
+        remote_head = repo.git.ls_remote("--symref", url, "HEAD")
+        if isinstance(remote_head, bytes):
+            remote_head = remote_head.decode()
+        if isinstance(remote_head, str) and remote_head.startswith("ref: "):
+            repo.git.symbolic_ref("HEAD", remote_head.split()[1])
+        # the most recently used
+        os.utime(mirror)
+
+    def clone(self, url: str, working_dir: str) -> Optional[git.Repo]:
+        """
+        Clone the repository from the (updated) mirror.
+
+        :return: the cloned repository or None if it needs to be cloned the usual way
+        """
+        path = Path(working_dir)
+        if path.exists() and any(path.iterdir()):
+            logger.debug(f"{working_dir} is not empty, not cloning from the mirror.")
+            return None
+
+        mirror = self.get_mirror_path(url)
+        try:
+            with self.lock(mirror):
+                self.update(url, mirror)
+                repo = git.Repo.clone_from(str(mirror), working_dir)
+            repo.remotes.origin.set_url(url)
+        except (git.GitError, OSError) as ex:
+            logger.warning(f"Failed to clone {url} from the mirror: {ex!r}")
+            git_mirror_clones.labels(result="failed").inc()
+            # leave the working directory empty for the usual clone
+            if path.exists():
+                for item in path.iterdir():
+                    if item.is_dir() and not item.is_symlink():
+                        shutil.rmtree(item)
+                    else:
+                        item.unlink()
+            return None
+
+        git_mirror_clones.labels(result="success").inc()
+        self.evict()
+        return repo
+
+    def clone_project(self, git_project: GitProject, working_dir: str) -> None:
+        self.clone(git_project.get_git_urls()["git"], working_dir)
+
+    def evict(self) -> None:
+        """ Remove the least recently used mirrors until the cache fits into the size. """
+        mirrors = []
+        for mirror in self.directory.glob("*.git"):
+            try:
+                size = sum(f.stat().st_size for f in mirror.rglob("*") if f.is_file())
+                mirrors.append((mirror.stat().st_mtime, size, mirror))
+            except OSError:
+                # removed by another process
+                continue
+
+        total_size = sum(size for _, size, _ in mirrors)
+        for _, size, mirror in sorted(mirrors):
+            if total_size <= self.max_size:
+                break
+            with self.lock(mirror, blocking=False) as locked:
+                if not locked:
+                    # in use, let's not wait for it
+                    continue
+                logger.debug(f"Removing the mirror {mirror}.")
+                shutil.rmtree(mirror, ignore_errors=True)
+            total_size -= size
+
+
+git_mirror_cache = GitMirrorCache()
+
+
+def get_local_project(
+    git_project: GitProject, working_dir: str, **kwargs
+) -> LocalProject:
+    """
+    LocalProject of the git_project, cloned from the mirror if possible
+    (and if the caches are enabled).
+
+    :param kwargs: passed to LocalProject (e.g. ref, pr_id)
+    """
+    if caches_enabled():
+        git_mirror_cache.clone_project(git_project, working_dir)
+    return LocalProject(git_project=git_project, working_dir=working_dir, **kwargs)
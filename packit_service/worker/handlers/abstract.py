@@ -42,6 +42,7 @@ from packit.constants import DATETIME_FORMAT
 from packit.local_project import LocalProject
 
 from packit_service.config import ServiceConfig
+from packit_service.constants import CeleryTaskQueue
 from packit_service.models import (
     AbstractTriggerDbType,
     PullRequestModel,
@@ -51,6 +52,7 @@ from packit_service.models import (
 )
 from packit_service.sentry_integration import push_scope_to_sentry
 from packit_service.service.events import TheJobTriggerType, EventData, Event
+from packit_service.worker.reporting import write_behind
 from packit_service.worker.result import TaskResults
 from packit_service.utils import dump_package_config, dump_job_config
 
@@ -117,6 +119,30 @@ class TaskName(str, enum.Enum):
     koji_build_report = "task.run_koji_build_report_handler"
 
 
+# Celery queue of each task, see packit_service/worker/tasks.py
+TASK_QUEUES: Dict[TaskName, CeleryTaskQueue] = {
+    TaskName.copr_build_start: CeleryTaskQueue.short,
+    TaskName.copr_build_end: CeleryTaskQueue.short,
+    TaskName.installation: CeleryTaskQueue.short,
+    TaskName.testing_farm_results: CeleryTaskQueue.short,
+    TaskName.koji_build_report: CeleryTaskQueue.short,
+    TaskName.pagure_pr_label: CeleryTaskQueue.short,
+    TaskName.release_copr_build: CeleryTaskQueue.long,
+    TaskName.pr_copr_build: CeleryTaskQueue.long,
+    TaskName.pr_comment_copr_build: CeleryTaskQueue.long,
+    TaskName.push_copr_build: CeleryTaskQueue.long,
+    TaskName.pagure_pr_comment_copr_build: CeleryTaskQueue.long,
+    TaskName.release_koji_build: CeleryTaskQueue.long,
+    TaskName.pr_koji_build: CeleryTaskQueue.long,
+    TaskName.push_koji_build: CeleryTaskQueue.long,
+    TaskName.testing_farm: CeleryTaskQueue.long,
+    TaskName.testing_farm_comment: CeleryTaskQueue.long,
+    TaskName.propose_update_comment: CeleryTaskQueue.sync,
+    TaskName.propose_downstream: CeleryTaskQueue.sync,
+    TaskName.distgit_commit: CeleryTaskQueue.sync,
+}
+
+
 class Handler:
     triggers: List[TheJobTriggerType]
     api: Optional[PackitAPI] = None
@@ -146,7 +172,8 @@ class Handler:
 
     def run_n_clean(self) -> TaskResults:
         try:
-            with push_scope_to_sentry() as scope:
+            # commit statuses are sent when the handler finishes (or flushes them)
+            with push_scope_to_sentry() as scope, write_behind():
                 for k, v in self.get_tag_info().items():
                     scope.set_tag(k, v)
                 return self.run()
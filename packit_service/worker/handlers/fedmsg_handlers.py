@@ -40,10 +40,10 @@ from packit.config import (
 )
 from packit.config.package_config import PackageConfig
 from packit.distgit import DistGit
-from packit.local_project import LocalProject
 from packit.utils import get_namespace_and_repo_name
 
 from packit_service.constants import (
+    PG_COPR_BUILD_STATUS_ERROR,
     PG_COPR_BUILD_STATUS_FAILURE,
     PG_COPR_BUILD_STATUS_SUCCESS,
     COPR_API_SUCC_STATE,
@@ -62,6 +62,7 @@ from packit_service.service.urls import (
 )
 from packit_service.worker.build.copr_build import CoprBuildJobHelper
 from packit_service.worker.build.koji_build import KojiBuildJobHelper
+from packit_service.worker.git_mirror import get_local_project
 from packit_service.worker.handlers.abstract import (
     JobHandler,
     use_for,
@@ -131,7 +132,7 @@ class NewDistGitCommitHandler(FedmsgHandler):
 
         n, r = get_namespace_and_repo_name(self.job_config.upstream_project_url)
         up = self.project.service.get_project(repo=r, namespace=n)
-        self.local_project = LocalProject(
+        self.local_project = get_local_project(
             git_project=up, working_dir=self.service_config.command_handler_work_dir
         )
 
@@ -233,12 +234,6 @@ class CoprBuildEndHandler(AbstractCoprBuildReportHandler):
             logger.info(msg)
             return TaskResults(success=True, details={"msg": msg})
 
-        end_time = (
-            datetime.utcfromtimestamp(self.copr_event.timestamp)
-            if self.copr_event.timestamp
-            else None
-        )
-        self.build.set_end_time(end_time)
         url = get_copr_build_info_url_from_flask(self.build.id)
 
         # https://pagure.io/copr/copr/blob/master/f/common/copr_common/enums.py#_42
@@ -250,7 +245,7 @@ class CoprBuildEndHandler(AbstractCoprBuildReportHandler):
                 url=url,
                 chroot=self.copr_event.chroot,
             )
-            self.build.set_status(PG_COPR_BUILD_STATUS_FAILURE)
+            self.finish_build(PG_COPR_BUILD_STATUS_FAILURE)
             return TaskResults(success=False, details={"msg": failed_msg})
 
         if (
@@ -284,7 +279,10 @@ class CoprBuildEndHandler(AbstractCoprBuildReportHandler):
             url=url,
             chroot=self.copr_event.chroot,
         )
-        self.build.set_status(PG_COPR_BUILD_STATUS_SUCCESS)
+        if not self.finish_build(PG_COPR_BUILD_STATUS_SUCCESS):
+            msg = f"Copr build {self.copr_event.build_id} is already processed."
+            logger.info(msg)
+            return TaskResults(success=True, details={"msg": msg})
 
         if (
             build_job_helper.job_tests
@@ -305,6 +303,48 @@ class CoprBuildEndHandler(AbstractCoprBuildReportHandler):
 
         return TaskResults(success=True, details={})
 
+    def time_out(self) -> None:
+        """
+        Tell the user the build has not ended in time (COPR_BABYSIT_MAX_AGE),
+        we don't check it anymore, and set it to error.
+        """
+        CoprBuildJobHelper(
+            service_config=self.service_config,
+            package_config=self.package_config,
+            project=self.project,
+            metadata=self.data,
+            db_trigger=self.db_trigger,
+            job_config=self.job_config,
+        ).report_status_to_all_for_chroot(
+            state=CommitStatus.error,
+            description="RPM build timed out.",
+            url=get_copr_build_info_url_from_flask(self.build.id),
+            chroot=self.copr_event.chroot,
+        )
+        self.build.update_state(
+            expected_status=["pending"], status=PG_COPR_BUILD_STATUS_ERROR
+        )
+
+    def finish_build(self, status: str) -> bool:
+        """
+        Set the final status and the end time of the build in one statement.
+
+        It is done after the commit statuses are reported, so that the build stays
+        pending (and is checked again by the babysitter) if the reporting fails.
+
+        :return: False if another message has finished the build in the meantime
+        """
+        end_time = (
+            datetime.utcfromtimestamp(self.copr_event.timestamp)
+            if self.copr_event.timestamp
+            else None
+        )
+        return self.build.update_state(
+            unless_status=[PG_COPR_BUILD_STATUS_FAILURE, PG_COPR_BUILD_STATUS_SUCCESS],
+            status=status,
+            build_finished_time=end_time,
+        )
+
 
 @add_topic
 @use_for(job_type=JobType.copr_build)
@@ -341,11 +381,16 @@ class CoprBuildStartHandler(AbstractCoprBuildReportHandler):
             if self.copr_event.timestamp
             else None
         )
-        self.build.set_start_time(start_time)
+        if not self.build.update_state(
+            unless_status=[PG_COPR_BUILD_STATUS_FAILURE, PG_COPR_BUILD_STATUS_SUCCESS],
+            status="pending",
+            build_start_time=start_time,
+            build_logs_url=self.copr_event.get_copr_build_logs_url(),
+        ):
+            msg = f"Copr build {self.copr_event.build_id} has already finished."
+            logger.info(msg)
+            return TaskResults(success=True, details={"msg": msg})
         url = get_copr_build_info_url_from_flask(self.build.id)
-        self.build.set_status("pending")
-        copr_build_logs = self.copr_event.get_copr_build_logs_url()
-        self.build.set_build_logs_url(copr_build_logs)
 
         build_job_helper.report_status_to_all_for_chroot(
             description="RPM build is in progress...",
@@ -357,6 +402,16 @@ class CoprBuildStartHandler(AbstractCoprBuildReportHandler):
         return TaskResults(success=True, details={"msg": msg})
 
 
+# the state of the Koji build -> the status of KojiBuildModel
+KOJI_BUILD_STATUSES = {
+    KojiBuildState.open: "pending",
+    KojiBuildState.closed: "success",
+    KojiBuildState.failed: "failed",
+    KojiBuildState.canceled: "error",
+}
+KOJI_BUILD_FINAL_STATUSES = ["success", "failed", "error"]
+
+
 @add_topic
 @use_for(job_type=JobType.production_build)
 class KojiBuildReportHandler(FedmsgHandler):
@@ -405,17 +460,26 @@ class KojiBuildReportHandler(FedmsgHandler):
             f"from {self.koji_event.old_state} to {self.koji_event.state}."
         )
 
-        build.set_build_start_time(
-            datetime.utcfromtimestamp(self.koji_event.start_time)
+        changes = dict(
+            build_start_time=datetime.utcfromtimestamp(self.koji_event.start_time)
             if self.koji_event.start_time
-            else None
-        )
-
-        build.set_build_finished_time(
-            datetime.utcfromtimestamp(self.koji_event.completion_time)
+            else None,
+            build_finished_time=datetime.utcfromtimestamp(
+                self.koji_event.completion_time
+            )
             if self.koji_event.completion_time
-            else None
+            else None,
+            build_logs_url=self.koji_event.get_koji_build_logs_url(),
+            web_url=self.koji_event.get_koji_build_logs_url(),
         )
+        status = KOJI_BUILD_STATUSES.get(self.koji_event.state)
+        if status:
+            changes["status"] = status
+        # the final state doesn't change anymore (e.g. a duplicate message)
+        if not build.update_state(unless_status=KOJI_BUILD_FINAL_STATUSES, **changes):
+            msg = f"Koji build {self.koji_event.build_id} has already finished."
+            logger.info(msg)
+            return TaskResults(success=True, details={"msg": msg})
 
         url = get_koji_build_info_url_from_flask(build.id)
         build_job_helper = KojiBuildJobHelper(
@@ -428,7 +492,6 @@ class KojiBuildReportHandler(FedmsgHandler):
         )
 
         if self.koji_event.state == KojiBuildState.open:
-            build.set_status("pending")
             build_job_helper.report_status_to_all_for_chroot(
                 description="RPM build is in progress...",
                 state=CommitStatus.pending,
@@ -436,7 +499,6 @@ class KojiBuildReportHandler(FedmsgHandler):
                 chroot=build.target,
             )
         elif self.koji_event.state == KojiBuildState.closed:
-            build.set_status("success")
             build_job_helper.report_status_to_all_for_chroot(
                 description="RPMs were built successfully.",
                 state=CommitStatus.success,
@@ -444,7 +506,6 @@ class KojiBuildReportHandler(FedmsgHandler):
                 chroot=build.target,
             )
         elif self.koji_event.state == KojiBuildState.failed:
-            build.set_status("failed")
             build_job_helper.report_status_to_all_for_chroot(
                 description="RPMs failed to be built.",
                 state=CommitStatus.failure,
@@ -452,7 +513,6 @@ class KojiBuildReportHandler(FedmsgHandler):
                 chroot=build.target,
             )
         elif self.koji_event.state == KojiBuildState.canceled:
-            build.set_status("error")
             build_job_helper.report_status_to_all_for_chroot(
                 description="RPMs build was canceled.",
                 state=CommitStatus.error,
@@ -464,11 +524,6 @@ class KojiBuildReportHandler(FedmsgHandler):
                 f"We don't react to this koji build state change: {self.koji_event.state}"
             )
 
-        koji_build_logs = self.koji_event.get_koji_build_logs_url()
-        build.set_build_logs_url(koji_build_logs)
-        koji_rpm_task_web_url = self.koji_event.get_koji_build_logs_url()
-        build.set_web_url(koji_rpm_task_web_url)
-
         msg = (
             f"Build on {build.target} in koji changed state "
             f"from {self.koji_event.old_state} to {self.koji_event.state}."
@@ -35,7 +35,6 @@ from packit.config import (
 from packit.config.aliases import get_branches
 from packit.config.package_config import PackageConfig
 from packit.exceptions import PackitException
-from packit.local_project import LocalProject
 
 from packit_service import sentry_integration
 from packit_service.constants import PERMISSIONS_ERROR_WRITE_OR_ADMIN
@@ -60,6 +59,7 @@ from packit_service.service.events import (
 )
 from packit_service.worker.build import CoprBuildJobHelper
 from packit_service.worker.build.koji_build import KojiBuildJobHelper
+from packit_service.worker.git_mirror import get_local_project
 from packit_service.worker.handlers import (
     CommentActionHandler,
     JobHandler,
@@ -143,7 +143,7 @@ class ProposeDownstreamHandler(JobHandler):
         Sync the upstream release to dist-git as a pull request.
         """
 
-        self.local_project = LocalProject(
+        self.local_project = get_local_project(
             git_project=self.project,
             working_dir=self.service_config.command_handler_work_dir,
         )
@@ -580,7 +580,7 @@ class GitHubIssueCommentProposeUpdateHandler(CommentActionHandler):
         return set()
 
     def run(self) -> TaskResults:
-        local_project = LocalProject(
+        local_project = get_local_project(
             git_project=self.project,
             working_dir=self.service_config.command_handler_work_dir,
         )
@@ -98,8 +98,14 @@ class TestingFarmResultsHandler(JobHandler):
                 f"{self.pipeline_id}"
             )
 
-        if test_run_model:
-            test_run_model.set_status(self.result)
+        if test_run_model and not test_run_model.update_state(
+            expected_status=[TestingFarmResult.new, TestingFarmResult.running],
+            status=self.result,
+            web_url=self.log_url,
+        ):
+            msg = f"Results of the pipeline {self.pipeline_id} were already processed."
+            logger.info(msg)
+            return TaskResults(success=True, details={"msg": msg})
 
         if self.result == TestingFarmResult.passed:
             status = CommitStatus.success
@@ -115,8 +121,6 @@ class TestingFarmResultsHandler(JobHandler):
         else:
             short_msg = self.message
 
-        if test_run_model:
-            test_run_model.set_web_url(self.log_url)
         status_reporter = StatusReporter(self.project, self.data.commit_sha)
         status_reporter.report(
             state=status,
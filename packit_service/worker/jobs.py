@@ -24,11 +24,12 @@
 We love you, Steve Jobs.
 """
 import logging
+from collections import defaultdict
 from celery import group
 from typing import Any
-from typing import Optional, Dict, Union, Type, Set, List
+from typing import Optional, Dict, Union, Type, Set, List, Tuple
 
-from packit.config import PackageConfig, JobConfig
+from packit.config import PackageConfig, JobConfig, JobConfigTriggerType, JobType
 
 from packit_service.config import ServiceConfig
 from packit_service.log_versions import log_job_versions
@@ -43,7 +44,7 @@ from packit_service.service.events import (
     IssueCommentGitlabEvent,
 )
 from packit_service.trigger_mapping import (
-    is_trigger_matching_job_config,
+    MAP_JOB_TRIGGER_TO_JOB_CONFIG_TRIGGER_TYPE,
     are_job_types_same,
 )
 from packit_service.worker.handlers import (
@@ -56,7 +57,6 @@ from packit_service.worker.handlers import (
 )
 from packit_service.worker.handlers.abstract import (
     Handler,
-    MAP_EVENT_TRIGGER_TO_HANDLERS,
     MAP_HANDLER_TO_JOB_TYPES,
     MAP_REQUIRED_JOB_TO_HANDLERS,
     JobHandler,
@@ -79,43 +79,143 @@ REQUESTED_PULL_REQUEST_COMMENT = "/packit"
 logger = logging.getLogger(__name__)
 
 
-def get_handlers_for_event(
-    event: Event, package_config: PackageConfig
-) -> Set[Type[JobHandler]]:
+class HandlerIndex:
+    """
+    The handlers registered by `use_for` and `required_by`
+    indexed by what we look them up by, built once when all the handlers are imported.
     """
-    Get all handlers that we need to run for the given event.
 
-    We need to return all handler classes that:
-    - can react to the given event AND
-    - are configured in the package_config (either directly or as a required job)
+    def __init__(self):
+        # (event trigger, configured job type) -> handlers to run
+        self.handlers: Dict[
+            Tuple[TheJobTriggerType, JobType], Set[Type[JobHandler]]
+        ] = defaultdict(set)
+        # (event trigger, configured job type) -> handlers required by the job
+        self.required_handlers: Dict[
+            Tuple[TheJobTriggerType, JobType], Set[Type[JobHandler]]
+        ] = defaultdict(set)
+        # handler -> job types it can use the config of (including the aliases)
+        self.job_types: Dict[Type[Handler], Set[JobType]] = defaultdict(set)
+        # handler -> job config triggers matching its event triggers
+        self.config_triggers: Dict[
+            Type[Handler], Set[JobConfigTriggerType]
+        ] = defaultdict(set)
+
+        for handler_kls, handler_job_types in MAP_HANDLER_TO_JOB_TYPES.items():
+            for job_type in handler_job_types:
+                for trigger in handler_kls.triggers:
+                    self.handlers[(trigger, job_type)].add(handler_kls)
+            # `build` x `copr_build` aliasing
+            self.job_types[handler_kls] = {
+                job_type
+                for job_type in JobType
+                if any(are_job_types_same(job_type, t) for t in handler_job_types)
+            }
+
+        for job_type, required_handlers in MAP_REQUIRED_JOB_TO_HANDLERS.items():
+            for handler_kls in required_handlers:
+                for trigger in handler_kls.triggers:
+                    self.required_handlers[(trigger, job_type)].add(handler_kls)
+
+        for handler_kls in set(self.job_types) | {
+            h for handlers in MAP_REQUIRED_JOB_TO_HANDLERS.values() for h in handlers
+        }:
+            self.config_triggers[handler_kls] = {
+                MAP_JOB_TRIGGER_TO_JOB_CONFIG_TRIGGER_TYPE[trigger]
+                for trigger in handler_kls.triggers
+                if trigger in MAP_JOB_TRIGGER_TO_JOB_CONFIG_TRIGGER_TYPE
+            }
+
+
+handler_index = HandlerIndex()
+
+
+class JobPlan:
+    """
+    Handlers to run for the event and the job configs they use,
+    compiled from the package config in one pass over its jobs.
 
     Examples of the matching can be found in the tests:
     ./tests/unit/test_jobs.py:test_get_handlers_for_event
-
-    :param event: event which we are reacting to
-    :param package_config: for checking configured jobs
-    :return: set of handler instances that we need to run for given event and user configuration
+    ./tests/unit/test_jobs.py:test_get_config_for_handler_kls
     """
-    handlers: Set[Type[JobHandler]] = set()
-    classes_for_trigger = MAP_EVENT_TRIGGER_TO_HANDLERS[event.trigger]
 
-    for job in package_config.jobs:
-        if (
-            event.db_trigger and event.db_trigger.job_config_trigger_type == job.trigger
-        ) or is_trigger_matching_job_config(trigger=event.trigger, job_config=job):
-            for pos_handler in classes_for_trigger:
-                if job.type in MAP_HANDLER_TO_JOB_TYPES[pos_handler]:
-                    handlers.add(pos_handler)
+    def __init__(self, event: Event, package_config: PackageConfig):
+        self.trigger = event.trigger
+        self.jobs = package_config.jobs
+        self._job_configs: Dict[Type[Handler], List[JobConfig]] = {}
 
+        # jobs configured for the trigger of the event
+        # (or for the trigger of the DB object for events without the real trigger)
+        triggers = {MAP_JOB_TRIGGER_TO_JOB_CONFIG_TRIGGER_TYPE.get(event.trigger)}
+        if self.jobs and event.db_trigger:
+            triggers.add(event.db_trigger.job_config_trigger_type)
+        triggers.discard(None)
+        self.triggered_jobs = [job for job in self.jobs if job.trigger in triggers]
+
+    @property
+    def handlers(self) -> Set[Type[JobHandler]]:
+        """
+        All the handlers that:
+        - can react to the trigger of the event AND
+        - are configured in the package_config (either directly or as a required job)
+        """
+        handlers: Set[Type[JobHandler]] = set()
+        for job in self.triggered_jobs:
+            handlers.update(handler_index.handlers.get((self.trigger, job.type), ()))
         # We need to return also handlers that are required for the configured jobs.
         # e.g. we need to run `build` when only `test` is configured
-        required_handlers = MAP_REQUIRED_JOB_TO_HANDLERS[job.type]
-        for pos_handler in required_handlers:
-            for trigger in pos_handler.triggers:
-                if trigger == event.trigger:
-                    handlers.add(pos_handler)
+        for job in self.jobs:
+            handlers.update(
+                handler_index.required_handlers.get((self.trigger, job.type), ())
+            )
+        return handlers
+
+    def get_job_configs(self, handler_kls: Type[Handler]) -> List[JobConfig]:
+        """
+        Job configs (preserving the order in the config) that:
+        - can be run by the given handler class AND
+        - match the trigger of the event
+
+        If there is no matching job config, the ones that require the handler are used.
+        e.g.: For build handler, you can pick the test config since tests require the build.
+        """
+        if handler_kls in self._job_configs:
+            return self._job_configs[handler_kls]
+
+        matching_jobs: List[JobConfig] = []
+        job_types = handler_index.job_types.get(handler_kls, set())
+        for job in self.triggered_jobs:
+            if job.type in job_types and job not in matching_jobs:
+                matching_jobs.append(job)
+
+        if not matching_jobs:
+            # The job was not configured but let's try required ones.
+            # e.g. we can use `tests` configuration when running build
+            config_triggers = handler_index.config_triggers.get(handler_kls, set())
+            for job in self.triggered_jobs:
+                if (
+                    handler_kls in MAP_REQUIRED_JOB_TO_HANDLERS[job.type]
+                    and job.trigger in config_triggers
+                    and job not in matching_jobs
+                ):
+                    matching_jobs.append(job)
+
+        self._job_configs[handler_kls] = matching_jobs
+        return matching_jobs
 
-    return handlers
+
+def get_handlers_for_event(
+    event: Event, package_config: PackageConfig
+) -> Set[Type[JobHandler]]:
+    """
+    Get all handlers that we need to run for the given event.
+
+    :param event: event which we are reacting to
+    :param package_config: for checking configured jobs
+    :return: set of handler instances that we need to run for given event and user configuration
+    """
+    return JobPlan(event, package_config).handlers
 
 
 def get_config_for_handler_kls(
@@ -124,59 +224,13 @@ def get_config_for_handler_kls(
     """
     Get a list of JobConfigs relevant to event and the handler class.
 
-    We need to find all job configurations that:
-    - can be run by the given handler class AND
-    - that matches the trigger of the event
-
-    If there is no matching job-config found, we will pick the ones that are required.
-    e.g.: For build handler, you can pick the test config since tests require the build.
-
-    Examples of the matching can be found in the tests:
-    ./tests/unit/test_jobs.py:test_get_config_for_handler_kls
-
     :param handler_kls: class that will use the JobConfig
     :param event: which we are reacting to
     :param package_config: we pick the JobConfig(s) from this package_config instance
     :return: list of JobConfigs relevant to the given handler and event
              preserving the order in the config
     """
-    matching_jobs = []
-    jobs_that_can_be_triggered = []
-
-    for job in package_config.jobs:
-        if (
-            event.db_trigger and event.db_trigger.job_config_trigger_type == job.trigger
-        ) or is_trigger_matching_job_config(trigger=event.trigger, job_config=job):
-            jobs_that_can_be_triggered.append(job)
-
-    matching_job_types = MAP_HANDLER_TO_JOB_TYPES[handler_kls]
-    for job in jobs_that_can_be_triggered:
-        if (
-            # Check if the job matches any job supported by the handler.
-            # The function `are_job_types_same` is used
-            # because of the `build` x `copr_build` aliasing.
-            any(are_job_types_same(job.type, type) for type in matching_job_types)
-            and job not in matching_jobs
-        ):
-            matching_jobs.append(job)
-
-    if matching_jobs:
-        return matching_jobs
-
-    # The job was not configured but let's try required ones.
-    # e.g. we can use `tests` configuration when running build
-    for job in jobs_that_can_be_triggered:
-        required_handlers = MAP_REQUIRED_JOB_TO_HANDLERS[job.type]
-        if handler_kls in required_handlers:
-            for trigger in handler_kls.triggers:
-                if (
-                    (trigger == event.db_trigger.job_config_trigger_type)
-                    or is_trigger_matching_job_config(trigger=trigger, job_config=job)
-                    and job not in matching_jobs
-                ):
-                    matching_jobs.append(job)
-
-    return matching_jobs
+    return JobPlan(event, package_config).get_job_configs(handler_kls)
 
 
 class SteveJobs:
@@ -186,6 +240,7 @@ class SteveJobs:
 
     def __init__(self):
         self._service_config = None
+        self._whitelist = None
         log_job_versions()
 
     @property
@@ -194,6 +249,12 @@ class SteveJobs:
             self._service_config = ServiceConfig.get_service_config()
         return self._service_config
 
+    @property
+    def whitelist(self) -> Whitelist:
+        if self._whitelist is None:
+            self._whitelist = Whitelist()
+        return self._whitelist
+
     def process_jobs(self, event: Event) -> Dict[str, TaskResults]:
         """
         Create a Celery task for a job handler (if trigger matches) for every job defined in config.
@@ -209,7 +270,8 @@ class SteveJobs:
             )
             return processing_results
 
-        handler_classes = get_handlers_for_event(event, event.package_config)
+        plan = JobPlan(event, event.package_config)
+        handler_classes = plan.handlers
 
         if not handler_classes:
             logger.warning(f"There is no handler for {event.trigger} event.")
@@ -217,18 +279,13 @@ class SteveJobs:
 
         job_configs = []
         for handler_kls in handler_classes:
-            job_configs = get_config_for_handler_kls(
-                handler_kls=handler_kls,
-                event=event,
-                package_config=event.package_config,
-            )
+            job_configs = plan.get_job_configs(handler_kls)
             # check whitelist approval for every job to be able to track down which jobs
             # failed because of missing whitelist approval
-            whitelist = Whitelist()
             user_login = getattr(event, "user_login", None)
             if user_login and user_login in self.service_config.admins:
                 logger.info(f"{user_login} is admin, you shall pass.")
-            elif not whitelist.check_and_report(
+            elif not self.whitelist.check_and_report(
                 event,
                 event.project,
                 service_config=self.service_config,
@@ -334,14 +391,13 @@ class SteveJobs:
 
         # check whitelist approval for every job to be able to track down which jobs
         # failed because of missing whitelist approval
-        whitelist = Whitelist()
         user_login = getattr(event, "user_login", None)
         jobs = get_config_for_handler_kls(
             handler_kls=handler_kls, event=event, package_config=event.package_config,
         )
         if user_login and user_login in self.service_config.admins:
             logger.info(f"{user_login} is admin, you shall pass.")
-        elif not whitelist.check_and_report(
+        elif not self.whitelist.check_and_report(
             event, event.project, service_config=self.service_config, job_configs=jobs
         ):
             return {
@@ -367,7 +423,11 @@ class SteveJobs:
         return get_processing_results(event=event, jobs=jobs)
 
     def process_message(
-        self, event: dict, topic: str = None, source: str = None
+        self,
+        event: dict,
+        topic: str = None,
+        source: str = None,
+        event_type: str = None,
     ) -> Optional[dict]:
         """
         Entrypoint for message processing.
@@ -375,6 +435,7 @@ class SteveJobs:
         :param event:  dict with webhook/fed-mes payload
         :param topic:  meant to be a topic provided by messaging subsystem (fedmsg, mqqt)
         :param source: source of message
+        :param event_type: kind of the event (e.g. X-GitHub-Event header of the webhook)
         """
 
         if topic:
@@ -392,7 +453,7 @@ class SteveJobs:
         if source == "centosmsg":
             event_object = CentosEventParser().parse_event(event)
         else:
-            event_object = Parser.parse_event(event)
+            event_object = Parser.parse_event(event, event_type=event_type)
 
         if not (event_object and event_object.pre_check()):
             return None
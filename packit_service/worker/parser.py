@@ -25,11 +25,11 @@ Parser is transforming github JSONs into `events` objects
 """
 import logging
 from functools import partial
-from typing import Optional, Union, List, Dict
+from typing import Optional, Union, List, Dict, Callable
 
 from packit.utils import nested_get
 
-from packit_service.constants import KojiBuildState
+from packit_service.constants import KojiBuildState, TESTING_FARM_RESULTS_EVENT_TYPE
 from packit_service.service.events import (
     PullRequestGithubEvent,
     PullRequestCommentGithubEvent,
@@ -71,7 +71,7 @@ class Parser:
 
     @staticmethod
     def parse_event(
-        event: dict,
+        event: dict, event_type: Optional[str] = None
     ) -> Optional[
         Union[
             PullRequestGithubEvent,
@@ -92,7 +92,13 @@ class Parser:
     ]:
         """
         Try to parse all JSONs that we process
+
+        If we know what kind of event it is (from the webhook header, fedmsg topic
+        or Gitlab object_kind), only the relevant parsers are tried,
+        otherwise we go through all of them one by one.
+
         :param event: JSON from Github or fedmsg
+        :param event_type: value of the X-GitHub-Event/X-Gitlab-Event header
         :return: event object
         """
 
@@ -100,83 +106,36 @@ class Parser:
             logger.warning("No event to process!")
             return None
 
-        response: Optional[
-            Union[
-                PullRequestGithubEvent,
-                InstallationEvent,
-                ReleaseEvent,
-                DistGitEvent,
-                TestingFarmResultsEvent,
-                PullRequestCommentGithubEvent,
-                IssueCommentEvent,
-                KojiBuildEvent,
-                CoprBuildEvent,
-                PushGitHubEvent,
-                MergeRequestGitlabEvent,
-                MergeRequestCommentGitlabEvent,
-                IssueCommentGitlabEvent,
-                PushGitlabEvent,
-            ]
-        ] = Parser.parse_pr_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_pull_request_comment_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_issue_comment_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_release_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_push_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_installation_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_distgit_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_testing_farm_results_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_copr_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_mr_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_koji_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_merge_request_comment_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_gitlab_issue_comment_event(event)
-        if response:
-            return response
-
-        response = Parser.parse_gitlab_push_event(event)
-        if response:
-            return response
-
-        if not response:
-            logger.debug("We don't process this event.")
-
-        return response
+        for parser in Parser.get_parsers(event, event_type):
+            response = parser(event)
+            if response:
+                return response
+
+        logger.debug("We don't process this event.")
+        return None
+
+    @staticmethod
+    def get_parsers(event: dict, event_type: Optional[str] = None) -> List[Callable]:
+        """
+        Pick the parsers which are able to process the given event.
+
+        :param event: JSON from Github or fedmsg
+        :param event_type: value of the X-GitHub-Event/X-Gitlab-Event header
+        :return: parsers to try in this order
+        """
+        if event_type in PARSERS_FOR_EVENT_TYPE:
+            return PARSERS_FOR_EVENT_TYPE[event_type]
+
+        topic = event.get("topic")
+        if topic in PARSERS_FOR_TOPIC:
+            return PARSERS_FOR_TOPIC[topic]
+
+        object_kind = event.get("object_kind")
+        if object_kind in PARSERS_FOR_GITLAB_OBJECT_KIND:
+            return PARSERS_FOR_GITLAB_OBJECT_KIND[object_kind]
+
+        logger.debug(f"Unknown kind of event ({event_type}), trying all the parsers.")
+        return ALL_PARSERS
 
     @staticmethod
     def parse_mr_event(event) -> Optional[MergeRequestGitlabEvent]:
@@ -867,6 +826,63 @@ class Parser:
         )
 
 
+# Order matters here, these are tried one by one when we don't know the kind of the event.
+ALL_PARSERS: List[Callable] = [
+    Parser.parse_pr_event,
+    Parser.parse_pull_request_comment_event,
+    Parser.parse_issue_comment_event,
+    Parser.parse_release_event,
+    Parser.parse_push_event,
+    Parser.parse_installation_event,
+    Parser.parse_distgit_event,
+    Parser.parse_testing_farm_results_event,
+    Parser.parse_copr_event,
+    Parser.parse_mr_event,
+    Parser.parse_koji_event,
+    Parser.parse_merge_request_comment_event,
+    Parser.parse_gitlab_issue_comment_event,
+    Parser.parse_gitlab_push_event,
+]
+
+# X-GitHub-Event and X-Gitlab-Event headers (and testing farm results)
+# https://developer.github.com/webhooks/event-payloads/
+# https://docs.gitlab.com/ee/user/project/integrations/webhooks.html#events
+PARSERS_FOR_EVENT_TYPE: Dict[str, List[Callable]] = {
+    "pull_request": [Parser.parse_pr_event],
+    "issue_comment": [
+        Parser.parse_pull_request_comment_event,
+        Parser.parse_issue_comment_event,
+    ],
+    "release": [Parser.parse_release_event],
+    "push": [Parser.parse_push_event],
+    "installation": [Parser.parse_installation_event],
+    "installation_repositories": [Parser.parse_installation_event],
+    "Merge Request Hook": [Parser.parse_mr_event],
+    "Note Hook": [
+        Parser.parse_merge_request_comment_event,
+        Parser.parse_gitlab_issue_comment_event,
+    ],
+    "Push Hook": [Parser.parse_gitlab_push_event],
+    TESTING_FARM_RESULTS_EVENT_TYPE: [Parser.parse_testing_farm_results_event],
+}
+
+PARSERS_FOR_TOPIC: Dict[str, List[Callable]] = {
+    NewDistGitCommitHandler.topic: [Parser.parse_distgit_event],
+    "org.fedoraproject.prod.copr.build.start": [Parser.parse_copr_event],
+    "org.fedoraproject.prod.copr.build.end": [Parser.parse_copr_event],
+    "org.fedoraproject.prod.buildsys.task.state.change": [Parser.parse_koji_event],
+}
+
+PARSERS_FOR_GITLAB_OBJECT_KIND: Dict[str, List[Callable]] = {
+    "merge_request": [Parser.parse_mr_event],
+    "note": [
+        Parser.parse_merge_request_comment_event,
+        Parser.parse_gitlab_issue_comment_event,
+    ],
+    "push": [Parser.parse_gitlab_push_event],
+}
+
+
 class CentosEventParser:
     """
     Class responsible for parsing events received from CentOS infrastructure
@@ -21,13 +21,62 @@
 # SOFTWARE.
 import hashlib
 import logging
-from typing import Optional, Union
+from contextlib import contextmanager
+from threading import local
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from ogr.abstract import GitProject, CommitStatus
 from ogr.services.pagure import PagureProject
+from prometheus_client import Counter
+
+from packit_service.cache import SharedTTLCache
+from packit_service.constants import COMMIT_STATUS_CACHE_SIZE, COMMIT_STATUS_CACHE_TTL
 
 logger = logging.getLogger(__name__)
 
+# the last status we have set for the check of the commit in the project
+commit_status_cache = SharedTTLCache(
+    "commit-status", max_size=COMMIT_STATUS_CACHE_SIZE, ttl=COMMIT_STATUS_CACHE_TTL
+)
+commit_status_updates = Counter(
+    "commit_status_updates",
+    "Number of commit statuses reported, by what we did with them",
+    # sent, coalesced (replaced by a later one before sending), unchanged (not sent)
+    ["result"],
+)
+
+# reporters created in the write_behind block
+_write_behind = local()
+
+
+@contextmanager
+def write_behind():
+    """
+    Buffer the statuses of the reporters created in the block
+    and send them at the end of it (used for the whole run of a handler).
+
+    Only the repeated statuses of a check wait, its first status is sent right away
+    (and the buffered ones with it) so that the user sees we are working on it.
+
+    A nested block does nothing, the statuses are sent at the end of the outer one.
+    """
+    if getattr(_write_behind, "reporters", None) is not None:
+        yield
+        return
+
+    _write_behind.reporters = []
+    try:
+        yield
+    finally:
+        reporters: List["StatusReporter"] = _write_behind.reporters
+        _write_behind.reporters = None
+        for reporter in reporters:
+            try:
+                reporter.stop_buffering()
+            except Exception as ex:
+                # the work is done, don't hide its result (or exception)
+                logger.error(f"Failed to set the commit statuses: {ex!r}")
+
 
 class StatusReporter:
     def __init__(
@@ -39,6 +88,16 @@ class StatusReporter:
         self.project = project
         self.commit_sha = commit_sha
         self.pr_id = pr_id
+        # fetched when setting the first status of the pull-request
+        self._pr = None
+        # check name -> (state, description, url)
+        self._updates: Dict[str, Tuple[CommitStatus, str, str]] = {}
+        # checks we have sent (or skipped as unchanged) a status for
+        self._flushed: Set[str] = set()
+        self._buffering = 0
+        if getattr(_write_behind, "reporters", None) is not None:
+            _write_behind.reporters.append(self)
+            self.start_buffering()
 
     def report(
         self,
@@ -63,17 +122,93 @@ class StatusReporter:
         elif isinstance(check_names, str):
             check_names = [check_names]
 
-        for check in check_names:
-            self.set_status(
-                state=state, description=description, check_name=check, url=url
+        with self.buffered():
+            for check in check_names:
+                self.set_status(
+                    state=state, description=description, check_name=check, url=url
+                )
+
+    def start_buffering(self) -> None:
+        self._buffering += 1
+
+    def stop_buffering(self) -> None:
+        self._buffering -= 1
+        if not self._buffering:
+            self.flush()
+
+    @contextmanager
+    def buffered(self):
+        """
+        Send the statuses set in the block at the end of it
+        (except for the first status of a check which is sent right away).
+        """
+        self.start_buffering()
+        try:
+            yield
+        finally:
+            self.stop_buffering()
+
+    def set_status(
+        self, state: CommitStatus, description: str, check_name: str, url: str = "",
+    ):
+        # Required because Pagure API doesn't accept empty url.
+        if not url and isinstance(self.project, PagureProject):
+            url = "https://wiki.centos.org/Manuals/ReleaseNotes/CentOSStream"
+
+        if check_name in self._updates:
+            # only the last status of the check is visible anyway
+            commit_status_updates.labels(result="coalesced").inc()
+            # keep the order in which the checks were reported
+            del self._updates[check_name]
+        self._updates[check_name] = (state, description, url)
+
+        if not self._buffering or check_name not in self._flushed:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Send the buffered statuses which differ from the ones we set before. """
+        updates, self._updates = self._updates, {}
+        for check_name, (state, description, url) in updates.items():
+            self._flushed.add(check_name)
+            cache_key = self._get_cache_key(check_name)
+            status = [state.name, description, url]
+            if cache_key and commit_status_cache.get(cache_key) == status:
+                logger.debug(f"Status for check '{check_name}' is already set.")
+                commit_status_updates.labels(result="unchanged").inc()
+                continue
+
+            logger.debug(
+                f"Setting status for check '{check_name}': {description}, STATE: {state}"
+            )
+            self.project.set_commit_status(
+                self.commit_sha, state, url, description, check_name, trim=True
+            )
+            # Also set the status of the pull-request for forges which don't do
+            # this automatically based on the flags on the last commit in the PR.
+            if self.pr_id is not None:
+                self._pr = self._pr or self.project.get_pr(self.pr_id)
+                self.__set_pull_request_status(
+                    self._pr, check_name, description, url, state
+                )
+
+            commit_status_updates.labels(result="sent").inc()
+            if cache_key:
+                commit_status_cache.set(cache_key, status)
+
+    def _get_cache_key(self, check_name: str) -> Optional[str]:
+        try:
+            project = (
+                f"{self.project.service.instance_url}/"
+                f"{self.project.namespace}/{self.project.repo}"
             )
+        except AttributeError:
+            # not an ogr project (tests), let's not risk skipping the status
+            return None
+        return f"{project}:{self.commit_sha}:{check_name}"
 
     def __set_pull_request_status(
-        self, check_name: str, description: str, url: str, state: CommitStatus
+        self, pr, check_name: str, description: str, url: str, state: CommitStatus
     ):
-        if self.pr_id is None:
-            return
-        pr = self.project.get_pr(self.pr_id)
         if hasattr(pr, "set_flag") and pr.head_commit == self.commit_sha:
             logger.debug("Setting the PR status (pagure only).")
             pr.set_flag(
@@ -87,22 +222,5 @@ class StatusReporter:
                 uid=hashlib.md5(check_name.encode()).hexdigest(),
             )
 
-    def set_status(
-        self, state: CommitStatus, description: str, check_name: str, url: str = "",
-    ):
-        # Required because Pagure API doesn't accept empty url.
-        if not url and isinstance(self.project, PagureProject):
-            url = "https://wiki.centos.org/Manuals/ReleaseNotes/CentOSStream"
-
-        logger.debug(
-            f"Setting status for check '{check_name}': {description}, STATE: {state}"
-        )
-        self.project.set_commit_status(
-            self.commit_sha, state, url, description, check_name, trim=True
-        )
-        # Also set the status of the pull-request for forges which don't do
-        # this automatically based on the flags on the last commit in the PR.
-        self.__set_pull_request_status(check_name, description, url, state)
-
     def get_statuses(self):
         self.project.get_commit_statuses(commit=self.commit_sha)
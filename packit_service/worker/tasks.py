@@ -20,10 +20,27 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import logging
+from datetime import date, datetime, timedelta
+from os import getenv
 from typing import Optional
 
+from celery.signals import worker_init, worker_process_init
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
 from packit_service.celerizer import celery_app
-from packit_service.models import TaskResultModel
+from packit_service.config import ServiceConfig
+from packit_service.constants import (
+    COPR_BABYSIT_INTERVAL,
+    PARTITION_MAINTENANCE_INTERVAL,
+    PARTITIONS_MONTHS_AHEAD,
+    TASK_RESULTS_CLEANUP_INTERVAL,
+)
+from packit_service.models import (
+    TaskResultModel,
+    dispose_engine,
+    maintain_partitions,
+    move_rows_from_default,
+)
 from packit_service.service.events import (
     CoprBuildEvent,
     InstallationEvent,
@@ -33,7 +50,8 @@ from packit_service.service.events import (
     EventData,
     TestResult,
 )
-from packit_service.worker.build.babysit import check_copr_build
+from packit_service.worker.build.babysit import check_pending_copr_builds
+from packit_service.worker.clients import client_registry
 from packit_service.worker.jobs import SteveJobs
 from packit_service.worker.handlers.github_handlers import (
     GithubAppInstallationHandler,
@@ -66,7 +84,7 @@ from packit_service.worker.handlers.testing_farm_handlers import (
     TestingFarmResultsHandler,
 )
 
-from packit_service.worker.handlers.abstract import TaskName
+from packit_service.worker.handlers.abstract import TaskName, TASK_QUEUES
 from packit_service.utils import load_package_config, load_job_config
 
 logger = logging.getLogger(__name__)
@@ -82,10 +100,58 @@ logging.getLogger("ogr").setLevel(logging.INFO)
 logging.getLogger("packit").setLevel(logging.DEBUG)
 logging.getLogger("sandcastle").setLevel(logging.DEBUG)
 
+# the rest (process_message, the periodic tasks) goes to the default (short) queue
+celery_app.conf.task_routes = {
+    task_name.value: {"queue": queue.value} for task_name, queue in TASK_QUEUES.items()
+}
+
+# the periodic tasks are scheduled by the worker started with BEAT=true (files/run_worker.sh)
+celery_app.conf.beat_schedule = {
+    "babysit-pending-copr-builds": {
+        "task": "task.babysit_pending_copr_builds",
+        "schedule": COPR_BABYSIT_INTERVAL,
+        # don't let the checks pile up if the workers are busy
+        "options": {"expires": COPR_BABYSIT_INTERVAL},
+    },
+    "delete-old-task-results": {
+        "task": "task.delete_old_task_results",
+        "schedule": TASK_RESULTS_CLEANUP_INTERVAL,
+        "options": {"expires": TASK_RESULTS_CLEANUP_INTERVAL},
+    },
+    "maintain-partitions": {
+        "task": "task.maintain_partitions",
+        "schedule": PARTITION_MAINTENANCE_INTERVAL,
+        "options": {"expires": PARTITION_MAINTENANCE_INTERVAL},
+    },
+}
+
+
+@worker_init.connect
+def expose_metrics(**kwargs):
+    """
+    Serve the metrics (e.g. package config cache hits) of all the worker processes.
+
+    The processes write them to prometheus_multiproc_dir, see files/run_worker.sh.
+    """
+    port = getenv("METRICS_PORT")
+    if not (port and getenv("prometheus_multiproc_dir")):
+        return
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(int(port), registry=registry)
+    logger.info(f"Metrics are served on port {port}.")
+
+
+@worker_process_init.connect
+def reset_clients(**kwargs):
+    """ Don't share the connections opened before the fork with the parent process. """
+    client_registry.reset()
+    dispose_engine()
+
 
 @celery_app.task(name="task.steve_jobs.process_message", bind=True)
 def process_message(
-    self, event: dict, topic: str = None, source: str = None
+    self, event: dict, topic: str = None, source: str = None, event_type: str = None
 ) -> Optional[dict]:
     """
     Base celery task for processing messages.
@@ -93,10 +159,11 @@ def process_message(
     :param event: event data
     :param topic: event topic
     :param source: event source
+    :param event_type: kind of the event (e.g. X-GitHub-Event header of the webhook)
     :return: dictionary containing task results
     """
     task_results: dict = SteveJobs().process_message(
-        event=event, topic=topic, source=source
+        event=event, topic=topic, source=source, event_type=event_type
     )
     if task_results:
         TaskResultModel.add_task_result(
@@ -105,17 +172,41 @@ def process_message(
     return task_results
 
 
-@celery_app.task(
-    bind=True,
-    name="task.babysit_copr_build",
-    retry_backoff=60,  # retry again in 60s, 120s, 240s, 480s...
-    retry_backoff_max=60 * 60 * 8,  # is 8 hours okay? gcc/kernel build really long
-    max_retries=7,
-)
-def babysit_copr_build(self, build_id: int):
-    """ check status of a copr build and update it in DB """
-    if not check_copr_build(build_id=build_id):
-        self.retry()
+@celery_app.task(name="task.babysit_pending_copr_builds")
+def babysit_pending_copr_builds():
+    """ check status of all the pending copr builds and update them in DB """
+    check_pending_copr_builds()
+
+
+@celery_app.task(name="task.delete_old_task_results")
+def delete_old_task_results():
+    """ apply the retention policy (task_results_retention_days) to the task results """
+    retention_days = ServiceConfig.get_service_config().task_results_retention_days
+    if not retention_days:
+        return
+    deleted = TaskResultModel.delete_older_than(
+        datetime.utcnow() - timedelta(days=retention_days)
+    )
+    logger.info(f"Deleted {deleted} task results older than {retention_days} days.")
+
+
+@celery_app.task(name="task.maintain_partitions")
+def run_partition_maintenance():
+    """ create the upcoming partitions of the builds and test runs, detach the old ones """
+    created, detached = maintain_partitions(
+        months_ahead=PARTITIONS_MONTHS_AHEAD,
+        retention_months=ServiceConfig.get_service_config().partition_retention_months,
+    )
+    logger.info(f"Created partitions: {created}, detached partitions: {detached}")
+
+
+@celery_app.task(name="task.move_rows_from_default_partition")
+def run_move_rows_from_default(table: str, month: str):
+    """
+    Not scheduled: run it when the maintenance fails to create the partition
+    for the month (YYYY-MM-DD, the first day) because its rows are in the default one.
+    """
+    move_rows_from_default(table, date.fromisoformat(month))
 
 
 # tasks for running the handlers
@@ -24,6 +24,8 @@
 import json
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Union
 
 import requests
 from ogr.abstract import GitProject, CommitStatus
@@ -33,11 +35,15 @@ from packit.config.package_config import PackageConfig
 from packit.exceptions import PackitConfigException
 
 from packit_service.config import ServiceConfig
-from packit_service.constants import TESTING_FARM_TRIGGER_URL
+from packit_service.constants import (
+    TESTING_FARM_SUBMIT_CONCURRENCY,
+    TESTING_FARM_TRIGGER_URL,
+)
 from packit_service.models import TFTTestRunModel, TestingFarmResult
 from packit_service.sentry_integration import send_to_sentry
 from packit_service.service.events import EventData
 from packit_service.worker.build import CoprBuildJobHelper
+from packit_service.worker.clients import client_registry
 from packit_service.worker.result import TaskResults
 
 logger = logging.getLogger(__name__)
@@ -62,10 +68,10 @@ class TestingFarmJobHelper(CoprBuildJobHelper):
             job_config=job_config,
         )
 
-        self.session = requests.session()
-        adapter = requests.adapters.HTTPAdapter(max_retries=5)
+        self.session = client_registry.get_session(
+            TESTING_FARM_TRIGGER_URL, max_retries=5
+        )
         self.insecure = False
-        self.session.mount("https://", adapter)
         self.header: dict = {"Content-Type": "application/json"}
 
     def _trigger_payload(self, pipeline_id: str, chroot: str) -> dict:
@@ -101,23 +107,66 @@ class TestingFarmJobHelper(CoprBuildJobHelper):
         )
 
     def run_testing_farm_on_all(self):
-        failed = {}
+        """
+        Submit the tests for all the targets at once.
+
+        Only the requests are sent concurrently, the statuses and the DB
+        are updated in this thread.
+        """
+        results: Dict[str, TaskResults] = {}
+        submissions: Dict[str, Tuple[TFTTestRunModel, dict]] = {}
         for chroot in self.tests_targets:
-            result = self.run_testing_farm(chroot)
-            if not result["success"]:
-                failed[chroot] = result.get("details")
+            prepared = self.prepare_testing_farm(chroot)
+            if isinstance(prepared, TaskResults):
+                results[chroot] = prepared
+            else:
+                submissions[chroot] = prepared
+
+        if submissions:
+            with ThreadPoolExecutor(
+                max_workers=min(TESTING_FARM_SUBMIT_CONCURRENCY, len(submissions))
+            ) as executor:
+                responses = executor.map(
+                    self.submit_testing_farm_request,
+                    [payload for _, payload in submissions.values()],
+                )
+                for (chroot, (test_run_model, _)), response in zip(
+                    submissions.items(), responses
+                ):
+                    results[chroot] = self.process_testing_farm_response(
+                        chroot, test_run_model, response
+                    )
 
+        failed = {
+            chroot: result.get("details")
+            for chroot, result in results.items()
+            if not result["success"]
+        }
         if not failed:
             return TaskResults(success=True, details={})
 
-        return TaskResults(
-            success=False,
-            details={"msg": f"Failed testing farm targets: '{failed.keys()}'."}.update(
-                failed
-            ),
-        )
+        details = {"msg": f"Failed testing farm targets: {list(failed)}."}
+        details.update(failed)
+        return TaskResults(success=False, details=details)
 
     def run_testing_farm(self, chroot: str) -> TaskResults:
+        prepared = self.prepare_testing_farm(chroot)
+        if isinstance(prepared, TaskResults):
+            return prepared
+
+        test_run_model, payload = prepared
+        response = self.submit_testing_farm_request(payload)
+        return self.process_testing_farm_response(chroot, test_run_model, response)
+
+    def prepare_testing_farm(
+        self, chroot: str
+    ) -> Union[TaskResults, Tuple[TFTTestRunModel, dict]]:
+        """
+        Check the target and create the test run for it.
+
+        :return: test run and the payload to submit
+                 or the results if the tests can't be submitted
+        """
         if chroot not in self.tests_targets:
             # Leaving here just to be sure that we will discover this situation if it occurs.
             # Currently not possible to trigger this situation.
@@ -154,21 +203,39 @@ class TestingFarmJobHelper(CoprBuildJobHelper):
             trigger_model=self.db_trigger,
         )
 
-        logger.debug("Sending testing farm request...")
         payload = self._trigger_payload(pipeline_id, chroot)
         logger.debug(f"Payload: {payload}")
+        return test_run_model, payload
 
-        req = self.send_testing_farm_request(
-            TESTING_FARM_TRIGGER_URL, "POST", {}, json.dumps(payload)
-        )
+    def submit_testing_farm_request(self, payload: dict) -> Optional[RequestResponse]:
+        """ Safe to be called from multiple threads at once. """
+        logger.debug("Sending testing farm request...")
+        try:
+            req = self.send_testing_farm_request(
+                TESTING_FARM_TRIGGER_URL, "POST", {}, json.dumps(payload)
+            )
+        except Exception as ex:
+            # don't let one target fail all the others
+            logger.error(f"Failed to submit the tests: {ex!r}")
+            return None
         logger.debug(f"Request sent: {req}")
+        return req
+
+    def process_testing_farm_response(
+        self,
+        chroot: str,
+        test_run_model: TFTTestRunModel,
+        req: Optional[RequestResponse],
+    ) -> TaskResults:
         if not req:
             msg = "Failed to post request to testing farm API."
             logger.debug("Failed to post request to testing farm API.")
             self.report_status_to_test_for_chroot(
                 state=CommitStatus.failure, description=msg, chroot=chroot,
             )
-            test_run_model.set_status(TestingFarmResult.error)
+            test_run_model.update_state(
+                expected_status=[TestingFarmResult.new], status=TestingFarmResult.error,
+            )
             return TaskResults(success=False, details={"msg": msg})
         else:
             logger.debug(
@@ -195,10 +262,16 @@ class TestingFarmJobHelper(CoprBuildJobHelper):
                 self.report_status_to_test_for_chroot(
                     state=CommitStatus.failure, description=msg, chroot=chroot,
                 )
-                test_run_model.set_status(TestingFarmResult.error)
+                test_run_model.update_state(
+                    expected_status=[TestingFarmResult.new],
+                    status=TestingFarmResult.error,
+                )
                 return TaskResults(success=False, details={"msg": msg})
 
-            test_run_model.set_status(TestingFarmResult.running)
+            test_run_model.update_state(
+                expected_status=[TestingFarmResult.new],
+                status=TestingFarmResult.running,
+            )
             self.report_status_to_test_for_chroot(
                 state=CommitStatus.pending,
                 description="Tests are running ...",
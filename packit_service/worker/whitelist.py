@@ -28,7 +28,14 @@ from packit.config.job_config import JobConfig
 from packit.exceptions import PackitException
 
 from packit_service.config import ServiceConfig
-from packit_service.constants import FAQ_URL
+from packit_service.cache import SharedTTLCache
+from packit_service.constants import (
+    FAQ_URL,
+    FPCA_CACHE_TTL,
+    WHITELIST_CACHE_LOCAL_TTL,
+    WHITELIST_CACHE_SIZE,
+    WHITELIST_CACHE_TTL,
+)
 from packit_service.models import WhitelistModel
 from packit_service.service.events import (
     PullRequestGithubEvent,
@@ -53,14 +60,26 @@ from packit_service.service.events import (
     PushGitlabEvent,
 )
 from packit_service.worker.build import CoprBuildJobHelper
+from packit_service.worker.clients import client_registry
 
 logger = logging.getLogger(__name__)
 
+# account name -> is it approved?
+whitelist_cache = SharedTTLCache(
+    "whitelist",
+    max_size=WHITELIST_CACHE_SIZE,
+    ttl=WHITELIST_CACHE_TTL,
+    local_ttl=WHITELIST_CACHE_LOCAL_TTL,
+)
+# FAS login -> has the user signed FPCA?
+fpca_cache = SharedTTLCache("fpca", max_size=WHITELIST_CACHE_SIZE, ttl=FPCA_CACHE_TTL)
+
 
 class Whitelist:
     def __init__(self, fas_user: str = None, fas_password: str = None):
-        self._fas: AccountSystem = AccountSystem(
-            username=fas_user, password=fas_password
+        self._fas: AccountSystem = client_registry.get_client(
+            ("fas", fas_user),
+            lambda: AccountSystem(username=fas_user, password=fas_password),
         )
 
     def _signed_fpca(self, account_login: str) -> bool:
@@ -71,6 +90,9 @@ class Whitelist:
         :param account_login: str, Github username
         :return: bool
         """
+        signed = fpca_cache.get(account_login)
+        if signed is not None:
+            return signed
 
         try:
             person = self._fas.person_by_username(account_login)
@@ -81,17 +103,22 @@ class Whitelist:
             logger.error(f"FAS query failed: {e!r}")
             return False
 
+        signed = False
         if not person:
             logger.info(f"Not a FAS username {account_login!r}.")
-            return False
-
-        for membership in person.get("memberships", []):
-            if membership.get("name") == "cla_fpca":
-                logger.info(f"User {account_login!r} signed FPCA!")
-                return True
+        elif any(
+            membership.get("name") == "cla_fpca"
+            for membership in person.get("memberships", [])
+        ):
+            logger.info(f"User {account_login!r} signed FPCA!")
+            signed = True
+        else:
+            logger.info(f"Cannot verify whether {account_login!r} signed FPCA.")
 
-        logger.info(f"Cannot verify whether {account_login!r} signed FPCA.")
-        return False
+        if signed:
+            # not the unsigned ones, they can sign it any time
+            fpca_cache.set(account_login, signed)
+        return signed
 
     def add_account(self, account_login: str, sender_login: str) -> bool:
         """
@@ -106,11 +133,13 @@ class Whitelist:
             return True
 
         WhitelistModel.add_account(account_login, WhitelistStatus.waiting.value)
+        whitelist_cache.delete(account_login)
 
         if self._signed_fpca(sender_login):
             WhitelistModel.add_account(
                 account_login, WhitelistStatus.approved_automatically.value
             )
+            whitelist_cache.delete(account_login)
             return True
 
         return False
@@ -124,6 +153,7 @@ class Whitelist:
         WhitelistModel.add_account(
             account_name=account_name, status=WhitelistStatus.approved_manually.value
         )
+        whitelist_cache.delete(account_name)
 
         logger.info(f"Account {account_name!r} approved successfully.")
 
@@ -134,16 +164,22 @@ class Whitelist:
         :param account_name: account name to check
         :return:
         """
+        approved = whitelist_cache.get(account_name)
+        if approved is not None:
+            return approved
+
+        approved = False
         account = WhitelistModel.get_account(account_name)
         if account:
             db_status = account.status
             s = WhitelistStatus(db_status)
-            return (
+            approved = (
                 s == WhitelistStatus.approved_automatically
                 or s == WhitelistStatus.approved_manually
             )
 
-        return False
+        whitelist_cache.set(account_name, approved)
+        return approved
 
     @staticmethod
     def remove_account(account_name: str) -> bool:
@@ -156,6 +192,7 @@ class Whitelist:
 
         if WhitelistModel.get_account(account_name):
             WhitelistModel.remove_account(account_name)
+            whitelist_cache.delete(account_name)
             logger.info(f"Account {account_name!r} removed from postgres whitelist!")
             account_existed = True
 
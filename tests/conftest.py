@@ -28,14 +28,21 @@ from flexmock import flexmock
 
 from ogr import GithubService, GitlabService
 from packit.config import JobConfigTriggerType
-from packit_service.config import ServiceConfig
+from packit_service import cache, rate_limit
+from packit_service.config import ServiceConfig, package_config_cache
 from packit_service.models import JobTriggerModelType
+from packit_service.rate_limit import rate_limiter
 from packit_service.service.events import (
     PullRequestGithubEvent,
     ReleaseEvent,
     MergeRequestGitlabEvent,
 )
+from packit_service.worker.build.srpm_cache import srpm_cache
+from packit_service.worker.clients import client_registry
+from packit_service.worker.git_mirror import git_mirror_cache
 from packit_service.worker.parser import Parser
+from packit_service.worker.reporting import commit_status_cache
+from packit_service.worker.whitelist import fpca_cache, whitelist_cache
 from tests.spellbook import SAVED_HTTPD_REQS, DATA_DIR
 
 
@@ -58,6 +65,49 @@ def global_service_config():
     ServiceConfig.service_config = service_config
 
 
+@pytest.fixture(autouse=True)
+def no_caches(monkeypatch):
+    """
+    Tests mock what the cached values are loaded from, so don't cache anything.
+
+    Use the `caching` fixture to test the caches.
+    """
+    monkeypatch.setenv("CACHES", "disabled")
+
+
+@pytest.fixture()
+def caching(no_caches, monkeypatch, tmp_path):
+    """
+    Turn the caches on, with Redis replaced by a dict (which is returned)
+    and the local disk ones in the temporary directory of the test.
+    """
+    monkeypatch.setenv("CACHES", "enabled")
+    monkeypatch.setattr(srpm_cache, "directory", tmp_path / "srpm-cache")
+    monkeypatch.setattr(git_mirror_cache, "directory", tmp_path / "git-mirrors")
+    redis = {}
+    fake_redis = flexmock(
+        get=lambda key: redis.get(key),
+        set=lambda key, value, ex: redis.__setitem__(key, value),
+        delete=lambda key: redis.pop(key, None),
+        # the rate limiter, which never makes us wait
+        register_script=lambda source: lambda keys, args: [1, str(args[0])],
+    )
+    flexmock(cache).should_receive("get_redis").and_return(fake_redis)
+    flexmock(rate_limit).should_receive("get_redis").and_return(fake_redis)
+    monkeypatch.setattr(rate_limiter, "_script", None)
+    shared_caches = (
+        package_config_cache,
+        commit_status_cache,
+        whitelist_cache,
+        fpca_cache,
+    )
+    for shared_cache in shared_caches:
+        shared_cache.clear_local()
+    yield redis
+    for shared_cache in shared_caches:
+        shared_cache.clear_local()
+
+
 @pytest.fixture()
 def dump_http_com():
     """
@@ -199,3 +249,9 @@ def gitlab_mr_webhook():
 @pytest.fixture(scope="module")
 def gitlab_mr_event(gitlab_mr_webhook) -> MergeRequestGitlabEvent:
     return Parser.parse_mr_event(gitlab_mr_webhook)
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """ Don't reuse the (mocked) clients of the other tests. """
+    client_registry.reset()
@@ -19,111 +19,167 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+from datetime import datetime
+
 from copr.v3 import Client
 from flexmock import flexmock
 
+from ogr.abstract import CommitStatus
 from packit.config import PackageConfig, JobConfig, JobType, JobConfigTriggerType
+from packit.config.job_config import JobMetadataConfig
 from packit_service.models import CoprBuildModel, JobTriggerModelType
 from packit_service.service.events import CoprBuildEvent
-from packit_service.worker.build.babysit import check_copr_build
+from packit_service.service.urls import get_copr_build_info_url_from_flask
+from packit_service.worker.build import babysit
+from packit_service.worker.build.babysit import (
+    check_pending_copr_builds,
+    update_copr_builds,
+)
+from packit_service.worker.build.copr_build import CoprBuildJobHelper
 from packit_service.worker.handlers import CoprBuildEndHandler
+from packit_service.worker.reporting import StatusReporter
 
 
-def test_check_copr_build_no_build():
-    flexmock(CoprBuildModel).should_receive("get_all_by_build_id").with_args(
-        1
-    ).and_return([])
-    assert check_copr_build(build_id=1)
-
+def test_update_copr_builds_already_successful():
+    copr_client = flexmock(build_chroot_proxy=flexmock())
+    copr_client.build_chroot_proxy.should_receive("get").never()
+    flexmock(CoprBuildEndHandler).should_receive("run").never()
 
-def test_check_copr_build_not_ended():
-    flexmock(CoprBuildModel).should_receive("get_all_by_build_id").with_args(
-        1
-    ).and_return([flexmock()])
-    flexmock(Client).should_receive("create_from_config_file").and_return(
-        flexmock(
-            build_proxy=flexmock()
-            .should_receive("get")
-            .with_args(1)
-            .and_return(flexmock(ended_on=False))
-            .mock()
-        )
+    update_copr_builds(
+        copr_client,
+        1,
+        [flexmock(status="success")],
+        flexmock(ended_on="timestamp", state="completed"),
     )
-    assert not check_copr_build(build_id=1)
 
 
-def test_check_copr_build_already_successful():
-    flexmock(CoprBuildModel).should_receive("get_all_by_build_id").with_args(
-        1
-    ).and_return([flexmock(status="success")])
-    flexmock(Client).should_receive("create_from_config_file").and_return(
-        flexmock(
-            build_proxy=flexmock()
-            .should_receive("get")
-            .with_args(1)
-            .and_return(flexmock(ended_on="timestamp", state="completed"))
-            .mock()
+def pending_build():
+    return flexmock(
+        id=1,
+        build_id="1",
+        status="pending",
+        target="fedora-rawhide-x86_64",
+        owner="the-owner",
+        project_name="the-project-name",
+        commit_sha="123456",
+        job_trigger=flexmock(type=JobTriggerModelType.pull_request)
+        .should_receive("get_trigger_object")
+        .and_return(
+            flexmock(
+                project=flexmock(
+                    repo_name="repo_name",
+                    namespace="the-namespace",
+                    project_url="https://github.com/the-namespace/repo_name",
+                ),
+                pr_id=5,
+                job_config_trigger_type=JobConfigTriggerType.pull_request,
+                id=123,
+            )
         )
+        .mock(),
     )
-    assert check_copr_build(build_id=1)
 
 
-def test_check_copr_build_updated():
+def test_update_copr_builds():
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return()
-    flexmock(CoprBuildModel).should_receive("get_all_by_build_id").with_args(
-        1
-    ).and_return(
-        [
-            flexmock(
-                status="pending",
-                target="the-target",
-                owner="the-owner",
-                project_name="the-project-name",
-                commit_sha="123456",
-                job_trigger=flexmock(type=JobTriggerModelType.pull_request)
-                .should_receive("get_trigger_object")
-                .and_return(
-                    flexmock(
-                        project=flexmock(
-                            repo_name="repo_name",
-                            namespace="the-namespace",
-                            project_url="https://github.com/the-namespace/repo_name",
-                        ),
-                        pr_id=5,
-                        job_config_trigger_type=JobConfigTriggerType.pull_request,
-                        id=123,
-                    )
-                )
-                .mock(),
-            )
-        ]
+    copr_client = flexmock(
+        build_chroot_proxy=flexmock()
+        .should_receive("get")
+        .with_args(1, "fedora-rawhide-x86_64")
+        .and_return(flexmock(ended_on="timestamp", state="completed"))
+        .mock(),
     )
-    flexmock(Client).should_receive("create_from_config_file").and_return(
+    flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
+        PackageConfig(
+            jobs=[
+                JobConfig(type=JobType.build, trigger=JobConfigTriggerType.pull_request)
+            ]
+        )
+    )
+    flexmock(CoprBuildEndHandler).should_receive("run").and_return().once()
+
+    update_copr_builds(
+        copr_client,
+        1,
+        [pending_build()],
         flexmock(
-            build_proxy=flexmock()
-            .should_receive("get")
-            .with_args(1)
-            .and_return(
-                flexmock(
-                    ended_on=True,
-                    state="completed",
-                    source_package={"name": "source_package_name"},
-                )
-            )
-            .mock(),
-            build_chroot_proxy=flexmock()
-            .should_receive("get")
-            .with_args(1, "the-target")
-            .and_return(flexmock(ended_on="timestamp", state="completed"))
-            .mock(),
+            ended_on=True,
+            state="completed",
+            source_package={"name": "source_package_name"},
+        ),
+    )
+
+
+def test_check_pending_copr_builds():
+    builds = [
+        flexmock(build_id="1", target="fedora-rawhide-x86_64"),
+        flexmock(build_id="1", target="fedora-32-x86_64"),
+        flexmock(build_id="2", target="fedora-rawhide-x86_64"),
+    ]
+    flexmock(CoprBuildModel).should_receive("get_all_by_status").with_args(
+        "pending", submitted_before=datetime
+    ).and_return([])
+    flexmock(CoprBuildModel).should_receive("get_all_by_status").with_args(
+        "pending", submitted_after=datetime
+    ).and_return(builds)
+    copr_client = flexmock(
+        build_proxy=flexmock()
+        .should_receive("get")
+        .replace_with(
+            lambda build_id: flexmock(ended_on=True if build_id == 1 else None)
         )
+        .twice()
+        .mock()
     )
+    flexmock(Client).should_receive("create_from_config_file").and_return(
+        copr_client
+    ).once()
+    flexmock(babysit).should_receive("update_copr_builds").with_args(
+        copr_client, 1, builds[:2], object
+    ).once()
+
+    check_pending_copr_builds()
+
+
+def test_check_pending_copr_builds_nothing_pending():
+    flexmock(CoprBuildModel).should_receive("get_all_by_status").and_return([])
+    flexmock(Client).should_receive("create_from_config_file").never()
+
+    check_pending_copr_builds()
+
+
+def test_check_pending_copr_builds_timed_out():
+    build = pending_build()
+    flexmock(CoprBuildModel).should_receive("get_all_by_status").with_args(
+        "pending", submitted_before=datetime
+    ).and_return([build])
+    flexmock(CoprBuildModel).should_receive("get_all_by_status").with_args(
+        "pending", submitted_after=datetime
+    ).and_return([])
+    flexmock(CoprBuildModel).should_receive("get_by_build_id").with_args(
+        "1", "fedora-rawhide-x86_64"
+    ).and_return(build)
     flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
         PackageConfig(
             jobs=[
-                JobConfig(type=JobType.build, trigger=JobConfigTriggerType.pull_request)
+                JobConfig(
+                    type=JobType.copr_build,
+                    trigger=JobConfigTriggerType.pull_request,
+                    metadata=JobMetadataConfig(targets=["fedora-rawhide-x86_64"]),
+                )
             ]
         )
     )
-    flexmock(CoprBuildEndHandler).should_receive("run").and_return().once()
-    assert check_copr_build(build_id=1)
+    # the user is told first, the build is pending until then
+    flexmock(StatusReporter).should_receive("report").with_args(
+        state=CommitStatus.error,
+        description="RPM build timed out.",
+        url=get_copr_build_info_url_from_flask(build.id),
+        check_names=CoprBuildJobHelper.get_build_check("fedora-rawhide-x86_64"),
+    ).once().ordered()
+    build.should_receive("update_state").with_args(
+        expected_status=["pending"], status="error"
+    ).and_return(True).once().ordered()
+    flexmock(Client).should_receive("create_from_config_file").never()
+
+    check_pending_copr_builds()
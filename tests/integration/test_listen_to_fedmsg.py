@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import json
+from datetime import datetime
 import uuid
 
 import pytest
@@ -34,6 +35,7 @@ from packit.config import JobConfig, JobType, JobConfigTriggerType
 from packit.config.job_config import JobMetadataConfig
 from packit.config.package_config import PackageConfig
 from packit.local_project import LocalProject
+from packit_service import rate_limit
 from packit_service.config import PackageConfigGetter
 from packit_service.constants import TESTING_FARM_TRIGGER_URL
 from packit_service.models import (
@@ -194,8 +196,11 @@ def test_copr_build_end(
     else:
         flexmock(GithubProject).should_receive("pr_comment").never()
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
-    copr_build_pr.should_receive("set_status").with_args("success")
-    copr_build_pr.should_receive("set_end_time").once()
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     url = get_copr_build_info_url_from_flask(1)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
@@ -219,6 +224,33 @@ def test_copr_build_end(
     )
 
 
+def test_copr_build_end_report_fails(copr_build_end, pc_build_pr, copr_build_pr):
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
+        pc_build_pr
+    )
+    flexmock(CoprBuildEndHandler).should_receive(
+        "was_last_packit_comment_with_congratulation"
+    ).and_return(True)
+    flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
+    flexmock(requests).should_receive("get").and_return(requests.Response())
+    flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
+    flexmock(StatusReporter).should_receive("report").and_raise(
+        RuntimeError, "GitHub is down"
+    )
+    # the build stays pending, the babysitter checks it again
+    copr_build_pr.should_receive("update_state").never()
+    flexmock(Signature).should_receive("apply_async").once()
+
+    processing_results = SteveJobs().process_message(copr_build_end)
+    event_dict, package_config, job = get_parameters_from_results(processing_results)
+
+    with pytest.raises(RuntimeError):
+        run_copr_build_end_handler(
+            package_config=package_config, event=event_dict, job_config=job,
+        )
+
+
 def test_copr_build_end_push(copr_build_end, pc_build_push, copr_build_branch_push):
     flexmock(GithubProject).should_receive("is_private").and_return(False)
     flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
@@ -235,8 +267,11 @@ def test_copr_build_end_push(copr_build_end, pc_build_push, copr_build_branch_pu
         copr_build_branch_push
     )
 
-    copr_build_branch_push.should_receive("set_status").with_args("success")
-    copr_build_branch_push.should_receive("set_end_time").once()
+    copr_build_branch_push.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     url = get_copr_build_info_url_from_flask(1)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
@@ -275,8 +310,11 @@ def test_copr_build_end_release(copr_build_end, pc_build_release, copr_build_rel
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(
         copr_build_release
     )
-    copr_build_release.should_receive("set_status").with_args("success")
-    copr_build_release.should_receive("set_end_time").once()
+    copr_build_release.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     url = get_copr_build_info_url_from_flask(1)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
@@ -333,8 +371,11 @@ def test_copr_build_end_testing_farm(copr_build_end, copr_build_pr):
     flexmock(LocalProject).should_receive("refresh_the_arguments").and_return(None)
 
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
-    copr_build_pr.should_receive("set_status").with_args("success")
-    copr_build_pr.should_receive("set_end_time").once()
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
     # check if packit-service set correct PR status
@@ -371,9 +412,9 @@ def test_copr_build_end_testing_farm(copr_build_end, copr_build_pr):
     }
 
     tft_test_run_model = flexmock()
-    tft_test_run_model.should_receive("set_status").with_args(
-        TestingFarmResult.running
-    ).and_return().once()
+    tft_test_run_model.should_receive("update_state").with_args(
+        expected_status=[TestingFarmResult.new], status=TestingFarmResult.running
+    ).and_return(True).once()
     flexmock(TFTTestRunModel).should_receive("create").with_args(
         pipeline_id=pipeline_id,
         commit_sha="0011223344",
@@ -461,8 +502,11 @@ def test_copr_build_end_failed_testing_farm(copr_build_end, copr_build_pr):
     flexmock(LocalProject).should_receive("refresh_the_arguments").and_return(None)
 
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
-    copr_build_pr.should_receive("set_status").with_args("success")
-    copr_build_pr.should_receive("set_end_time").once()
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
     # check if packit-service set correct PR status
@@ -506,9 +550,9 @@ def test_copr_build_end_failed_testing_farm(copr_build_end, copr_build_pr):
     ).once()
 
     tft_test_run_model = flexmock()
-    tft_test_run_model.should_receive("set_status").with_args(
-        TestingFarmResult.error
-    ).and_return().once()
+    tft_test_run_model.should_receive("update_state").with_args(
+        expected_status=[TestingFarmResult.new], status=TestingFarmResult.error
+    ).and_return(True).once()
     pipeline_id = "5e8079d8-f181-41cf-af96-28e99774eb68"
     flexmock(uuid).should_receive("uuid4").and_return(uuid.UUID(pipeline_id))
     flexmock(TFTTestRunModel).should_receive("create").with_args(
@@ -574,8 +618,11 @@ def test_copr_build_end_failed_testing_farm_no_json(copr_build_end, copr_build_p
     flexmock(LocalProject).should_receive("refresh_the_arguments").and_return(None)
 
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
-    copr_build_pr.should_receive("set_status").with_args("success")
-    copr_build_pr.should_receive("set_end_time").once()
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     url = get_copr_build_info_url_from_flask(1)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
@@ -606,7 +653,6 @@ def test_copr_build_end_failed_testing_farm_no_json(copr_build_end, copr_build_p
         )
     )
 
-    flexmock(CoprBuildModel).should_receive("set_status").with_args("failure")
     flexmock(StatusReporter).should_receive("report").with_args(
         state=CommitStatus.pending,
         description="Build succeeded. Submitting the tests ...",
@@ -621,9 +667,9 @@ def test_copr_build_end_failed_testing_farm_no_json(copr_build_end, copr_build_p
     ).once()
 
     tft_test_run_model = flexmock()
-    tft_test_run_model.should_receive("set_status").with_args(
-        TestingFarmResult.error
-    ).and_return().once()
+    tft_test_run_model.should_receive("update_state").with_args(
+        expected_status=[TestingFarmResult.new], status=TestingFarmResult.error
+    ).and_return(True).once()
     pipeline_id = "5e8079d8-f181-41cf-af96-28e99774eb68"
     flexmock(uuid).should_receive("uuid4").and_return(uuid.UUID(pipeline_id))
     flexmock(TFTTestRunModel).should_receive("create").with_args(
@@ -670,9 +716,12 @@ def test_copr_build_start(copr_build_start, pc_build_pr, copr_build_pr):
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
 
-    copr_build_pr.should_receive("set_start_time").once()
-    copr_build_pr.should_receive("set_status").with_args("pending").once()
-    copr_build_pr.should_receive("set_build_logs_url")
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="pending",
+        build_start_time=None,
+        build_logs_url=str,
+    ).and_return(True).once()
 
     # check if packit-service set correct PR status
     flexmock(StatusReporter).should_receive("report").with_args(
@@ -692,6 +741,87 @@ def test_copr_build_start(copr_build_start, pc_build_pr, copr_build_pr):
     )
 
 
+def test_copr_build_start_status_cached(
+    caching, copr_build_start, pc_build_pr, copr_build_pr
+):
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
+        pc_build_pr
+    )
+    flexmock(CoprBuildJobHelper).should_receive("get_build_check").and_return(
+        EXPECTED_BUILD_CHECK_NAME
+    )
+
+    flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
+    flexmock(requests).should_receive("get").and_return(requests.Response())
+    flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
+    copr_build_pr.should_receive("update_state").and_return(True).twice()
+
+    # the duplicate message doesn't set the same status again
+    flexmock(GithubProject).should_receive("set_commit_status").with_args(
+        copr_build_pr.commit_sha,
+        CommitStatus.pending,
+        get_copr_build_info_url_from_flask(1),
+        "RPM build is in progress...",
+        EXPECTED_BUILD_CHECK_NAME,
+        trim=True,
+    ).once()
+    flexmock(GithubProject).should_receive("get_pr").and_return(
+        flexmock(head_commit=copr_build_pr.commit_sha)
+    )
+
+    flexmock(Signature).should_receive("apply_async").twice()
+
+    for _ in range(2):
+        processing_results = SteveJobs().process_message(copr_build_start)
+        event_dict, package_config, job = get_parameters_from_results(
+            processing_results
+        )
+        run_copr_build_start_handler(
+            package_config=package_config, event=event_dict, job_config=job,
+        )
+
+
+def test_copr_build_start_rate_limited(
+    caching, copr_build_start, pc_build_pr, copr_build_pr
+):
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
+        pc_build_pr
+    )
+    flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
+    flexmock(requests).should_receive("get").and_return(requests.Response())
+    flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
+    copr_build_pr.should_receive("update_state").and_return(True).once()
+    flexmock(GithubProject).should_receive("set_commit_status").once()
+    flexmock(GithubProject).should_receive("get_pr").and_return(
+        flexmock(head_commit=copr_build_pr.commit_sha)
+    )
+    flexmock(Signature).should_receive("apply_async").once()
+
+    buckets = []
+
+    def take_tokens(keys, args):
+        buckets.extend(keys)
+        # 1 token taken, none left
+        return [1, b"0"]
+
+    flexmock(rate_limit).should_receive("get_redis").and_return(
+        flexmock(register_script=lambda source: take_tokens)
+    )
+    flexmock(rate_limit).should_receive("sleep").never()
+
+    processing_results = SteveJobs().process_message(copr_build_start)
+    event_dict, package_config, job = get_parameters_from_results(processing_results)
+    run_copr_build_start_handler(
+        package_config=package_config, event=event_dict, job_config=job,
+    )
+
+    # the calls (setting the status, getting the PR) share the bucket of the namespace
+    assert len(set(buckets)) == 1
+    assert buckets[0].startswith("packit-service:rate-limit:https://github.com/")
+
+
 def test_copr_build_just_tests_defined(copr_build_start, pc_tests, copr_build_pr):
     flexmock(GithubProject).should_receive("is_private").and_return(False)
     flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(pc_tests)
@@ -706,9 +836,12 @@ def test_copr_build_just_tests_defined(copr_build_start, pc_tests, copr_build_pr
     url = get_copr_build_info_url_from_flask(1)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
-    copr_build_pr.should_receive("set_start_time").once()
-    copr_build_pr.should_receive("set_status").with_args("pending")
-    copr_build_pr.should_receive("set_build_logs_url")
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="pending",
+        build_start_time=None,
+        build_logs_url=str,
+    ).and_return(True).once()
 
     # check if packit-service sets the correct PR status
     flexmock(StatusReporter).should_receive("report").with_args(
@@ -749,8 +882,11 @@ def test_copr_build_not_comment_on_success(copr_build_end, pc_build_pr, copr_bui
     flexmock(GithubProject).should_receive("pr_comment").never()
 
     flexmock(CoprBuildModel).should_receive("get_by_build_id").and_return(copr_build_pr)
-    copr_build_pr.should_receive("set_status").with_args("success")
-    copr_build_pr.should_receive("set_end_time").once()
+    copr_build_pr.should_receive("update_state").with_args(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=None,
+    ).and_return(True).once()
     url = get_copr_build_info_url_from_flask(1)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
@@ -787,11 +923,14 @@ def test_koji_build_start(koji_build_scratch_start, pc_koji_build_pr, koji_build
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
 
-    koji_build_pr.should_receive("set_build_start_time").once()
-    koji_build_pr.should_receive("set_build_finished_time").with_args(None).once()
-    koji_build_pr.should_receive("set_status").with_args("pending").once()
-    koji_build_pr.should_receive("set_build_logs_url")
-    koji_build_pr.should_receive("set_web_url")
+    koji_build_pr.should_receive("update_state").with_args(
+        unless_status=["success", "failed", "error"],
+        build_start_time=datetime,
+        build_finished_time=None,
+        status="pending",
+        build_logs_url=None,
+        web_url=None,
+    ).and_return(True).once()
 
     # check if packit-service set correct PR status
     flexmock(StatusReporter).should_receive("report").with_args(
@@ -838,11 +977,14 @@ def test_koji_build_end(koji_build_scratch_end, pc_koji_build_pr, koji_build_pr)
     flexmock(requests).should_receive("get").and_return(requests.Response())
     flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
 
-    koji_build_pr.should_receive("set_build_start_time").once()
-    koji_build_pr.should_receive("set_build_finished_time").once()
-    koji_build_pr.should_receive("set_status").with_args("success").once()
-    koji_build_pr.should_receive("set_build_logs_url")
-    koji_build_pr.should_receive("set_web_url")
+    koji_build_pr.should_receive("update_state").with_args(
+        unless_status=["success", "failed", "error"],
+        build_start_time=datetime,
+        build_finished_time=datetime,
+        status="success",
+        build_logs_url=str,
+        web_url=str,
+    ).and_return(True).once()
 
     # check if packit-service set correct PR status
     flexmock(StatusReporter).should_receive("report").with_args(
@@ -861,3 +1003,30 @@ def test_koji_build_end(koji_build_scratch_end, pc_koji_build_pr, koji_build_pr)
     )
 
     assert first_dict_value(results["job"])["success"]
+
+
+def test_koji_build_end_already_finished(
+    koji_build_scratch_end, pc_koji_build_pr, koji_build_pr
+):
+    koji_build_pr.target = "rawhide"
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(KojiBuildEvent).should_receive("get_package_config").and_return(
+        pc_koji_build_pr
+    )
+    flexmock(KojiBuildModel).should_receive("get_by_build_id").and_return(koji_build_pr)
+    flexmock(requests).should_receive("get").and_return(requests.Response())
+    flexmock(requests.Response).should_receive("raise_for_status").and_return(None)
+
+    # e.g. a duplicate message
+    koji_build_pr.should_receive("update_state").and_return(False).once()
+    flexmock(StatusReporter).should_receive("report").never()
+    flexmock(Signature).should_receive("apply_async").once()
+
+    processing_results = SteveJobs().process_message(koji_build_scratch_end)
+    event_dict, package_config, job = get_parameters_from_results(processing_results)
+
+    results = run_koji_build_report_handler(
+        package_config=package_config, event=event_dict, job_config=job,
+    )
+
+    assert first_dict_value(results["job"])["success"]
@@ -22,20 +22,25 @@
 
 import json
 
+import git
 import pytest
 from celery.canvas import Signature
 from flexmock import flexmock
 from github import Github
 from ogr.services.github import GithubProject
 from packit.config import JobConfigTriggerType
+from packit.api import PackitAPI
+from packit.copr_helper import CoprHelper
 from packit.local_project import LocalProject
 
-from packit_service.config import ServiceConfig
+from packit_service.config import PackageConfigGetter, ServiceConfig
 from packit_service.constants import SANDCASTLE_WORK_DIR
-from packit_service.models import PullRequestModel
+from packit_service.models import CoprBuildModel, PullRequestModel, SRPMBuildModel
 from packit_service.service.db_triggers import AddPullRequestDbTrigger
 from packit_service.worker.build.copr_build import CoprBuildJobHelper
+from packit_service.worker.git_mirror import git_mirror_cache
 from packit_service.worker.jobs import SteveJobs
+from packit_service.worker.reporting import StatusReporter
 from packit_service.worker.result import TaskResults
 from packit_service.worker.whitelist import Whitelist
 from packit_service.worker.tasks import run_pr_comment_copr_build_handler
@@ -211,6 +216,131 @@ def test_pr_comment_build_handler(
     assert first_dict_value(results["job"])["success"]
 
 
+def test_pr_comment_package_config_cached(
+    caching, mock_pr_comment_functionality, pr_copr_build_comment_event
+):
+    # loaded from the repository only for the first comment on the commit
+    flexmock(PackageConfigGetter).should_call("get_package_config_from_repo").once()
+    flexmock(GithubProject).should_receive("can_merge_pr").and_return(True)
+    flexmock(GithubProject, get_files="foo.spec")
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(Signature).should_receive("apply_async").twice()
+
+    first_results = SteveJobs().process_message(pr_copr_build_comment_event)
+    second_results = SteveJobs().process_message(pr_copr_build_comment_event)
+
+    assert get_parameters_from_results(first_results)[1:] == (
+        get_parameters_from_results(second_results)[1:]
+    )
+
+
+def test_pr_comment_copr_build_srpm_cached(
+    caching, tmp_path, mock_pr_comment_functionality, pr_copr_build_comment_event
+):
+    flexmock(GithubProject).should_receive("can_merge_pr").and_return(True)
+    flexmock(GithubProject, get_files="foo.spec")
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(Signature).should_receive("apply_async").twice()
+    flexmock(StatusReporter).should_receive("set_status")
+    # the repository is not needed, the SRPM is mocked
+    flexmock(git_mirror_cache).should_receive("clone_project")
+
+    # the SRPM is built for the first comment only
+    srpm_path = tmp_path / "hello-world-0.1-1.src.rpm"
+    srpm_path.write_text("srpm")
+    flexmock(PackitAPI).should_receive("create_srpm").and_return(str(srpm_path)).once()
+    srpm_build = SRPMBuildModel(id=7, success=True)
+    flexmock(SRPMBuildModel).should_receive("create").and_return(srpm_build).once()
+    flexmock(SRPMBuildModel).should_receive("get_by_id").with_args(7).and_return(
+        srpm_build
+    )
+    flexmock(CoprBuildModel).should_receive("get_or_create").and_return(
+        CoprBuildModel(id=1)
+    )
+    flexmock(CoprHelper).should_receive("create_copr_project_if_not_exists")
+    flexmock(CoprHelper).should_receive("get_copr_client").and_return(
+        flexmock(
+            config={
+                "copr_url": "https://copr.fedorainfracloud.org/",
+                "username": "packit",
+            },
+            build_proxy=flexmock(
+                create_from_file=lambda **kwargs: flexmock(
+                    id=2, projectname="the-project-name", ownername="the-owner"
+                )
+            ),
+        )
+    )
+
+    for _ in range(2):
+        processing_results = SteveJobs().process_message(pr_copr_build_comment_event)
+        event_dict, package_config, job = get_parameters_from_results(
+            processing_results
+        )
+        results = run_pr_comment_copr_build_handler(
+            package_config=package_config, event=event_dict, job_config=job,
+        )
+        assert first_dict_value(results["job"])["success"]
+
+
+def test_pr_comment_copr_build_git_mirror(
+    caching, tmp_path, mock_pr_comment_functionality, pr_copr_build_comment_event
+):
+    upstream = git.Repo.init(tmp_path / "upstream")
+    (tmp_path / "upstream" / "README").write_text("hello")
+    upstream.index.add(["README"])
+    upstream.index.commit("initial commit")
+    flexmock(GithubProject).should_receive("get_git_urls").and_return(
+        {"git": upstream.working_dir}
+    )
+    working_dir = tmp_path / "work"
+    ServiceConfig.get_service_config().command_handler_work_dir = str(working_dir)
+
+    flexmock(GithubProject).should_receive("can_merge_pr").and_return(True)
+    flexmock(GithubProject, get_files="foo.spec")
+    flexmock(GithubProject).should_receive("is_private").and_return(False)
+    flexmock(Signature).should_receive("apply_async").once()
+    flexmock(StatusReporter).should_receive("set_status")
+
+    def create_srpm(srpm_dir):
+        # cloned from the mirror (LocalProject doesn't clone in the tests)
+        assert (working_dir / "README").read_text() == "hello"
+        srpm_path = tmp_path / "hello-world-0.1-1.src.rpm"
+        srpm_path.write_text("srpm")
+        return str(srpm_path)
+
+    flexmock(PackitAPI).should_receive("create_srpm").replace_with(create_srpm).once()
+    flexmock(SRPMBuildModel).should_receive("create").and_return(
+        SRPMBuildModel(id=7, success=True)
+    )
+    flexmock(CoprBuildModel).should_receive("get_or_create").and_return(
+        CoprBuildModel(id=1)
+    )
+    flexmock(CoprHelper).should_receive("create_copr_project_if_not_exists")
+    flexmock(CoprHelper).should_receive("get_copr_client").and_return(
+        flexmock(
+            config={
+                "copr_url": "https://copr.fedorainfracloud.org/",
+                "username": "packit",
+            },
+            build_proxy=flexmock(
+                create_from_file=lambda **kwargs: flexmock(
+                    id=2, projectname="the-project-name", ownername="the-owner"
+                )
+            ),
+        )
+    )
+
+    processing_results = SteveJobs().process_message(pr_copr_build_comment_event)
+    event_dict, package_config, job = get_parameters_from_results(processing_results)
+    results = run_pr_comment_copr_build_handler(
+        package_config=package_config, event=event_dict, job_config=job,
+    )
+
+    assert first_dict_value(results["job"])["success"]
+    assert git_mirror_cache.get_mirror_path(upstream.working_dir).is_dir()
+
+
 @pytest.mark.parametrize(
     "comment",
     (
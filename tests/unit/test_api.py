@@ -1,5 +1,12 @@
 from packit_service.service.api.copr_builds import optional_time
+from packit_service.service.api.parsers import (
+    composite_cursor,
+    format_cursor,
+    submitted_time,
+)
+from packit_service.service.app import packit_as_a_service as application
 from datetime import datetime
+import time
 import pytest
 
 
@@ -10,3 +17,50 @@ def test_optional_time(input_object, expected_type):
     # optional_time returns a string if its passed a datetime object
     # None if passed a NoneType object
     assert isinstance(optional_time(input_object), expected_type)
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("", (None, None)),
+        ("?submitted_after=2020-07-01T02:00:00%2B02:00", (datetime(2020, 7, 1), None),),
+        (
+            "?submitted_after=2020-06-01T00:00:00&submitted_before=2020-07-01T00:00:00",
+            (datetime(2020, 6, 1), datetime(2020, 7, 1)),
+        ),
+    ],
+)
+def test_submitted_time(query, expected):
+    with application.test_request_context(f"/api/copr-builds{query}"):
+        assert submitted_time() == expected
+
+
+def test_submitted_time_naive_is_utc(monkeypatch):
+    # not the local time of the server
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        with application.test_request_context(
+            "/api/copr-builds?submitted_after=2020-07-01T00:00:00"
+        ):
+            assert submitted_time()[0] == datetime(2020, 7, 1)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        (datetime(2020, 7, 1, 10, 11, 12, 13), "6d2b4a4e-6e7c-4d1e-9d0c-5c9c2c3a2b1f"),
+        (datetime(2020, 7, 1), "task,with,commas"),
+    ],
+)
+def test_composite_cursor(values):
+    cursor_type = composite_cursor(datetime.fromisoformat, str)
+    assert cursor_type(format_cursor(*values)) == values
+
+
+def test_composite_cursor_invalid():
+    with pytest.raises(ValueError):
+        composite_cursor(int, str)("not-an-id")
@@ -0,0 +1,109 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import pytest
+from flexmock import flexmock
+from redis.exceptions import ConnectionError
+
+from packit_service import cache
+from packit_service.cache import MISSING, SharedTTLCache
+
+pytestmark = pytest.mark.usefixtures("caching")
+
+
+def test_shared_cache_from_redis():
+    redis = flexmock()
+    redis.should_receive("get").with_args("packit-service:test:key").and_return(
+        b'{"a": 1}'
+    ).once()
+    flexmock(cache).should_receive("get_redis").and_return(redis)
+
+    shared_cache = SharedTTLCache("test", max_size=10, ttl=60)
+    assert shared_cache.get("key") == {"a": 1}
+    # second time from the process
+    assert shared_cache.get("key") == {"a": 1}
+
+
+def test_shared_cache_none_value():
+    redis = flexmock()
+    redis.should_receive("set").with_args(
+        "packit-service:test:key", "null", ex=60
+    ).once()
+    flexmock(cache).should_receive("get_redis").and_return(redis)
+
+    shared_cache = SharedTTLCache("test", max_size=10, ttl=60)
+    shared_cache.set("key", None)
+    assert shared_cache.get("key", MISSING) is None
+
+
+def test_shared_cache_miss():
+    redis = flexmock()
+    redis.should_receive("get").and_return(None).once()
+    flexmock(cache).should_receive("get_redis").and_return(redis)
+
+    assert SharedTTLCache("test", max_size=10, ttl=60).get("key", MISSING) is MISSING
+
+
+def test_shared_cache_redis_unavailable():
+    redis = flexmock()
+    redis.should_receive("set").and_raise(ConnectionError).once()
+    redis.should_receive("get").and_raise(ConnectionError).once()
+    flexmock(cache).should_receive("get_redis").and_return(redis)
+
+    shared_cache = SharedTTLCache("test", max_size=10, ttl=60)
+    shared_cache.set("key", "value")
+    assert shared_cache.get("key") == "value"
+    shared_cache.clear_local()
+    assert shared_cache.get("key") is None
+
+
+def test_shared_cache_delete():
+    redis = flexmock()
+    redis.should_receive("set")
+    redis.should_receive("delete").with_args("packit-service:test:key").once()
+    redis.should_receive("get").and_return(None)
+    flexmock(cache).should_receive("get_redis").and_return(redis)
+
+    shared_cache = SharedTTLCache("test", max_size=10, ttl=60)
+    shared_cache.set("key", "value")
+    shared_cache.delete("key")
+    assert shared_cache.get("key", MISSING) is MISSING
+
+
+def test_shared_cache_local_ttl():
+    redis = flexmock()
+    redis.should_receive("set").with_args(
+        "packit-service:test:key", '"value"', ex=60
+    ).once()
+    flexmock(cache).should_receive("get_redis").and_return(redis)
+
+    shared_cache = SharedTTLCache("test", max_size=10, ttl=60, local_ttl=5)
+    shared_cache.set("key", "value")
+    assert shared_cache._local.ttl == 5
+
+
+def test_shared_cache_disabled(monkeypatch):
+    monkeypatch.setenv("CACHES", "disabled")
+    flexmock(cache).should_receive("get_redis").never()
+
+    shared_cache = SharedTTLCache("test", max_size=10, ttl=60)
+    shared_cache.set("key", "value")
+    assert shared_cache.get("key", MISSING) is MISSING
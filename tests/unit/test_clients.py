@@ -0,0 +1,68 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from flexmock import flexmock
+
+from packit_service.worker import clients
+from packit_service.worker.clients import ClientRegistry, CountingHTTPSConnectionPool
+
+
+def test_get_client_is_reused():
+    registry = ClientRegistry()
+    client = registry.get_client(("fas", "packit"), object)
+    assert registry.get_client(("fas", "packit"), object) is client
+    assert registry.get_client(("fas", "someone"), object) is not client
+
+
+def test_idle_clients_are_evicted():
+    registry = ClientRegistry(idle_timeout=60)
+    now = 1000
+    flexmock(clients).should_receive("monotonic").replace_with(lambda: now)
+    client = flexmock()
+    client.should_receive("close").once()
+    assert registry.get_client("client", lambda: client) is client
+
+    now += 61
+    assert registry.get_client("client", object) is not client
+
+
+def test_reset():
+    registry = ClientRegistry()
+    client = flexmock()
+    # the connections belong to the parent process
+    client.should_receive("close").never()
+    registry.get_client("client", lambda: client)
+
+    registry.reset()
+    assert registry.get_client("client", object) is not client
+
+
+def test_get_session():
+    registry = ClientRegistry(pool_size=8)
+    session = registry.get_session("https://api.dev.testing-farm.io/v0.1/requests")
+    assert session is registry.get_session("https://api.dev.testing-farm.io/v0.1/test")
+    assert session is not registry.get_session("https://copr.fedorainfracloud.org/")
+
+    adapter = session.get_adapter("https://api.dev.testing-farm.io/")
+    assert adapter._pool_maxsize == 8
+    pool = adapter.poolmanager.connection_from_url("https://api.dev.testing-farm.io/")
+    assert isinstance(pool, CountingHTTPSConnectionPool)
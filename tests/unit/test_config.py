@@ -26,10 +26,22 @@ from flexmock import flexmock
 from marshmallow import ValidationError
 
 from ogr.abstract import GitProject, GitService
-from packit.config import PackageConfig, SyncFilesConfig
+from packit.config import (
+    JobConfig,
+    JobConfigTriggerType,
+    JobType,
+    PackageConfig,
+    SyncFilesConfig,
+)
+from packit.config.job_config import JobMetadataConfig
 from packit.exceptions import PackitConfigException
 from packit.sync import SyncFilesItem
-from packit_service.config import ServiceConfig, Deployment, PackageConfigGetter
+from packit_service.config import (
+    ServiceConfig,
+    Deployment,
+    PackageConfigGetter,
+)
+from packit_service.utils import dump_package_config, load_package_config
 
 
 @pytest.fixture(scope="module")
@@ -63,6 +75,7 @@ def service_config_valid():
         "admins": ["Dasher", "Dancer", "Vixen", "Comet", "Blitzen"],
         "server_name": "hub.packit.org",
         "gitlab_webhook_tokens": ["token1", "token2", "token3", "aged"],
+        "task_results_retention_days": 7,
     }
 
 
@@ -83,6 +96,7 @@ def test_parse_valid(service_config_valid):
     assert config.admins == {"Dasher", "Dancer", "Vixen", "Comet", "Blitzen"}
     assert config.server_name == "hub.packit.org"
     assert config.gitlab_webhook_tokens == {"token1", "token2", "token3", "aged"}
+    assert config.task_results_retention_days == 7
 
 
 @pytest.fixture(scope="module")
@@ -307,3 +321,51 @@ def test_get_package_config_from_repo_not_found_exception_nonexisting_issue():
             project=GitProject(repo="", service=GitService(), namespace=""),
             reference=None,
         )
+
+
+def test_package_config_cache(caching):
+    package_config = PackageConfig(
+        specfile_path="packit.spec",
+        downstream_package_name="packit",
+        jobs=[
+            JobConfig(
+                type=JobType.copr_build,
+                trigger=JobConfigTriggerType.pull_request,
+                metadata=JobMetadataConfig(targets=["fedora-all"]),
+            )
+        ],
+    )
+    project_url = "https://github.com/packit-service/packit"
+
+    assert PackageConfigGetter.get_cached_package_config(
+        project_url=project_url, commit_sha="abcdef"
+    ) == (False, None)
+
+    PackageConfigGetter.cache_package_config(
+        project_url=project_url, commit_sha="abcdef", package_config=package_config
+    )
+    is_cached, cached_config = PackageConfigGetter.get_cached_package_config(
+        project_url=project_url, commit_sha="abcdef"
+    )
+    assert is_cached
+    # the same as when the config is passed to the Celery tasks
+    assert cached_config == load_package_config(dump_package_config(package_config))
+
+    # other commit, other spec file path
+    assert PackageConfigGetter.get_cached_package_config(
+        project_url=project_url, commit_sha="123456"
+    ) == (False, None)
+    assert PackageConfigGetter.get_cached_package_config(
+        project_url=project_url, commit_sha="abcdef", spec_file_path="SPECS/packit.spec"
+    ) == (False, None)
+
+
+def test_package_config_cache_missing_config(caching):
+    PackageConfigGetter.cache_package_config(
+        project_url="https://github.com/packit-service/packit",
+        commit_sha="abcdef",
+        package_config=None,
+    )
+    assert PackageConfigGetter.get_cached_package_config(
+        project_url="https://github.com/packit-service/packit", commit_sha="abcdef"
+    ) == (True, None)
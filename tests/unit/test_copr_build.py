@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import json
+from pathlib import Path
 
 import pytest
 from celery import Celery
@@ -48,6 +49,7 @@ from packit_service.service.events import (
 )
 from packit_service.worker.build import copr_build
 from packit_service.worker.build.copr_build import CoprBuildJobHelper
+from packit_service.worker.build.srpm_cache import srpm_cache
 from packit_service.worker.parser import Parser
 from packit_service.worker.reporting import StatusReporter
 from tests.spellbook import DATA_DIR
@@ -102,6 +104,7 @@ def build_helper(
             pr_id=event.pr_id,
             git_ref=event.git_ref,
             commit_sha=event.commit_sha,
+            project_url=event.project_url,
             identifier=event.identifier,
         ),
         db_trigger=db_trigger,
@@ -174,10 +177,60 @@ def test_copr_build_check_names(github_pr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
+def test_copr_build_cached_srpm(caching, github_pr_event):
+    trigger = flexmock(job_config_trigger_type=JobConfigTriggerType.release, id=123)
+    flexmock(AddPullRequestDbTrigger).should_receive("db_trigger").and_return(trigger)
+    helper = build_helper(
+        event=github_pr_event,
+        metadata=JobMetadataConfig(targets=["bright-future-x86_64"], owner="nobody"),
+        db_trigger=trigger,
+    )
+
+    flexmock(copr_build).should_receive(
+        "get_copr_build_info_url_from_flask"
+    ).and_return("https://test.url")
+    flexmock(StatusReporter).should_receive("set_status").and_return()
+    flexmock(srpm_cache).should_receive("get").with_args(
+        helper.srpm_cache_key
+    ).and_return((Path("/cache/my.src.rpm"), 7))
+    flexmock(SRPMBuildModel).should_receive("get_by_id").with_args(7).and_return(
+        SRPMBuildModel(id=7, success=True)
+    )
+    # no new SRPM
+    flexmock(PackitAPI).should_receive("create_srpm").never()
+    flexmock(SRPMBuildModel).should_receive("create").never()
+    flexmock(srpm_cache).should_receive("put").never()
+    flexmock(CoprBuildModel).should_receive("get_or_create").and_return(
+        CoprBuildModel(id=1)
+    )
+
+    flexmock(CoprHelper).should_receive("create_copr_project_if_not_exists")
+    flexmock(CoprHelper).should_receive("get_copr_client").and_return(
+        flexmock(
+            config={"copr_url": "https://copr.fedorainfracloud.org/"},
+            build_proxy=flexmock()
+            .should_receive("create_from_file")
+            .with_args(
+                ownername="nobody",
+                projectname="the-example-namespace-the-example-repo-342-stg",
+                path=Path("/cache/my.src.rpm"),
+            )
+            .and_return(
+                flexmock(id=2, projectname="the-project-name", ownername="the-owner")
+            )
+            .once()
+            .mock(),
+        )
+    )
+
+    assert helper.run_copr_build()["success"]
+    assert helper.srpm_model.id == 7
+
+
 def test_copr_build_success_set_test_check(github_pr_event):
     # status is set for each build-target (4x):
     #  - Building SRPM ...
@@ -220,7 +273,7 @@ def test_copr_build_success_set_test_check(github_pr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -274,7 +327,7 @@ def test_copr_build_for_branch(branch_push_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -331,7 +384,7 @@ def test_copr_build_for_release(release_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -368,7 +421,7 @@ def test_copr_build_success(github_pr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -452,7 +505,7 @@ def test_copr_build_no_targets(github_pr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -519,7 +572,7 @@ def test_copr_build_check_names_gitlab(gitlab_mr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
 
     assert helper.run_copr_build()["success"]
 
@@ -566,7 +619,7 @@ def test_copr_build_success_set_test_check_gitlab(gitlab_mr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -620,7 +673,7 @@ def test_copr_build_for_branch_gitlab(branch_push_event_gitlab):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -659,7 +712,7 @@ def test_copr_build_success_gitlab(gitlab_mr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
 
 
@@ -745,5 +798,5 @@ def test_copr_build_no_targets_gitlab(gitlab_mr_event):
         )
     )
 
-    flexmock(Celery).should_receive("send_task").once()
+    flexmock(Celery).should_receive("send_task").never()
     assert helper.run_copr_build()["success"]
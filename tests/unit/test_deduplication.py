@@ -0,0 +1,99 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from flexmock import flexmock
+from redis.exceptions import ConnectionError
+
+from packit_service.cache import TTLCache
+from packit_service.service import deduplication
+from packit_service.service.deduplication import DeliveryDeduplicator
+
+
+def test_ttl_cache_expiration():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=-1)
+    assert cache.get("a") == 1
+    assert "b" not in cache
+    assert cache.get("b", "default") == "default"
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_is_duplicate_in_process():
+    redis = flexmock()
+    redis.should_receive("set").with_args(
+        "packit-service:webhook-delivery:github:123", 1, nx=True, ex=60
+    ).and_return(True).once()
+    flexmock(deduplication).should_receive("get_redis").and_return(redis)
+
+    deduplicator = DeliveryDeduplicator(max_size=10, ttl=60)
+    assert not deduplicator.is_duplicate("github:123")
+    assert deduplicator.is_duplicate("github:123")
+
+
+def test_is_duplicate_other_process():
+    redis = flexmock()
+    redis.should_receive("set").and_return(None).once()
+    flexmock(deduplication).should_receive("get_redis").and_return(redis)
+
+    assert DeliveryDeduplicator(max_size=10, ttl=60).is_duplicate("github:123")
+
+
+def test_is_duplicate_redis_unavailable():
+    redis = flexmock()
+    redis.should_receive("set").and_raise(ConnectionError).once()
+    flexmock(deduplication).should_receive("get_redis").and_return(redis)
+
+    deduplicator = DeliveryDeduplicator(max_size=10, ttl=60)
+    assert not deduplicator.is_duplicate("gitlab:abc")
+    assert deduplicator.is_duplicate("gitlab:abc")
+
+
+def test_content_key():
+    key = DeliveryDeduplicator.content_key("gitlab", b"{}")
+    assert key == DeliveryDeduplicator.content_key("gitlab", b"{}")
+    assert key != DeliveryDeduplicator.content_key("gitlab", b"[]")
+    assert key != DeliveryDeduplicator.content_key("testing-farm", b"{}")
+
+
+def test_forget():
+    redis = flexmock()
+    redis.should_receive("set").and_return(True).twice()
+    redis.should_receive("delete").with_args(
+        "packit-service:webhook-delivery:github:123"
+    ).once()
+    flexmock(deduplication).should_receive("get_redis").and_return(redis)
+
+    deduplicator = DeliveryDeduplicator(max_size=10, ttl=60)
+    assert not deduplicator.is_duplicate("github:123")
+    deduplicator.forget("github:123")
+    assert not deduplicator.is_duplicate("github:123")
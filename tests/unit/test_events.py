@@ -38,7 +38,7 @@ from packit_service.config import (
     ServiceConfig,
     PackageConfigGetter,
 )
-from packit_service.constants import KojiBuildState
+from packit_service.constants import KojiBuildState, TESTING_FARM_RESULTS_EVENT_TYPE
 from packit_service.models import (
     CoprBuildModel,
     TFTTestRunModel,
@@ -73,7 +73,7 @@ from packit_service.service.events import (
     MergeRequestCommentGitlabEvent,
     PushGitlabEvent,
 )
-from packit_service.worker.parser import Parser, CentosEventParser
+from packit_service.worker.parser import Parser, CentosEventParser, ALL_PARSERS
 from tests.conftest import copr_build_model
 from tests.spellbook import DATA_DIR
 
@@ -325,6 +325,22 @@ class TestEvents:
         ).once()
         assert event_object.package_config
 
+    def test_pr_db_trigger_is_memoized(self, github_pr_webhook):
+        event_object = Parser.parse_event(github_pr_webhook)
+
+        db_trigger = flexmock(id=1, project=flexmock(project_url="https://..."))
+        flexmock(PullRequestModel).should_receive("get_or_create").with_args(
+            pr_id=342,
+            namespace="packit-service",
+            repo_name="packit",
+            project_url="https://github.com/packit-service/packit",
+        ).and_return(db_trigger).once()
+
+        assert event_object.db_trigger is db_trigger
+        assert event_object.get_dict()["trigger_id"] == 1
+        assert "_db_trigger" not in event_object.get_dict()
+        assert event_object.db_trigger is db_trigger
+
     def test_parse_pr_comment_created(self, github_pr_comment_created):
         event_object = Parser.parse_event(github_pr_comment_created)
 
@@ -966,6 +982,58 @@ class TestEvents:
         assert json.dumps(event_object.tests)
         assert json.dumps(event_object.result)
 
+    @pytest.mark.parametrize(
+        "path,event_type,parsers",
+        [
+            (("github", "pr.json"), "pull_request", [Parser.parse_pr_event],),
+            (
+                ("github", "pr_comment_copr_build.json"),
+                "issue_comment",
+                [
+                    Parser.parse_pull_request_comment_event,
+                    Parser.parse_issue_comment_event,
+                ],
+            ),
+            (
+                ("gitlab", "mr_event.json"),
+                "Merge Request Hook",
+                [Parser.parse_mr_event],
+            ),
+            # Gitlab object_kind is used when we don't have the header
+            (
+                ("gitlab", "push_with_one_commit.json"),
+                None,
+                [Parser.parse_gitlab_push_event],
+            ),
+            (
+                ("testing_farm", "results.json"),
+                TESTING_FARM_RESULTS_EVENT_TYPE,
+                [Parser.parse_testing_farm_results_event],
+            ),
+            # we don't know this header, let's try everything
+            (("github", "release.json"), "unknown", ALL_PARSERS),
+            (("github", "release.json"), None, ALL_PARSERS),
+        ],
+    )
+    def test_get_parsers(self, path, event_type, parsers):
+        with open(DATA_DIR / "webhooks" / path[0] / path[1]) as outfile:
+            event = json.load(outfile)
+
+        assert Parser.get_parsers(event, event_type) == parsers
+
+    def test_get_parsers_fedmsg_topic(self, distgit_commit, koji_build_scratch_end):
+        assert Parser.get_parsers(distgit_commit) == [Parser.parse_distgit_event]
+        assert Parser.get_parsers(koji_build_scratch_end) == [Parser.parse_koji_event]
+
+    def test_parse_event_with_event_type(self, github_push):
+        event_object = Parser.parse_event(github_push, event_type="push")
+
+        assert isinstance(event_object, PushGitHubEvent)
+        assert event_object.commit_sha == "0000000000000000000000000000000000000000"
+
+    def test_parse_event_with_wrong_event_type(self, github_push):
+        assert not Parser.parse_event(github_push, event_type="release")
+
 
 class TestCentOSEventParser:
     @classmethod
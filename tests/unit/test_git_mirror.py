@@ -0,0 +1,110 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+import git
+import pytest
+
+from packit_service.worker.git_mirror import GitMirrorCache
+
+
+@pytest.fixture()
+def upstream(tmp_path):
+    repo = git.Repo.init(tmp_path / "upstream")
+    repo.git.checkout("-b", "main")
+    (tmp_path / "upstream" / "README").write_text("hello")
+    repo.index.add(["README"])
+    repo.index.commit("initial commit")
+    return repo
+
+
+def commit(repo: git.Repo, content: str) -> str:
+    readme = os.path.join(repo.working_dir, "README")
+    with open(readme, "w") as f:
+        f.write(content)
+    repo.index.add(["README"])
+    return repo.index.commit(content).hexsha
+
+
+def test_get_mirror_path():
+    cache = GitMirrorCache(directory="/mirrors")
+    path = cache.get_mirror_path("https://github.com/packit/ogr.git")
+    assert path.parent.as_posix() == "/mirrors"
+    assert path.name.startswith("packit-ogr-")
+    assert path.name.endswith(".git")
+    assert path != cache.get_mirror_path("https://gitlab.com/packit/ogr.git")
+
+
+def test_clone_from_mirror(tmp_path, upstream):
+    url = upstream.working_dir
+    cache = GitMirrorCache(directory=str(tmp_path / "mirrors"), max_size=10 ** 9)
+
+    repo = cache.clone(url, str(tmp_path / "first"))
+    assert repo.remotes.origin.url == url
+    assert repo.active_branch.name == "main"
+    assert repo.head.commit.hexsha == upstream.head.commit.hexsha
+
+    # the mirror is updated before the next clone
+    new_commit = commit(upstream, "new content")
+    repo = cache.clone(url, str(tmp_path / "second"))
+    assert repo.head.commit.hexsha == new_commit
+    assert len(list((tmp_path / "mirrors").glob("*.git"))) == 1
+
+
+def test_clone_to_non_empty_dir(tmp_path, upstream):
+    working_dir = tmp_path / "working_dir"
+    working_dir.mkdir()
+    (working_dir / "file").write_text("something")
+    cache = GitMirrorCache(directory=str(tmp_path / "mirrors"))
+
+    assert cache.clone(upstream.working_dir, str(working_dir)) is None
+
+
+def test_clone_failure_cleans_working_dir(tmp_path):
+    cache = GitMirrorCache(directory=str(tmp_path / "mirrors"))
+    working_dir = tmp_path / "working_dir"
+    working_dir.mkdir()
+
+    assert cache.clone(str(tmp_path / "does-not-exist"), str(working_dir)) is None
+    assert not list(working_dir.iterdir())
+
+
+def test_evict_least_recently_used(tmp_path, upstream):
+    cache = GitMirrorCache(directory=str(tmp_path / "mirrors"), max_size=10 ** 9)
+    cache.clone(upstream.working_dir, str(tmp_path / "first"))
+    other = git.Repo.clone_from(upstream.working_dir, tmp_path / "other")
+    cache.clone(other.working_dir, str(tmp_path / "second"))
+
+    first_mirror = cache.get_mirror_path(upstream.working_dir)
+    second_mirror = cache.get_mirror_path(other.working_dir)
+    os.utime(first_mirror, (0, 0))
+    # room for one mirror only
+    cache.max_size = sum(
+        f.stat().st_size for f in second_mirror.rglob("*") if f.is_file()
+    )
+    cache.evict()
+
+    assert not first_mirror.exists()
+    assert second_mirror.exists()
+    # the working directories don't need the mirror
+    assert git.Repo(tmp_path / "first").head.commit.hexsha
@@ -43,6 +43,7 @@ from packit_service.worker.handlers.github_handlers import (
     GitHubIssueCommentProposeUpdateHandler,
 )
 from packit_service.worker.jobs import (
+    JobPlan,
     get_handlers_for_event,
     get_config_for_handler_kls,
 )
@@ -922,3 +923,29 @@ def test_get_config_for_handler_kls(handler_kls, event, jobs, result_job_config)
         handler_kls=handler_kls, event=event, package_config=flexmock(jobs=jobs),
     )
     assert job_config == result_job_config
+
+
+def test_job_plan_many_jobs():
+    jobs = [
+        JobConfig(
+            type=job_type,
+            trigger=trigger,
+            metadata=JobMetadataConfig(targets=[f"fedora-{i}-x86_64"]),
+        )
+        for i in range(20)
+        for job_type, trigger in (
+            (JobType.copr_build, JobConfigTriggerType.pull_request),
+            (JobType.tests, JobConfigTriggerType.pull_request),
+            (JobType.production_build, JobConfigTriggerType.commit),
+            (JobType.propose_downstream, JobConfigTriggerType.release),
+        )
+    ]
+    event = flexmock(trigger=TheJobTriggerType.pull_request, db_trigger=None)
+
+    plan = JobPlan(event, flexmock(jobs=jobs))
+
+    assert plan.handlers == {PullRequestCoprBuildHandler}
+    assert plan.get_job_configs(PullRequestCoprBuildHandler) == [
+        job for job in jobs if job.type == JobType.copr_build
+    ]
+    assert plan.get_job_configs(PullRequestGithubKojiBuildHandler) == []
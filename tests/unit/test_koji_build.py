@@ -99,6 +99,7 @@ def build_helper(
             pr_id=event.pr_id,
             git_ref=event.git_ref,
             commit_sha=event.commit_sha,
+            project_url=event.project_url,
             identifier=event.identifier,
         ),
         db_trigger=db_trigger,
@@ -0,0 +1,127 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+from flexmock import flexmock
+from packit.exceptions import PackitException
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+from packit_service import models
+from packit_service.config import ServiceConfig
+from packit_service.constants import DB_POOL_SIZE
+
+
+@pytest.fixture()
+def no_engine():
+    engines = models._engines.copy()
+    models._engines.clear()
+    yield
+    models._engines.clear()
+    models._engines.update(engines)
+
+
+def test_get_engine_options():
+    flexmock(ServiceConfig).should_receive("get_service_config").and_return(
+        ServiceConfig(db_pool_size=20, db_max_overflow=0)
+    )
+    assert models.get_engine_options() == {
+        "pool_size": 20,
+        "max_overflow": 0,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
+
+
+def test_get_engine_options_null_pool():
+    flexmock(ServiceConfig).should_receive("get_service_config").and_return(
+        ServiceConfig(db_use_null_pool=True)
+    )
+    assert models.get_engine_options() == {"poolclass": NullPool}
+
+
+def test_get_engine_options_without_config():
+    flexmock(ServiceConfig).should_receive("get_service_config").and_raise(
+        PackitException
+    )
+    assert models.get_engine_options()["pool_size"] == DB_POOL_SIZE
+
+
+def test_engine_is_lazy(no_engine):
+    flexmock(ServiceConfig).should_receive("get_service_config").and_return(
+        ServiceConfig()
+    )
+    engine = flexmock()
+    flexmock(models).should_receive("create_engine").and_return(engine).once()
+
+    # no engine, nothing to dispose
+    models.dispose_engine()
+    assert models.get_engine() is engine
+    assert models.get_engine() is engine
+
+    engine.should_receive("dispose").once()
+    models.dispose_engine()
+
+
+@pytest.fixture()
+def replica(no_engine, monkeypatch):
+    monkeypatch.setenv("POSTGRES_REPLICA_SERVICE_HOST", "replica")
+    monkeypatch.setattr(models, "_replica_state", (0.0, False))
+    flexmock(ServiceConfig).should_receive("get_service_config").and_return(
+        ServiceConfig(db_replica_max_lag=30)
+    )
+    yield
+    models.prefer_replica(False)
+
+
+def mock_replica_lag(lag):
+    connection = flexmock()
+    connection.should_receive("execute.scalar").and_return(lag)
+    connection.should_receive("__enter__").and_return(connection)
+    connection.should_receive("__exit__")
+    models._engines[models.get_pg_replica_url()] = flexmock(connect=lambda: connection)
+
+
+@pytest.mark.parametrize(
+    "prefer_replica,lag,replica_session",
+    [(False, 0, False), (True, 0, True), (True, 120, False)],
+)
+def test_get_sa_session_read_only(replica, prefer_replica, lag, replica_session):
+    mock_replica_lag(lag)
+    models.prefer_replica(prefer_replica)
+
+    with models.get_sa_session(read_only=True) as session:
+        assert isinstance(session, models.ReplicaSession) == replica_session
+    # writes always go to the primary
+    with models.get_sa_session() as session:
+        assert not isinstance(session, models.ReplicaSession)
+
+
+def test_replica_not_available(replica):
+    def connect():
+        raise OperationalError("SELECT 1", {}, None)
+
+    models._engines[models.get_pg_replica_url()] = flexmock(connect=connect)
+    assert not models.is_replica_usable()
+    # the result is cached
+    mock_replica_lag(0)
+    assert not models.is_replica_usable()
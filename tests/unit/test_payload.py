@@ -0,0 +1,100 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import json
+
+import pytest
+
+from packit_service.constants import TESTING_FARM_RESULTS_EVENT_TYPE
+from packit_service.service.payload import apply_projection, slim_payload
+from packit_service.worker.parser import Parser
+from tests.spellbook import DATA_DIR
+
+
+def parsed_attributes(event):
+    attributes = dict(event.__dict__)
+    # time of the parsing
+    attributes.pop("created_at")
+    return attributes
+
+
+@pytest.mark.parametrize(
+    "path,event_type",
+    [
+        ("github/installation_added.json", "installation_repositories"),
+        ("github/installation_created.json", "installation"),
+        ("github/issue_comment_packit_only.json", "issue_comment"),
+        ("github/issue_propose_update.json", "issue_comment"),
+        ("github/pr.json", "pull_request"),
+        ("github/pr_comment_copr_build.json", "issue_comment"),
+        ("github/pr_comment_empty.json", "issue_comment"),
+        ("github/push.json", "push"),
+        ("github/push_branch.json", "push"),
+        ("github/release.json", "release"),
+        ("copr_build/pr_synchronize.json", "pull_request"),
+        ("gitlab/issue_comment.json", "Note Hook"),
+        ("gitlab/mr_event.json", "Merge Request Hook"),
+        ("gitlab/mr_update_event.json", "Merge Request Hook"),
+        ("gitlab/push_branch.json", "Push Hook"),
+        ("gitlab/push_with_many_commits.json", "Push Hook"),
+    ],
+)
+def test_slim_payload_parses_the_same(path, event_type):
+    payload = json.loads((DATA_DIR / "webhooks" / path).read_text())
+    slim = slim_payload(payload, event_type)
+
+    assert len(json.dumps(slim)) < len(json.dumps(payload))
+
+    event = Parser.parse_event(payload, event_type=event_type)
+    slim_event = Parser.parse_event(slim, event_type=event_type)
+    assert isinstance(slim_event, type(event))
+    assert parsed_attributes(slim_event) == parsed_attributes(event)
+
+
+@pytest.mark.parametrize(
+    "event_type", [TESTING_FARM_RESULTS_EVENT_TYPE, "check_run", None]
+)
+def test_slim_payload_unknown_event_type(event_type):
+    payload = {"something": {"we": "don't know"}}
+    assert slim_payload(payload, event_type) is payload
+
+
+def test_apply_projection():
+    value = {
+        "ref": "refs/heads/master",
+        "commits": [{"id": "123", "message": "first"}, {"id": "456"}],
+        "pusher": None,
+        "repository": {"name": "packit", "owner": {"login": "packit", "id": 1}},
+        "sender": {"login": "lbarcziova"},
+    }
+    projection = {
+        "ref": True,
+        "size": True,
+        "commits": {"id": True},
+        "pusher": {"name": True},
+        "repository": {"name": True, "owner": {"login": True}},
+    }
+    assert apply_projection(value, projection) == {
+        "ref": "refs/heads/master",
+        "commits": [{"id": "123"}, {"id": "456"}],
+        "pusher": None,
+        "repository": {"name": "packit", "owner": {"login": "packit"}},
+    }
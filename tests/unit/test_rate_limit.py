@@ -0,0 +1,150 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from copy import deepcopy
+
+import pytest
+from flexmock import flexmock
+from ogr.services.github import GithubProject, GithubPullRequest, GithubService
+from redis.exceptions import ConnectionError
+
+from packit_service import rate_limit
+from packit_service.rate_limit import (
+    RateLimitExceeded,
+    RateLimitedProject,
+    TokenBucketRateLimiter,
+)
+
+
+pytestmark = pytest.mark.usefixtures("caching")
+
+
+def test_rate_limited_project_waits_before_calls():
+    project = GithubProject(
+        namespace="packit-service",
+        repo="hello-world",
+        service=GithubService(token="12345"),
+    )
+    limiter = TokenBucketRateLimiter()
+    flexmock(limiter).should_receive("wait").with_args(
+        "https://github.com/packit-service"
+    ).once()
+    flexmock(GithubProject).should_receive("get_pr").with_args(1).and_return(
+        "pr"
+    ).once()
+
+    rate_limited = RateLimitedProject(project, limiter)
+
+    assert isinstance(rate_limited, GithubProject)
+    assert rate_limited.namespace == "packit-service"
+    assert rate_limited.get_pr(1) == "pr"
+
+    copied = deepcopy(rate_limited)
+    assert isinstance(copied, RateLimitedProject)
+    assert copied == project
+
+
+@pytest.mark.parametrize(
+    "remaining,rate,delay",
+    [(b"59", 1, 0), (b"0", 1, 0), (b"-1", 1, 1), (b"-5", 2, 2.5)],
+)
+def test_take(remaining, rate, delay):
+    def script(keys, args):
+        assert keys == ["packit-service:rate-limit:bucket"]
+        # capacity, rate, tokens, max deficit
+        assert args == [60, rate, 1, 30 * rate]
+        return [1, remaining]
+
+    redis = flexmock(register_script=lambda source: script)
+    flexmock(rate_limit).should_receive("get_redis").and_return(redis)
+
+    limiter = TokenBucketRateLimiter(capacity=60, rate=rate, max_delay=30)
+    assert limiter.take("bucket") == delay
+
+
+def test_take_over_max_delay():
+    redis = flexmock(register_script=lambda source: lambda keys, args: [0, b"-30"])
+    flexmock(rate_limit).should_receive("get_redis").and_return(redis)
+
+    limiter = TokenBucketRateLimiter(capacity=60, rate=1, max_delay=30)
+    with pytest.raises(RateLimitExceeded) as ex:
+        limiter.take("bucket")
+    assert ex.value.delay == 31
+
+
+def test_wait_over_max_delay():
+    limiter = TokenBucketRateLimiter(max_delay=30)
+    flexmock(limiter).should_receive("take").and_raise(
+        RateLimitExceeded("bucket", 45)
+    ).twice()
+    flexmock(rate_limit).should_receive("sleep").with_args(30).once()
+
+    with pytest.raises(RateLimitExceeded):
+        limiter.wait("bucket")
+
+
+def test_wait_over_max_delay_once():
+    limiter = TokenBucketRateLimiter(max_delay=30)
+    flexmock(limiter).should_receive("take").and_raise(
+        RateLimitExceeded("bucket", 31)
+    ).and_return(0).twice()
+    flexmock(rate_limit).should_receive("sleep").with_args(30).once()
+
+    limiter.wait("bucket")
+
+
+def test_take_disabled(monkeypatch):
+    monkeypatch.setenv("CACHES", "disabled")
+    flexmock(rate_limit).should_receive("get_redis").never()
+    assert TokenBucketRateLimiter().take("bucket") == 0
+
+
+def test_returned_objects_are_rate_limited():
+    project = GithubProject(
+        namespace="packit-service",
+        repo="hello-world",
+        service=GithubService(token="12345"),
+    )
+    pr = GithubPullRequest(raw_pr=flexmock(), project=project)
+    limiter = TokenBucketRateLimiter()
+    flexmock(limiter).should_receive("wait").with_args(
+        "https://github.com/packit-service"
+    ).twice()
+    flexmock(GithubProject).should_receive("get_pr").and_return(pr).once()
+    flexmock(GithubPullRequest).should_receive("comment").with_args("hi").once()
+
+    rate_limited_pr = RateLimitedProject(project, limiter).get_pr(1)
+
+    assert isinstance(rate_limited_pr, GithubPullRequest)
+    rate_limited_pr.comment("hi")
+
+
+def test_take_without_redis():
+    flexmock(rate_limit).should_receive("get_redis").and_raise(ConnectionError)
+    assert TokenBucketRateLimiter().take("bucket") == 0
+
+
+def test_wait_sleeps_for_the_delay():
+    limiter = TokenBucketRateLimiter()
+    flexmock(limiter).should_receive("take").and_return(1.5)
+    flexmock(rate_limit).should_receive("sleep").with_args(1.5).once()
+    limiter.wait("bucket")
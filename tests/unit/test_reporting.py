@@ -24,7 +24,13 @@ import pytest
 from flexmock import flexmock
 
 from ogr.abstract import CommitStatus
-from packit_service.worker.reporting import StatusReporter
+from packit_service.worker.reporting import (
+    StatusReporter,
+    write_behind,
+)
+
+
+pytestmark = pytest.mark.usefixtures("caching")
 
 
 @pytest.mark.parametrize(
@@ -121,3 +127,104 @@ def test_set_status(
         )
 
     reporter.set_status(state, description, check_name, url)
+
+
+def test_report_fetches_pr_once():
+    project = flexmock()
+    reporter = StatusReporter(project, "7654321", 11)
+    project.should_receive("set_commit_status").times(3)
+    pr = flexmock(head_commit="7654321")
+    pr.should_receive("set_flag").times(3)
+    project.should_receive("get_pr").with_args(11).and_return(pr).once()
+
+    reporter.report(
+        CommitStatus.pending,
+        "Building SRPM ...",
+        check_names=["packit/rpm-build-a", "packit/rpm-build-b", "packit/tests"],
+    )
+
+
+def test_buffered_statuses_are_coalesced():
+    project = flexmock()
+    reporter = StatusReporter(project, "7654321")
+    project.should_receive("set_commit_status").with_args(
+        "7654321", CommitStatus.success, "", "Done", "packit/rpm-build", trim=True
+    ).once()
+
+    project.should_receive("set_commit_status").with_args(
+        "7654321",
+        CommitStatus.pending,
+        "",
+        "Building SRPM ...",
+        "packit/rpm-build",
+        trim=True,
+    ).once()
+
+    with reporter.buffered():
+        # the first one is sent right away
+        reporter.set_status(
+            CommitStatus.pending, "Building SRPM ...", "packit/rpm-build"
+        )
+        reporter.set_status(
+            CommitStatus.pending, "Building RPM ...", "packit/rpm-build"
+        )
+        reporter.set_status(CommitStatus.success, "Done", "packit/rpm-build")
+
+
+def test_write_behind():
+    sent = []
+    project = flexmock(
+        set_commit_status=lambda sha, state, url, description, check, trim: sent.append(
+            check
+        )
+    )
+    with write_behind():
+        reporter = StatusReporter(project, "7654321")
+        reporter.report(CommitStatus.pending, "Building SRPM ...", check_names="a")
+        # the first status of the check is not delayed
+        assert sent == ["a"]
+        reporter.report(CommitStatus.pending, "Building RPM ...", check_names="a")
+        reporter.report(CommitStatus.success, "Done", check_names="a")
+        assert sent == ["a"]
+    # the last one is flushed at the end of the block
+    assert sent == ["a", "a"]
+
+    # and not buffered anymore
+    reporter.report(CommitStatus.pending, "Building SRPM ...", check_names="a")
+    assert sent == ["a", "a", "a"]
+
+
+def test_write_behind_nested():
+    sent = []
+    project = flexmock(
+        set_commit_status=lambda sha, state, url, description, check, trim: sent.append(
+            check
+        )
+    )
+    with write_behind():
+        outer = StatusReporter(project, "7654321")
+        outer.report(CommitStatus.pending, "Building SRPM ...", check_names="a")
+        with write_behind():
+            inner = StatusReporter(project, "7654321")
+            inner.report(CommitStatus.pending, "Building SRPM ...", check_names="b")
+            inner.report(CommitStatus.success, "Done", check_names="b")
+        outer.report(CommitStatus.success, "Done", check_names="a")
+        assert sent == ["a", "b"]
+    # both flushed at the end of the outer block
+    assert sorted(sent) == ["a", "a", "b", "b"]
+
+
+def test_unchanged_status_is_not_sent():
+    project = flexmock(
+        service=flexmock(instance_url="https://github.com"),
+        namespace="packit",
+        repo="hello-world",
+    )
+    project.should_receive("set_commit_status").once()
+
+    StatusReporter(project, "7654321").report(
+        CommitStatus.pending, "Building SRPM ...", check_names="packit/rpm-build"
+    )
+    StatusReporter(project, "7654321").report(
+        CommitStatus.pending, "Building SRPM ...", check_names="packit/rpm-build"
+    )
@@ -0,0 +1,108 @@
+# MIT License
+#
+# Copyright (c) 2018-2020 Red Hat, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+
+from packit.config import JobConfig, JobType, JobConfigTriggerType
+from packit.config.job_config import JobMetadataConfig
+
+from packit_service.worker.build.srpm_cache import SRPMCache, get_srpm_cache_key
+
+
+def job_config(job_type: JobType, **kwargs) -> JobConfig:
+    return JobConfig(
+        type=job_type,
+        trigger=JobConfigTriggerType.pull_request,
+        metadata=JobMetadataConfig(targets=[f"{job_type.value}-target"]),
+        **kwargs,
+    )
+
+
+def test_srpm_cache_key():
+    key = get_srpm_cache_key(
+        "https://github.com/packit/ogr", "abcdef", job_config(JobType.copr_build)
+    )
+    # the same SRPM for Copr and Koji builds
+    assert key == get_srpm_cache_key(
+        "https://github.com/packit/ogr", "abcdef", job_config(JobType.production_build)
+    )
+    assert key != get_srpm_cache_key(
+        "https://github.com/packit/ogr", "123456", job_config(JobType.copr_build)
+    )
+    assert key != get_srpm_cache_key(
+        "https://github.com/packit/ogr",
+        "abcdef",
+        job_config(JobType.copr_build, specfile_path="fedora/ogr.spec"),
+    )
+
+
+def test_srpm_cache_put_get(tmp_path):
+    srpm = tmp_path / "python-ogr-0.1.src.rpm"
+    srpm.write_bytes(b"srpm")
+    cache = SRPMCache(directory=str(tmp_path / "cache"), max_size=1024)
+
+    assert cache.get("key") is None
+    with cache.lock("key"):
+        cache.put("key", srpm, 12)
+
+    cached_srpm, srpm_build_id = cache.get("key")
+    assert cached_srpm == tmp_path / "cache" / "key" / "python-ogr-0.1.src.rpm"
+    assert cached_srpm.read_bytes() == b"srpm"
+    assert srpm_build_id == 12
+
+
+def test_srpm_cache_lock_per_key(tmp_path):
+    cache = SRPMCache(directory=str(tmp_path / "cache"), max_size=1024)
+    locks = tmp_path / "cache" / ".locks"
+
+    with cache.lock("aa1"), cache.lock("aa2"):
+        assert {path.name for path in locks.iterdir()} == {"aa1.lock", "aa2.lock"}
+        with cache.lock("aa3"):
+            pass
+        # the held locks stay
+        cache.remove_unused_locks()
+        assert {path.name for path in locks.iterdir()} == {"aa1.lock", "aa2.lock"}
+
+    cache.remove_unused_locks()
+    assert not list(locks.iterdir())
+    # and the lock can be taken again
+    with cache.lock("aa1"):
+        assert (locks / "aa1.lock").exists()
+
+
+def test_srpm_cache_evicts_least_recently_used(tmp_path):
+    srpm = tmp_path / "python-ogr-0.1.src.rpm"
+    srpm.write_bytes(b"x" * 100)
+    # room for two SRPMs
+    cache = SRPMCache(directory=str(tmp_path / "cache"), max_size=250)
+
+    cache.put("first", srpm, 1)
+    cache.put("second", srpm, 2)
+    os.utime(tmp_path / "cache" / "first", (0, 0))
+    os.utime(tmp_path / "cache" / "second", (1, 1))
+    # first is used again
+    assert cache.get("first")
+    cache.put("third", srpm, 3)
+
+    assert cache.get("first")
+    assert cache.get("second") is None
+    assert cache.get("third")
@@ -19,6 +19,8 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import json
+
 import pytest
 from flexmock import flexmock
 
@@ -214,12 +216,11 @@ def test_testing_farm_response(
     )
 
     tft_test_run_model = flexmock()
-    tft_test_run_model.should_receive("set_status").with_args(
-        tests_result
-    ).and_return().once()
-    tft_test_run_model.should_receive("set_web_url").with_args(
-        "some url"
-    ).and_return().once()
+    tft_test_run_model.should_receive("update_state").with_args(
+        expected_status=[TFResult.new, TFResult.running],
+        status=tests_result,
+        web_url="some url",
+    ).and_return(True).once()
 
     flexmock(TFTTestRunModel).should_receive("get_by_pipeline_id").and_return(
         tft_test_run_model
@@ -230,6 +231,50 @@ def test_testing_farm_response(
     test_farm_handler.run()
 
 
+def test_testing_farm_response_already_processed():
+    config = flexmock(command_handler_work_dir=flexmock())
+    flexmock(TFResultsHandler).should_receive("service_config").and_return(config)
+    flexmock(TFResultsEvent).should_receive("db_trigger").and_return(None)
+    config.should_receive("get_project").and_return()
+    tests = [TResult(name="/install/copr-build", result=TFResult.passed, log_url="")]
+    event_dict = TFResultsEvent(
+        pipeline_id="id",
+        result=TFResult.passed,
+        environment=flexmock(),
+        message="Tests passed ...",
+        log_url="some url",
+        copr_repo_name=flexmock(),
+        copr_chroot="fedora-rawhide-x86_64",
+        tests=tests,
+        repo_namespace=flexmock(),
+        repo_name=flexmock(),
+        git_ref=flexmock(),
+        project_url="https://github.com/packit-service/ogr",
+        commit_sha=flexmock(),
+    ).get_dict()
+    test_farm_handler = TFResultsHandler(
+        package_config=flexmock(),
+        job_config=flexmock(),
+        data=EventData.from_event_dict(event_dict),
+        tests=tests,
+        result=TFResult.passed,
+        pipeline_id="id",
+        log_url="some url",
+        copr_chroot="fedora-rawhide-x86_64",
+        message="Tests passed ...",
+    )
+
+    # e.g. a duplicate message
+    tft_test_run_model = flexmock()
+    tft_test_run_model.should_receive("update_state").and_return(False).once()
+    flexmock(TFTTestRunModel).should_receive("get_by_pipeline_id").and_return(
+        tft_test_run_model
+    )
+    flexmock(StatusReporter).should_receive("report").never()
+
+    assert test_farm_handler.run()["success"]
+
+
 @pytest.mark.parametrize(
     (
         "tf_token,"
@@ -315,3 +360,54 @@ def test_trigger_payload(
         "git-url": f"{project_url}.git",
         "git-ref": git_ref,
     }
+
+
+def test_run_testing_farm_on_all():
+    config = flexmock(
+        testing_farm_secret="secret", deployment="stg", command_handler_work_dir="/tmp",
+    )
+    job_helper = TFJobHelper(
+        config,
+        flexmock(jobs=[]),
+        flexmock(),
+        flexmock(commit_sha="abcdef"),
+        flexmock(),
+        flexmock(),
+    )
+    targets = {"fedora-31-x86_64", "fedora-32-x86_64", "fedora-rawhide-x86_64"}
+    flexmock(TFJobHelper).should_receive("tests_targets").and_return(targets)
+    flexmock(TFJobHelper).should_receive("build_targets").and_return(targets)
+    flexmock(TFJobHelper).should_receive("_trigger_payload").replace_with(
+        lambda pipeline_id, chroot: {"chroot": chroot}
+    )
+    flexmock(TFJobHelper).should_receive("report_status_to_test_for_chroot")
+    test_runs = {}
+
+    def create(target, **_):
+        test_runs[target] = flexmock()
+        test_runs[target].should_receive("update_state").with_args(
+            expected_status=[TFResult.new],
+            status=TFResult.error
+            if target == "fedora-rawhide-x86_64"
+            else TFResult.running,
+        ).once()
+        return test_runs[target]
+
+    flexmock(TFTTestRunModel).should_receive("create").replace_with(create)
+
+    def send_testing_farm_request(url, method, params, data):
+        if json.loads(data)["chroot"] == "fedora-rawhide-x86_64":
+            return flexmock(status_code=500, reason="Oops", json=lambda: None)
+        return flexmock(status_code=200, json=lambda: {"url": "https://tf/pipeline"})
+
+    flexmock(TFJobHelper).should_receive("send_testing_farm_request").replace_with(
+        send_testing_farm_request
+    ).times(3)
+
+    result = job_helper.run_testing_farm_on_all()
+
+    assert not result["success"]
+    assert result["details"] == {
+        "msg": "Failed testing farm targets: ['fedora-rawhide-x86_64'].",
+        "fedora-rawhide-x86_64": {"msg": "Failed to submit tests: Oops"},
+    }
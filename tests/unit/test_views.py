@@ -95,3 +95,18 @@ def test_get_srpm_logs(client):
     resp = client.get(url).data.decode()
     assert srpm_build.logs in resp
     assert f"build {srpm_build.id}" in resp
+
+
+def test_srpm_logs_chunks():
+    logs = "".join(f"line {i}: ěščř\n" for i in range(1000))
+    srpm_build = SRPMBuildModel()
+    srpm_build.logs = logs
+
+    assert len(srpm_build._logs.logs) < len(logs)
+    chunks = list(srpm_build.iter_logs(chunk_size=16))
+    assert len(chunks) > 1
+    assert "".join(chunks) == logs
+    assert srpm_build.logs == logs
+
+    assert list(SRPMBuildModel().iter_logs()) == []
+    assert SRPMBuildModel().logs is None
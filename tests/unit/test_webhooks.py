@@ -25,6 +25,7 @@ from flexmock import flexmock
 
 from packit_service.config import ServiceConfig
 from packit_service.service.api.errors import ValidationFailed
+from packit_service.worker.handlers.abstract import TaskName, TASK_QUEUES
 
 
 @pytest.fixture()
@@ -62,3 +63,7 @@ def test_validate_signature(mock_config, digest, is_good):
                 webhooks.GithubWebhook.validate_signature()
         else:
             webhooks.GithubWebhook.validate_signature()
+
+
+def test_all_tasks_have_queue():
+    assert set(TASK_QUEUES) == set(TaskName)
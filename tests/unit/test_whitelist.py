@@ -358,3 +358,42 @@ def test_check_and_report(
             )
             is is_valid
         )
+
+
+def test_is_approved_cached(caching):
+    flexmock(DBWhitelist).should_receive("get_account").with_args(
+        "the-namespace"
+    ).and_return(None).and_return(
+        DBWhitelist(status=WhitelistStatus.approved_manually.value)
+    ).twice()
+    flexmock(DBWhitelist).should_receive("add_account").once()
+
+    assert not Whitelist.is_approved("the-namespace")
+    # from the cache
+    assert not Whitelist.is_approved("the-namespace")
+
+    Whitelist.approve_account("the-namespace")
+    assert Whitelist.is_approved("the-namespace")
+
+
+def test_signed_fpca_cached(whitelist, caching):
+    flexmock(AccountSystem).should_receive("person_by_username").with_args(
+        "me"
+    ).and_return({"memberships": [{"name": "cla_fpca"}]}).once()
+
+    assert whitelist._signed_fpca("me")
+    # from the cache
+    assert whitelist._signed_fpca("me")
+
+
+def test_signed_fpca_unsigned_not_cached(whitelist, caching):
+    flexmock(AccountSystem).should_receive("person_by_username").with_args(
+        "you"
+    ).and_return({"memberships": []}).and_return(
+        {"memberships": [{"name": "cla_fpca"}]}
+    ).twice()
+
+    assert not whitelist._signed_fpca("you")
+    # signed it meanwhile
+    assert whitelist._signed_fpca("you")
+    assert whitelist._signed_fpca("you")
@@ -32,10 +32,12 @@ $ alembic upgrade head
 """
 
 import pytest
+from sqlalchemy import event
 
 from ogr import GithubService, GitlabService, PagureService
 from packit_service.config import ServiceConfig
 from packit_service.models import (
+    get_engine,
     CoprBuildModel,
     get_sa_session,
     SRPMBuildModel,
@@ -165,6 +167,19 @@ def clean_before_and_after():
     clean_db()
 
 
+@pytest.fixture()
+def sql_statements():
+    """ SQL statements sent to the database during the test """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(get_engine(), "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture()
 def pr_model():
     yield PullRequestModel.get_or_create(
@@ -304,8 +319,8 @@ def a_copr_build_for_pr(pr_model, srpm_build_model):
         srpm_build=srpm_build_model,
         trigger_model=pr_model,
     )
-    model.set_build_logs_url(
-        "https://copr.somewhere/results/owner/package/target/build.logs"
+    model.update_state(
+        build_logs_url="https://copr.somewhere/results/owner/package/target/build.logs"
     )
     yield model
 
@@ -323,8 +338,8 @@ def a_copr_build_for_branch_push(branch_model, srpm_build_model):
         srpm_build=srpm_build_model,
         trigger_model=branch_model,
     )
-    model.set_build_logs_url(
-        "https://copr.somewhere/results/owner/package/target/build.logs"
+    model.update_state(
+        build_logs_url="https://copr.somewhere/results/owner/package/target/build.logs"
     )
     yield model
 
@@ -342,8 +357,8 @@ def a_copr_build_for_release(release_model, srpm_build_model):
         srpm_build=srpm_build_model,
         trigger_model=release_model,
     )
-    model.set_build_logs_url(
-        "https://copr.somewhere/results/owner/package/target/build.logs"
+    model.update_state(
+        build_logs_url="https://copr.somewhere/results/owner/package/target/build.logs"
     )
     yield model
 
@@ -498,8 +513,8 @@ def a_koji_build_for_pr(pr_model, srpm_build_model):
         srpm_build=srpm_build_model,
         trigger_model=pr_model,
     )
-    build.set_build_logs_url(
-        "https://koji.somewhere/results/owner/package/target/build.logs"
+    build.update_state(
+        build_logs_url="https://koji.somewhere/results/owner/package/target/build.logs"
     )
     yield build
 
@@ -654,54 +669,64 @@ def new_whitelist_entry(clean_before_and_after):
 def task_results():
     return [
         {
-            "jobs": {
-                "copr_build": {
-                    "success": True,
-                    "details": {
-                        "msg": "Only users with write or admin permissions to the "
-                        "repository can trigger Packit-as-a-Service"
-                    },
-                }
-            },
-            "event": {
-                "trigger": "pull_request",
-                "created_at": "2020-03-26T07:39:18",
-                "project_url": "https://github.com/nmstate/nmstate",
-                "git_ref": None,
-                "identifier": "934",
-                "action": "synchronize",
-                "pr_id": 934,
-                "base_repo_namespace": "nmstate",
-                "base_repo_name": "nmstate",
-                "base_ref": "f483003f13f0fee585f5cc0b970f4cd21eca7c9d",
-                "target_repo": "nmstate/nmstate",
-                "commit_sha": "f483003f13f0fee585f5cc0b970f4cd21eca7c9d",
-                "user_login": "adwait-thattey",
+            "success": True,
+            "details": {
+                "event": {
+                    "event_type": "PullRequestGithubEvent",
+                    "trigger": "pull_request",
+                    "created_at": 1585208358,
+                    "project_url": "https://github.com/nmstate/nmstate",
+                    "git_ref": None,
+                    "identifier": "934",
+                    "action": "synchronize",
+                    "pr_id": 934,
+                    "base_repo_namespace": "nmstate",
+                    "base_repo_name": "nmstate",
+                    "base_ref": "f483003f13f0fee585f5cc0b970f4cd21eca7c9d",
+                    "target_repo": "nmstate/nmstate",
+                    "commit_sha": "f483003f13f0fee585f5cc0b970f4cd21eca7c9d",
+                    "user_login": "adwait-thattey",
+                },
+                "package_config": None,
+                "matching_jobs": [
+                    {
+                        "job": "copr_build",
+                        "trigger": "pull_request",
+                        "metadata": {"targets": ["fedora-all"]},
+                    }
+                ],
             },
         },
         {
-            "jobs": {"tests": {"success": True, "details": {}}},
-            "event": {
-                "trigger": "testing_farm_results",
-                "created_at": "2020-03-25T16:56:39",
-                "project_url": "https://github.com/psss/tmt.git",
-                "git_ref": "4c584245ef53062eb15afc7f8daa6433da0a95a7",
-                "identifier": "4c584245ef53062eb15afc7f8daa6433da0a95a7",
-                "pipeline_id": "c9a88c3d-801f-44e4-a206-2e1b6081446a",
-                "result": "passed",
-                "environment": "Fedora-Cloud-Base-30-20200325.0.x86_64.qcow2",
-                "message": "All tests passed",
-                "log_url": "https://console-testing-farm.apps.ci.centos.org/pipeline"
-                "/c9a88c3d-801f-44e4-a206-2e1b6081446a",
-                "copr_repo_name": "packit/psss-tmt-178",
-                "copr_chroot": "fedora-30-x86_64",
-                "tests": [
-                    {"name": "/plans/smoke", "result": "passed", "log_url": None},
-                    {"name": "/plans/basic", "result": "passed", "log_url": None},
+            "success": True,
+            "details": {
+                "event": {
+                    "event_type": "TestingFarmResultsEvent",
+                    "trigger": "testing_farm_results",
+                    "created_at": 1585155399,
+                    "project_url": "https://github.com/psss/tmt.git",
+                    "git_ref": "4c584245ef53062eb15afc7f8daa6433da0a95a7",
+                    "identifier": "4c584245ef53062eb15afc7f8daa6433da0a95a7",
+                    "pipeline_id": "c9a88c3d-801f-44e4-a206-2e1b6081446a",
+                    "result": "passed",
+                    "environment": "Fedora-Cloud-Base-30-20200325.0.x86_64.qcow2",
+                    "message": "All tests passed",
+                    "log_url": "https://console-testing-farm.apps.ci.centos.org/pipeline"
+                    "/c9a88c3d-801f-44e4-a206-2e1b6081446a",
+                    "copr_repo_name": "packit/psss-tmt-178",
+                    "copr_chroot": "fedora-30-x86_64",
+                    "tests": [
+                        {"name": "/plans/smoke", "result": "passed", "log_url": None},
+                        {"name": "/plans/basic", "result": "passed", "log_url": None},
+                    ],
+                    "repo_name": "tmt",
+                    "repo_namespace": "psss",
+                    "commit_sha": "4c584245ef53062eb15afc7f8daa6433da0a95a7",
+                },
+                "package_config": None,
+                "matching_jobs": [
+                    {"job": "tests", "trigger": "pull_request", "metadata": {}}
                 ],
-                "repo_name": "tmt",
-                "repo_namespace": "psss",
-                "commit_sha": "4c584245ef53062eb15afc7f8daa6433da0a95a7",
             },
         },
     ]
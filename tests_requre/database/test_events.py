@@ -202,6 +202,22 @@ def test_push_gitlab_event(
     assert event_object.db_trigger.project.repo_name == "repo-name"
 
 
+def test_pr_event_db_trigger_is_resolved_once(
+    clean_before_and_after, pr_event_dict, sql_statements
+):
+    event_object = Parser.parse_event(pr_event_dict)
+
+    db_trigger = event_object.db_trigger
+    event_object.get_dict()
+    event_object.get_dict()
+    assert event_object.db_trigger is db_trigger
+
+    lookups = [
+        statement for statement in sql_statements if "JOIN build_triggers" in statement
+    ]
+    assert len(lookups) == 1
+
+
 def test_pr_event_non_existing_pr(clean_before_and_after, pr_event_dict):
     event_object = Parser.parse_event(pr_event_dict)
     assert isinstance(event_object, PullRequestGithubEvent)
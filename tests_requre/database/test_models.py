@@ -19,10 +19,16 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 
+import pytest
+from flexmock import flexmock
 from sqlalchemy.exc import ProgrammingError
 
+from packit.config import JobConfig, JobConfigTriggerType, JobType
+from packit.config.job_config import JobMetadataConfig
+
 from packit_service.models import (
     ProjectReleaseModel,
     PullRequestModel,
@@ -39,7 +45,15 @@ from packit_service.models import (
     GitProjectModel,
     InstallationModel,
     BugzillaModel,
+    IssueModel,
+    PARTITIONED_TABLES,
+    get_partitions,
+    maintain_partitions,
+    move_rows_from_default,
 )
+from packit_service.service.events import PullRequestAction, PullRequestGithubEvent
+from packit_service.utils import dump_job_config
+from packit_service.worker.jobs import get_processing_results
 from tests_requre.conftest import SampleValues
 
 
@@ -143,7 +157,7 @@ def test_get_copr_build(clean_before_and_after, a_copr_build_for_pr):
 
 def test_copr_build_set_status(clean_before_and_after, a_copr_build_for_pr):
     assert a_copr_build_for_pr.status == "pending"
-    a_copr_build_for_pr.set_status("awesome")
+    a_copr_build_for_pr.update_state(status="awesome")
     assert a_copr_build_for_pr.status == "awesome"
     b = CoprBuildModel.get_by_build_id(
         a_copr_build_for_pr.build_id, SampleValues.target
@@ -153,7 +167,7 @@ def test_copr_build_set_status(clean_before_and_after, a_copr_build_for_pr):
 
 def test_copr_build_set_build_logs_url(clean_before_and_after, a_copr_build_for_pr):
     url = "https://copr.fp.o/logs/12456/build.log"
-    a_copr_build_for_pr.set_build_logs_url(url)
+    a_copr_build_for_pr.update_state(build_logs_url=url)
     assert a_copr_build_for_pr.build_logs_url == url
     b = CoprBuildModel.get_by_build_id(
         a_copr_build_for_pr.build_id, SampleValues.target
@@ -161,6 +175,28 @@ def test_copr_build_set_build_logs_url(clean_before_and_after, a_copr_build_for_
     assert b.build_logs_url == url
 
 
+def test_copr_build_update_state(clean_before_and_after, a_copr_build_for_pr):
+    finished = datetime(2020, 7, 8, 10, 11, 12)
+    assert a_copr_build_for_pr.update_state(
+        unless_status=["failure", "success"],
+        status="success",
+        build_finished_time=finished,
+    )
+    assert a_copr_build_for_pr.status == "success"
+    assert a_copr_build_for_pr.build_finished_time == finished
+
+    # duplicate end message
+    assert not a_copr_build_for_pr.update_state(
+        unless_status=["failure", "success"], status="failure"
+    )
+    assert a_copr_build_for_pr.status == "success"
+    b = CoprBuildModel.get_by_build_id(
+        a_copr_build_for_pr.build_id, SampleValues.target
+    )
+    assert b.status == "success"
+    assert b.build_finished_time == finished
+
+
 def test_create_koji_build(clean_before_and_after, a_koji_build_for_pr):
     assert a_koji_build_for_pr.build_id == "123456"
     assert a_koji_build_for_pr.commit_sha == "80201a74d96c"
@@ -191,7 +227,7 @@ def test_get_koji_build(clean_before_and_after, a_koji_build_for_pr):
 
 def test_koji_build_set_status(clean_before_and_after, a_koji_build_for_pr):
     assert a_koji_build_for_pr.status == "pending"
-    a_koji_build_for_pr.set_status("awesome")
+    a_koji_build_for_pr.update_state(status="awesome")
     assert a_koji_build_for_pr.status == "awesome"
     b = KojiBuildModel.get_by_build_id(
         a_koji_build_for_pr.build_id, SampleValues.target
@@ -204,7 +240,7 @@ def test_koji_build_set_build_logs_url(clean_before_and_after, a_koji_build_for_
         "https://kojipkgs.fedoraproject.org//"
         "packages/python-ogr/0.11.0/1.fc30/data/logs/noarch/build.log"
     )
-    a_koji_build_for_pr.set_build_logs_url(url)
+    a_koji_build_for_pr.update_state(build_logs_url=url)
     assert a_koji_build_for_pr.build_logs_url == url
     b = KojiBuildModel.get_by_build_id(
         a_koji_build_for_pr.build_id, SampleValues.target
@@ -247,6 +283,213 @@ def test_get_or_create_pr(clean_before_and_after):
         assert expected_pr.project_id == actual_pr.project_id
 
 
+def test_get_or_create_trigger_creates_missing_job_trigger(clean_before_and_after):
+    pr = PullRequestModel.get_or_create(
+        pr_id=42,
+        namespace="clapton",
+        repo_name="layla",
+        project_url="https://github.com/clapton/layla",
+    )
+    with get_sa_session() as session:
+        session.query(JobTriggerModel).delete()
+
+    same_pr = PullRequestModel.get_or_create(
+        pr_id=42,
+        namespace="clapton",
+        repo_name="layla",
+        project_url="https://github.com/clapton/layla",
+    )
+    assert same_pr.id == pr.id
+    assert JobTriggerModel.get_by_type_and_trigger_id(
+        JobTriggerModelType.pull_request, pr.id
+    )
+
+
+@pytest.mark.parametrize(
+    "model,kwargs",
+    [
+        (PullRequestModel, {"pr_id": 42}),
+        (IssueModel, {"issue_id": 42}),
+        (GitBranchModel, {"branch_name": "master"}),
+        (ProjectReleaseModel, {"tag_name": "v1.0.0", "commit_hash": "80201a74d96c"}),
+    ],
+)
+def test_get_existing_trigger_is_one_select(
+    clean_before_and_after, sql_statements, model, kwargs
+):
+    statements_count = len(sql_statements)
+    trigger = model.get_or_create(
+        namespace="clapton",
+        repo_name="layla",
+        project_url="https://github.com/clapton/layla",
+        **kwargs,
+    )
+    # the SELECT and the INSERTs of the project, the trigger and the job trigger
+    assert len(sql_statements) == statements_count + 2
+    assert sql_statements[-1].lstrip().startswith("WITH new_project")
+    statements_count = len(sql_statements)
+
+    same_trigger = model.get_or_create(
+        namespace="clapton",
+        repo_name="layla",
+        project_url="https://github.com/clapton/layla",
+        **kwargs,
+    )
+    assert len(sql_statements) == statements_count + 1
+    assert sql_statements[-1].lstrip().startswith("SELECT")
+
+    assert same_trigger.id == trigger.id
+    assert trigger.project.project_url == "https://github.com/clapton/layla"
+    with get_sa_session() as session:
+        assert session.query(GitProjectModel).count() == 1
+        assert session.query(model).count() == 1
+        assert (
+            session.query(JobTriggerModel)
+            .filter_by(type=model.job_trigger_model_type, trigger_id=trigger.id)
+            .count()
+            == 1
+        )
+
+
+def test_copr_build_get_or_create_is_locked(
+    clean_before_and_after, pr_model, srpm_build_model, sql_statements
+):
+    kwargs = dict(
+        build_id=SampleValues.build_id,
+        commit_sha=SampleValues.ref,
+        project_name="the-project-name",
+        owner="the-owner",
+        web_url="https://copr.something.somewhere/123456",
+        target=SampleValues.target,
+        srpm_build=srpm_build_model,
+        trigger_model=pr_model,
+    )
+    build = CoprBuildModel.get_or_create(status="pending", **kwargs)
+    same_build = CoprBuildModel.get_or_create(status="success", **kwargs)
+
+    # copr_builds is partitioned, so there is no unique constraint for an upsert,
+    # the lock is taken only when the build is not there
+    assert (
+        len(
+            [
+                statement
+                for statement in sql_statements
+                if "pg_advisory_xact_lock" in statement
+            ]
+        )
+        == 1
+    )
+    inserts = [
+        statement
+        for statement in sql_statements
+        if statement.lstrip().startswith("INSERT INTO copr_builds")
+    ]
+    assert len(inserts) == 1
+    assert same_build.id == build.id
+    # the existing build is not updated
+    assert same_build.status == "pending"
+    with get_sa_session() as session:
+        assert session.query(CoprBuildModel).count() == 1
+        assert session.query(JobTriggerModel).count() == 1
+
+
+def test_copr_build_get_or_create_concurrently(
+    clean_before_and_after, pr_model, srpm_build_model
+):
+    # there is no unique constraint on (build_id, target) in the partitioned table,
+    # only the advisory lock of get_or_insert keeps the builds unique
+    def get_or_create(status: str) -> int:
+        return CoprBuildModel.get_or_create(
+            build_id=SampleValues.build_id,
+            commit_sha=SampleValues.ref,
+            project_name="the-project-name",
+            owner="the-owner",
+            web_url="https://copr.something.somewhere/123456",
+            target=SampleValues.target,
+            status=status,
+            srpm_build=srpm_build_model,
+            trigger_model=pr_model,
+        ).id
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        build_ids = set(executor.map(get_or_create, ["pending"] * 8))
+
+    assert len(build_ids) == 1
+    with get_sa_session() as session:
+        assert session.query(CoprBuildModel).count() == 1
+
+
+def test_maintain_partitions(clean_before_and_after):
+    created, detached = maintain_partitions(
+        months_ahead=2, retention_months=0, now=datetime(2100, 11, 24)
+    )
+    try:
+        # only the upcoming months
+        assert set(created) == {
+            f"{table}_y{year}m{month}"
+            for table in PARTITIONED_TABLES
+            for year, month in (("2100", "12"), ("2101", "01"))
+        }
+        assert not detached
+        assert "copr_builds_y2101m01" in get_partitions("copr_builds")
+
+        # they exist already
+        assert maintain_partitions(
+            months_ahead=2, retention_months=0, now=datetime(2100, 11, 24)
+        ) == ([], [])
+    finally:
+        with get_sa_session() as session:
+            for partition in created:
+                session.execute(f"DROP TABLE {partition}")
+
+
+def test_maintain_partitions_leaves_default(
+    clean_before_and_after, a_copr_build_for_pr
+):
+    # the partition was not created in time, the build ended up in the default one
+    with get_sa_session() as session:
+        session.execute(
+            "UPDATE copr_builds SET build_submitted_time = '2101-01-24' "
+            f"WHERE id = {a_copr_build_for_pr.id}"
+        )
+    created, _ = maintain_partitions(
+        months_ahead=1, retention_months=0, now=datetime(2100, 12, 24)
+    )
+    try:
+        assert "copr_builds_y2101m01" not in created
+        assert "koji_builds_y2101m01" in created
+        with get_sa_session() as session:
+            assert session.execute("SELECT id FROM copr_builds_default").first() == (
+                a_copr_build_for_pr.id,
+            )
+
+        assert move_rows_from_default("copr_builds", date(2101, 1, 1)) == 1
+        created.append("copr_builds_y2101m01")
+        with get_sa_session() as session:
+            assert not session.execute("SELECT id FROM copr_builds_default").first()
+            assert session.execute("SELECT id FROM copr_builds_y2101m01").first() == (
+                a_copr_build_for_pr.id,
+            )
+        assert CoprBuildModel.get_by_id(a_copr_build_for_pr.id)
+    finally:
+        with get_sa_session() as session:
+            session.execute(
+                "DELETE FROM copr_builds WHERE build_submitted_time >= '2101-01-01'"
+            )
+            for partition in created:
+                session.execute(f"DROP TABLE {partition}")
+
+
+def test_get_range_submitted_time(clean_before_and_after, multiple_koji_builds):
+    now = datetime.utcnow()
+    assert len(
+        KojiBuildModel.get_range(0, 10, submitted_after=now - timedelta(hours=1))
+    ) == len(multiple_koji_builds)
+    assert not KojiBuildModel.get_range(
+        0, 10, submitted_before=now - timedelta(hours=1)
+    )
+
+
 def test_errors_while_doing_db(clean_before_and_after):
     with get_sa_session() as session:
         try:
@@ -402,7 +645,7 @@ def test_tmt_test_multiple_runs(clean_before_and_after, multiple_new_test_runs):
 
 def test_tmt_test_run_set_status(clean_before_and_after, a_new_test_run_pr):
     assert a_new_test_run_pr.status == TestingFarmResult.new
-    a_new_test_run_pr.set_status(TestingFarmResult.running)
+    a_new_test_run_pr.update_state(status=TestingFarmResult.running)
     assert a_new_test_run_pr.status == TestingFarmResult.running
 
     b = TFTTestRunModel.get_by_pipeline_id(a_new_test_run_pr.pipeline_id)
@@ -434,7 +677,7 @@ def test_tmt_test_run_set_web_url(clean_before_and_after, pr_model):
         "https://console-testing-farm.apps.ci.centos.org/"
         "pipeline/02271aa8-2917-4741-a39e-78d8706c56c1"
     )
-    test_run_model.set_web_url(new_url)
+    test_run_model.update_state(web_url=new_url)
     assert test_run_model.web_url == new_url
 
     b = TFTTestRunModel.get_by_pipeline_id(test_run_model.pipeline_id)
@@ -500,10 +743,60 @@ def test_get_task_results(clean_before_and_after, multiple_task_results_entries)
 def test_get_task_result_by_id(
     clean_before_and_after, multiple_task_results_entries, task_results
 ):
-    assert TaskResultModel.get_by_id("ab1").jobs == task_results[0].get("jobs")
-    assert TaskResultModel.get_by_id("ab1").event == task_results[0].get("event")
-    assert TaskResultModel.get_by_id("ab2").jobs == task_results[1].get("jobs")
-    assert TaskResultModel.get_by_id("ab2").event == task_results[1].get("event")
+    for task_id, task_result in zip(("ab1", "ab2"), task_results):
+        details = task_result["details"]
+        assert TaskResultModel.get_by_id(task_id).jobs == details["matching_jobs"]
+        assert TaskResultModel.get_by_id(task_id).event == details["event"]
+        assert (
+            TaskResultModel.get_by_id(task_id).event_type
+            == details["event"]["event_type"]
+        )
+
+
+def test_add_processing_results(clean_before_and_after, pr_model):
+    event = PullRequestGithubEvent(
+        action=PullRequestAction.opened,
+        pr_id=SampleValues.pr_id,
+        base_repo_namespace=SampleValues.repo_namespace,
+        base_repo_name=SampleValues.repo_name,
+        base_ref=SampleValues.commit_sha,
+        target_repo_namespace=SampleValues.repo_namespace,
+        target_repo_name=SampleValues.repo_name,
+        https_url=SampleValues.project_url,
+        commit_sha=SampleValues.commit_sha,
+        user_login="the-user",
+    )
+    job = JobConfig(
+        type=JobType.copr_build,
+        trigger=JobConfigTriggerType.pull_request,
+        metadata=JobMetadataConfig(targets=["fedora-all"]),
+    )
+    flexmock(event).should_receive("get_package_config").and_return(None)
+
+    TaskResultModel.add_task_result(
+        task_id="ab1", task_result_dict=get_processing_results(event, [job])
+    )
+
+    task_result = TaskResultModel.get_by_id("ab1")
+    assert task_result.event_type == "PullRequestGithubEvent"
+    assert task_result.event["pr_id"] == SampleValues.pr_id
+    assert task_result.jobs == [dump_job_config(job)]
+
+
+def test_delete_old_task_results(clean_before_and_after, multiple_task_results_entries):
+    with get_sa_session() as session:
+        task_result = TaskResultModel.get_by_id("ab1")
+        task_result.date_created = datetime.utcnow() - timedelta(days=40)
+        session.add(task_result)
+
+    assert (
+        TaskResultModel.delete_older_than(
+            datetime.utcnow() - timedelta(days=30), batch_size=1
+        )
+        == 1
+    )
+    assert not TaskResultModel.get_by_id("ab1")
+    assert TaskResultModel.get_by_id("ab2")
 
 
 def test_project_property_for_copr_build(a_copr_build_for_pr):
@@ -515,10 +808,17 @@ def test_project_property_for_copr_build(a_copr_build_for_pr):
 
 def test_get_projects(clean_before_and_after, a_copr_build_for_pr):
     projects = GitProjectModel.get_projects(0, 10)
-    assert isinstance(projects[0], GitProjectModel)
-    assert projects[0].namespace == "the-namespace"
-    assert projects[0].repo_name == "the-repo-name"
-    assert projects[0].project_url == "https://github.com/the-namespace/the-repo-name"
+    assert isinstance(projects[0].project, GitProjectModel)
+    assert projects[0].project.namespace == "the-namespace"
+    assert projects[0].project.repo_name == "the-repo-name"
+    assert (
+        projects[0].project.project_url
+        == "https://github.com/the-namespace/the-repo-name"
+    )
+    assert projects[0].prs_handled == 1
+    assert projects[0].branches_handled == 0
+    assert projects[0].releases_handled == 0
+    assert projects[0].issues_handled == 0
 
 
 def test_get_project_prs(clean_before_and_after, a_copr_build_for_pr):
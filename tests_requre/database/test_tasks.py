@@ -35,7 +35,7 @@ from packit_service.models import (
     PullRequestModel,
 )
 from packit_service.service.events import CoprBuildEvent
-from packit_service.worker.build.babysit import check_copr_build
+from packit_service.worker.build.babysit import check_pending_copr_builds
 
 BUILD_ID = 1300329
 
@@ -91,7 +91,7 @@ def packit_build_752():
     )
 
 
-def test_check_copr_build(clean_before_and_after, packit_build_752):
+def test_check_pending_copr_builds(clean_before_and_after, packit_build_752):
     flexmock(Client).should_receive("create_from_config_file").and_return(Client(None))
     flexmock(CoprBuildEvent).should_receive("get_package_config").and_return(
         PackageConfig(
@@ -166,5 +166,5 @@ def test_check_copr_build(clean_before_and_after, packit_build_752):
     flexmock(GithubProject).should_receive("pr_comment").and_return()
     flexmock(GithubProject).should_receive("set_commit_status").and_return().once()
 
-    check_copr_build(BUILD_ID)
+    check_pending_copr_builds()
     assert packit_build_752.status == PG_COPR_BUILD_STATUS_SUCCESS
@@ -1,5 +1,6 @@
 from flask import url_for
 
+from packit_service.models import PullRequestModel
 from tests_requre.conftest import SampleValues
 
 
@@ -47,6 +48,41 @@ def test_pagination(client, clean_before_and_after, too_many_copr_builds):
     assert len(response_dict_2) == 30  # three builds, but two unique build ids
 
 
+def test_copr_builds_list_query_count(
+    client, clean_before_and_after, too_many_copr_builds, sql_statements
+):
+    queries_per_page = []
+    for per_page in (10, 30):
+        sql_statements.clear()
+        response = client.get(
+            url_for("api.copr-builds_copr_builds_list") + f"?page=1&per_page={per_page}"
+        )
+        assert len(response.json) == per_page
+        queries_per_page.append(len(sql_statements))
+
+    # the whole page is fetched at once, no query per build
+    assert queries_per_page[0] == queries_per_page[1]
+
+
+def test_copr_builds_list_cursor(client, clean_before_and_after, too_many_copr_builds):
+    url = url_for("api.copr-builds_copr_builds_list")
+    # the cursor is returned only to the clients which use it
+    assert "X-Next-After" not in client.get(url + "?per_page=20").headers
+
+    first_page = client.get(url + "?per_page=20&after=")
+    after = first_page.headers["X-Next-After"]
+
+    next_page = client.get(url + f"?per_page=20&after={after}")
+    # the same as with the page numbers
+    assert next_page.json == client.get(url + "?page=2&per_page=20").json
+    # 40 merged builds, so there is nothing after this page
+    after = next_page.headers["X-Next-After"]
+    assert not client.get(url + f"?per_page=20&after={after}").json
+
+    response = client.get(url + "?after=not-an-id")
+    assert response.status_code == 400
+
+
 # Test detailed build info
 def test_detailed_copr_build_info(client, clean_before_and_after, multiple_copr_builds):
     response = client.get(
@@ -58,7 +94,10 @@ def test_detailed_copr_build_info(client, clean_before_and_after, multiple_copr_
     assert response_dict["build_id"] == SampleValues.build_id
     assert response_dict["commit_sha"] == SampleValues.commit_sha
     assert response_dict["web_url"] == SampleValues.copr_web_url
-    assert response_dict["srpm_logs"] == SampleValues.srpm_logs
+    assert "srpm_logs" not in response_dict
+    assert response_dict["srpm_logs_url"].endswith(
+        f"/srpm-build/{multiple_copr_builds[0].srpm_build_id}/logs"
+    )
     assert response_dict["ref"] == SampleValues.ref
     assert response_dict["repo_namespace"] == SampleValues.repo_namespace
     assert response_dict["repo_name"] == SampleValues.repo_name
@@ -195,6 +234,52 @@ def test_get_projects_list(client, clean_before_and_after, a_copr_build_for_pr):
     assert response_dict[0]["prs_handled"] == 1
 
 
+def test_get_projects_list_cursor(client, clean_before_and_after):
+    # more projects in the same namespace, the pages are split in the middle of them
+    for namespace in ("a", "b", "c"):
+        for repo_name in ("x", "y"):
+            PullRequestModel.get_or_create(
+                pr_id=1,
+                namespace=namespace,
+                repo_name=repo_name,
+                project_url=f"https://github.com/{namespace}/{repo_name}",
+            )
+    url = url_for("api.projects_projects_list")
+
+    first_page = client.get(url + "?per_page=2&after=")
+    second_page = client.get(
+        url + f"?per_page=2&after={first_page.headers['X-Next-After']}"
+    )
+    third_page = client.get(
+        url + f"?per_page=2&after={second_page.headers['X-Next-After']}"
+    )
+    projects = [
+        (project["namespace"], project["repo_name"])
+        for page in (first_page, second_page, third_page)
+        for project in page.json
+    ]
+    # no gaps and no duplicates, in the same order as with the page numbers
+    assert sorted(projects) == [
+        (namespace, repo_name) for namespace in "abc" for repo_name in "xy"
+    ]
+    assert projects[:2] == [
+        (project["namespace"], project["repo_name"])
+        for project in client.get(url + "?per_page=2").json
+    ]
+    assert [project["namespace"] for project in projects] == list("aabbcc")
+
+
+def test_get_tasks_cursor(
+    client, clean_before_and_after, multiple_task_results_entries
+):
+    url = url_for("api.tasks_tasks_list")
+    first_page = client.get(url + "?per_page=2&after=")
+    # the latest first
+    assert [task["task_id"] for task in first_page.json] == ["ab2", "ab1"]
+    after = first_page.headers["X-Next-After"]
+    assert not client.get(url + f"?per_page=2&after={after}").json
+
+
 def test_get_projects_prs(client, clean_before_and_after, a_copr_build_for_pr):
     """Test Get Project's Pull Requests"""
     response = client.get(
@@ -76,8 +76,8 @@ def test_copr_build_info_view(client, clean_before_and_after, multiple_copr_buil
     )
 
     build = CoprBuildModel.get_by_build_id(123456, SampleValues.chroots[0])
-    build.set_build_logs_url(
-        "https://copr.somewhere/results/owner/package/target/build.logs"
+    build.update_state(
+        build_logs_url="https://copr.somewhere/results/owner/package/target/build.logs"
     )
     response = client.get(url_for("builds.copr_build_info", id_=str(build.id)))
     response = response.data.decode()